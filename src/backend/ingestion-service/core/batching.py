@@ -0,0 +1,141 @@
+"""
+Micro-batching for concurrent write paths
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Queued by close() to tell the collector to flush what it holds and stop
+_STOP = object()
+
+
+class BatchCollector(Generic[T, R]):
+    """
+    Collect items submitted by concurrent callers and flush them together
+
+    Each caller awaits the result for its own item. A batch is flushed once
+    max_items are waiting or flush_interval_ms has passed since its first
+    item arrived, whichever comes first. The flush callable receives the
+    batch and must return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[List[R]]],
+        max_items: int = 50,
+        flush_interval_ms: float = 10.0,
+        name: str = "batch"
+    ):
+        self._flush = flush
+        self._max_items = max_items
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._name = name
+        self._queue: "asyncio.Queue[Tuple[T, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for the result of the batch it lands in"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(
+                self._run(), name=f"{self._name}-collector"
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self):
+        """Flush anything still queued and stop the collector"""
+        if self._worker is None or self._worker.done():
+            return
+
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+
+    async def _run(self):
+        """Collect batches from the queue and flush them"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        batch: List[Tuple[T, asyncio.Future]] = []
+
+        try:
+            while not stopping:
+                entry = await self._queue.get()
+                if entry is _STOP:
+                    break
+                batch = [entry]
+                deadline = loop.time() + self._flush_interval
+
+                while len(batch) < self._max_items:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if entry is _STOP:
+                        stopping = True
+                        break
+                    batch.append(entry)
+
+                await self._flush_batch(batch)
+                batch = []
+        except BaseException as e:
+            # Cancellation (or anything else escaping a flush) stops the
+            # worker; fail the batch in hand and everything queued behind
+            # it so no caller is left awaiting a future nobody will resolve
+            self._fail_futures([future for _, future in batch], e)
+            queued = []
+            while not self._queue.empty():
+                entry = self._queue.get_nowait()
+                if entry is not _STOP:
+                    queued.append(entry[1])
+            self._fail_futures(queued, e)
+            raise
+
+    async def _flush_batch(self, batch: List[Tuple[T, asyncio.Future]]):
+        """Flush one batch, falling back to single items if it fails"""
+        items = [item for item, _ in batch]
+        try:
+            results = await self._flush(items)
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"{self._name} flush returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # Retry one by one so a single bad item only fails its own caller
+            logger.warning(
+                f"{self._name} flush of {len(batch)} items failed, "
+                f"retrying individually: {e}"
+            )
+            for entry in batch:
+                await self._flush_batch([entry])
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail_futures(futures: List[asyncio.Future], error: BaseException):
+        """Resolve every pending future with error, cancelling on cancellation"""
+        for future in futures:
+            if future.done():
+                continue
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
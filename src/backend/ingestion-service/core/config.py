@@ -3,28 +3,48 @@ Core configuration settings for the Data Ingestion Service
 """
 
 import os
-from typing import List
-from datetime import datetime
+import time
+from typing import FrozenSet, List, Optional
 from pydantic import Field
-from pydantic_settings import BaseSettings
-from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO 8601 with microseconds and a "Z" suffix"""
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    tm = time.gmtime(seconds)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{nanos // 1000:06d}Z"
+    )
 
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
     
+    # Environment variables map to fields by name (case-insensitive); list
+    # fields are read as JSON. Settings are immutable once loaded.
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        frozen=True
+    )
+    
     # Application
     app_name: str = "AI-Vida Data Ingestion Service"
-    environment: str = Field(default="development", env="ENVIRONMENT")
-    debug: bool = Field(default=False, env="DEBUG")
+    environment: str = Field(default="development")
+    debug: bool = Field(default=False)
     
     # Database
-    database_url: str = Field(default="postgresql://localhost:5432/aivida", env="DATABASE_URL")
-    database_pool_size: int = Field(default=10, env="DATABASE_POOL_SIZE")
+    database_url: str = Field(default="postgresql://localhost:5432/aivida")
+    database_pool_size: int = Field(default=10)
+    database_acquire_timeout: float = Field(default=2.0)  # seconds
     
     # Redis
-    redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
-    redis_password: str = Field(default="", env="REDIS_PASSWORD")
+    redis_url: str = Field(default="redis://localhost:6379")
+    redis_password: str = Field(default="")
     
     # Security
     secret_key: str = Field(default="dev-secret-key-change-in-production")
@@ -33,13 +53,13 @@ class Settings(BaseSettings):
     )
     
     # AI Services
-    openai_api_key: str = Field(default="", env="OPENAI_API_KEY")
+    openai_api_key: str = Field(default="")
     openai_model: str = Field(default="gpt-4")
     
     # File Processing
     max_file_size: int = Field(default=10 * 1024 * 1024)  # 10MB
-    allowed_file_types: List[str] = Field(
-        default=["pdf", "txt", "json"]
+    allowed_file_types: FrozenSet[str] = Field(
+        default=frozenset({"pdf", "txt", "json"})
     )
     upload_directory: str = Field(default="/tmp/uploads")
     
@@ -48,39 +68,42 @@ class Settings(BaseSettings):
     fhir_auth_token: str = Field(default="")
     
     # HL7 Settings
-    hl7_endpoint: str = Field(default="", env="HL7_ENDPOINT")
-    hl7_auth_token: str = Field(default="", env="HL7_AUTH_TOKEN")
+    hl7_endpoint: str = Field(default="")
+    hl7_auth_token: str = Field(default="")
+    hl7_max_message_size: int = Field(default=10 * 1024 * 1024)  # 10M characters
     
     # Logging
-    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_level: str = Field(default="INFO")
     log_format: str = Field(
-        default="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        env="LOG_FORMAT"
+        default="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
     
     # HIPAA Compliance
-    audit_logging: bool = Field(default=True, env="AUDIT_LOGGING")
-    data_retention_days: int = Field(default=2555, env="DATA_RETENTION_DAYS")  # ~7 years
-    encryption_key: str = Field(default="dev-encryption-key-change-in-production", env="ENCRYPTION_KEY")
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    audit_logging: bool = Field(default=True)
+    data_retention_days: int = Field(default=2555)  # ~7 years
+    encryption_key: str = Field(default="dev-encryption-key-change-in-production")
     
-    @property
+    # Settings are read once at startup, so these are resolved on first
+    # access instead of re-lowercasing the environment on every request.
+    @cached_property
     def is_production(self) -> bool:
         return self.environment.lower() == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         return self.environment.lower() == "development"
     
     def current_timestamp(self) -> str:
-        return datetime.utcnow().isoformat() + "Z"
+        return utc_timestamp()
+
+
+_settings: Optional[Settings] = None
 
 
-@lru_cache()
 def get_settings() -> Settings:
     """Get cached application settings"""
-    return Settings()
+    global _settings
+    settings = _settings
+    if settings is None:
+        settings = _settings = Settings()
+    return settings
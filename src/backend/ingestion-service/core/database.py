@@ -2,10 +2,13 @@
 Database connection and initialization
 """
 
+import asyncio
 import asyncpg
 import logging
+import orjson
 from typing import Optional
 from contextlib import asynccontextmanager
+from fastapi import HTTPException
 
 from .config import get_settings
 
@@ -20,6 +23,24 @@ def get_settings_safe():
     return get_settings()
 
 
+def _encode_json(value) -> str:
+    """Encode a Python value for a json/jsonb parameter"""
+    return orjson.dumps(value).decode()
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Per-connection setup run once when the pool opens a connection"""
+    # JSON columns round-trip as Python objects, encoded and decoded by orjson
+    for type_name in ('json', 'jsonb'):
+        await conn.set_type_codec(
+            type_name,
+            encoder=_encode_json,
+            decoder=orjson.loads,
+            schema='pg_catalog',
+            format='text'
+        )
+
+
 async def init_database():
     """Initialize database connection pool"""
     global _connection_pool
@@ -29,9 +50,24 @@ async def init_database():
     try:
         _connection_pool = await asyncpg.create_pool(
             settings.database_url,
-            min_size=2,
+            # Keep enough warm connections for baseline load to avoid
+            # paying the connection handshake on bursts of uploads
+            min_size=min(
+                max(4, settings.database_pool_size // 2), settings.database_pool_size
+            ),
             max_size=settings.database_pool_size,
-            command_timeout=60
+            command_timeout=60,
+            init=_init_connection,
+            server_settings={
+                # JIT compilation only slows down short OLTP queries
+                "jit": "off",
+                "application_name": settings.app_name
+            },
+            # Keep prepared statements for the fixed set of service queries
+            # alive for the life of the connection instead of re-parsing them
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
+            max_inactive_connection_lifetime=300
         )
         logger.info("Database connection pool initialized")
         
@@ -61,10 +97,33 @@ async def get_db_connection():
         await _connection_pool.release(conn)
 
 
-async def _create_tables():
-    """Create necessary database tables"""
-    create_tables_sql = """
-    -- Discharge summaries table
+async def db_connection():
+    """FastAPI dependency yielding a pooled connection for the request.
+    
+    Acquiring gives up after database_acquire_timeout so an exhausted pool
+    fails the request with a 503 instead of queueing it indefinitely.
+    """
+    if _connection_pool is None:
+        raise RuntimeError("Database not initialized")
+    
+    try:
+        conn = await _connection_pool.acquire(
+            timeout=get_settings_safe().database_acquire_timeout
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503, detail="Database busy, please retry shortly"
+        )
+    try:
+        yield conn
+    finally:
+        await _connection_pool.release(conn)
+
+
+# Schema DDL as individual statements, kept at module scope so it is built once
+_CREATE_TABLE_STATEMENTS = (
+    # Discharge summaries table
+    """
     CREATE TABLE IF NOT EXISTS discharge_summaries (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
         patient_id VARCHAR(255),
@@ -79,9 +138,10 @@ async def _create_tables():
         processed_at TIMESTAMP WITH TIME ZONE,
         status VARCHAR(20) DEFAULT 'pending',
         metadata JSONB DEFAULT '{}'::jsonb
-    );
-
-    -- Medications table
+    )
+    """,
+    # Medications table
+    """
     CREATE TABLE IF NOT EXISTS medications (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
         discharge_summary_id UUID REFERENCES discharge_summaries(id),
@@ -95,9 +155,10 @@ async def _create_tables():
         ndc_code VARCHAR(50),
         route VARCHAR(100),
         created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-
-    -- Appointments table
+    )
+    """,
+    # Appointments table
+    """
     CREATE TABLE IF NOT EXISTS appointments (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
         discharge_summary_id UUID REFERENCES discharge_summaries(id),
@@ -111,9 +172,10 @@ async def _create_tables():
         instructions TEXT,
         preparation_notes TEXT,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-    );
-
-    -- Processing logs for audit trail
+    )
+    """,
+    # Processing logs for audit trail
+    """
     CREATE TABLE IF NOT EXISTS processing_logs (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
         discharge_summary_id UUID REFERENCES discharge_summaries(id),
@@ -123,20 +185,108 @@ async def _create_tables():
         completed_at TIMESTAMP WITH TIME ZONE,
         error_message TEXT,
         metadata JSONB DEFAULT '{}'::jsonb
-    );
-
-    -- Create indexes for better performance
-    CREATE INDEX IF NOT EXISTS idx_discharge_summaries_patient_id ON discharge_summaries(patient_id);
-    CREATE INDEX IF NOT EXISTS idx_discharge_summaries_status ON discharge_summaries(status);
-    CREATE INDEX IF NOT EXISTS idx_discharge_summaries_created_at ON discharge_summaries(created_at);
-    CREATE INDEX IF NOT EXISTS idx_medications_discharge_id ON medications(discharge_summary_id);
-    CREATE INDEX IF NOT EXISTS idx_appointments_discharge_id ON appointments(discharge_summary_id);
-    CREATE INDEX IF NOT EXISTS idx_processing_logs_discharge_id ON processing_logs(discharge_summary_id);
-    """
-    
+    )
+    """,
+)
+
+# Index name -> definition. Built CONCURRENTLY so adding an index to an
+# existing deployment does not block writes; each one runs as its own
+# statement because CONCURRENTLY is not allowed inside a transaction block.
+_INDEXES = {
+    "idx_discharge_summaries_patient_id": "discharge_summaries(patient_id)",
+    "idx_discharge_summaries_status": "discharge_summaries(status)",
+    # Serves the newest-first keyset pagination of the document list
+    "idx_discharge_summaries_created_at_id": "discharge_summaries(created_at, id)",
+    "idx_medications_discharge_id": "medications(discharge_summary_id)",
+    "idx_appointments_discharge_id": "appointments(discharge_summary_id)",
+    "idx_processing_logs_discharge_id": "processing_logs(discharge_summary_id)",
+}
+
+# Indexes replaced by an entry above, dropped from databases that still have them
+_RETIRED_INDEXES = [
+    # Superseded by idx_discharge_summaries_created_at_id
+    "idx_discharge_summaries_created_at",
+]
+
+_TABLES = [
+    "discharge_summaries",
+    "medications",
+    "appointments",
+    "processing_logs",
+]
+
+# Warm restarts skip the DDL when every table exists, every index exists and
+# is valid (a CONCURRENTLY build that failed part-way leaves an INVALID
+# index behind), and no retired index is left
+_SCHEMA_READY_QUERY = """
+SELECT (SELECT bool_and(to_regclass(name) IS NOT NULL)
+        FROM unnest($1::text[]) AS name)
+   AND (SELECT count(*) = cardinality($2::text[]) FROM pg_index
+        WHERE indisvalid
+          AND indexrelid = ANY(
+              SELECT to_regclass(name) FROM unnest($2::text[]) AS name
+          ))
+   AND (SELECT bool_and(to_regclass(name) IS NULL)
+        FROM unnest($3::text[]) AS name)
+"""
+
+_INVALID_INDEXES_QUERY = """
+SELECT indexrelid::regclass::text AS name FROM pg_index
+WHERE NOT indisvalid
+  AND indexrelid = ANY(SELECT to_regclass(name) FROM unnest($1::text[]) AS name)
+"""
+
+# Session advisory lock serializing schema setup across server workers that
+# start together, and how often a waiting worker retries it
+SCHEMA_SETUP_LOCK_ID = 0x41495644  # "AIVD"
+SCHEMA_SETUP_LOCK_POLL_SECONDS = 0.2
+
+
+async def _create_tables():
+    """Create necessary database tables"""
     async with get_db_connection() as conn:
-        await conn.execute(create_tables_sql)
-        logger.info("Database tables created/verified")
+        # Polled rather than a blocking pg_advisory_lock: a CONCURRENTLY
+        # build waits out every open snapshot, including that of a worker
+        # blocked on the lock, which would deadlock the two
+        while not await conn.fetchval(
+            "SELECT pg_try_advisory_lock($1)", SCHEMA_SETUP_LOCK_ID
+        ):
+            await asyncio.sleep(SCHEMA_SETUP_LOCK_POLL_SECONDS)
+        try:
+            await _create_tables_locked(conn)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", SCHEMA_SETUP_LOCK_ID)
+
+
+async def _create_tables_locked(conn):
+    """Create tables and indexes; the caller holds the schema setup lock"""
+    # Warm restarts: a single catalog lookup instead of re-running the DDL
+    schema_ready = await conn.fetchval(
+        _SCHEMA_READY_QUERY, _TABLES, list(_INDEXES), _RETIRED_INDEXES
+    )
+    if schema_ready:
+        logger.info("Database tables verified")
+        return
+    
+    # One transaction keeps first-run table creation all-or-nothing,
+    # as the single multi-statement string was
+    async with conn.transaction():
+        for statement in _CREATE_TABLE_STATEMENTS:
+            await conn.execute(statement)
+    
+    # IF NOT EXISTS would accept a leftover INVALID index, so rebuild those
+    for row in await conn.fetch(_INVALID_INDEXES_QUERY, list(_INDEXES)):
+        logger.warning(f"Rebuilding invalid index {row['name']}")
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {row['name']}")
+    
+    for index_name, definition in _INDEXES.items():
+        await conn.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {definition}"
+        )
+    for index_name in _RETIRED_INDEXES:
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+    
+    logger.info("Database tables created/verified")
 
 
 async def close_database():
@@ -4,39 +4,59 @@ Logging configuration for the Data Ingestion Service
 
 import logging
 import logging.handlers
+import queue
+import re
 import sys
+import time
 from typing import Dict, Any
-import json
-from datetime import datetime
+import orjson
 
-from .config import get_settings
+from .config import get_settings, utc_timestamp
 
 settings = get_settings()
 
+# Any datetimes carried in audit metadata are rendered in UTC with a "Z" suffix
+_AUDIT_JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+# Common PHI markers, matched case-insensitively as plain substrings
+_SENSITIVE_PATTERNS = (
+    'ssn', 'social security', 'patient_name', 'dob', 'date_of_birth',
+    'phone', 'address', 'email', 'mrn', 'medical record number'
+)
+
+# Single alternation compiled once so each record is scanned in one pass
+_PHI_RE = re.compile('|'.join(map(re.escape, _SENSITIVE_PATTERNS)), re.IGNORECASE)
+
+# Third-party loggers and the levels applied to them by setup_logging
+_LIBRARY_LOG_LEVELS = {
+    logging.getLogger('uvicorn'): logging.INFO,
+    logging.getLogger('fastapi'): logging.INFO,
+    logging.getLogger('asyncpg'): logging.WARNING,
+}
+
 
 class HIPAAFormatter(logging.Formatter):
     """Custom formatter that ensures HIPAA compliance in logs"""
     
+    # The pattern has no milliseconds, so skip the msec suffix entirely
+    default_msec_format = None
+    
     def __init__(self):
         super().__init__(
             fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S UTC'
         )
     
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        # gmtime: timestamps are labelled UTC and need no timezone lookup
+        return time.strftime(datefmt or self.datefmt, time.gmtime(record.created))
+    
     def format(self, record: logging.LogRecord) -> str:
         # Ensure no PHI is logged
         if hasattr(record, 'msg'):
             # Simple check for common PHI patterns
-            sensitive_patterns = [
-                'ssn', 'social security', 'patient_name', 'dob', 'date_of_birth',
-                'phone', 'address', 'email', 'mrn', 'medical record number'
-            ]
-            
-            msg_lower = str(record.msg).lower()
-            for pattern in sensitive_patterns:
-                if pattern in msg_lower:
-                    record.msg = "[REDACTED - POTENTIAL PHI]"
-                    break
+            if _PHI_RE.search(str(record.msg)):
+                record.msg = "[REDACTED - POTENTIAL PHI]"
         
         return super().format(record)
 
@@ -53,19 +73,32 @@ class AuditLogger:
             handler = logging.handlers.RotatingFileHandler(
                 '/var/log/aivida/audit.log',
                 maxBytes=100*1024*1024,  # 100MB
-                backupCount=10
+                backupCount=10,
+                delay=True
             )
         else:
             handler = logging.StreamHandler(sys.stdout)
         
         handler.setFormatter(HIPAAFormatter())
-        self.logger.addHandler(handler)
+        
+        # Request handlers only enqueue the record; a background thread
+        # performs the blocking write so the event loop is never stalled
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, handler, respect_handler_level=True
+        )
+        self._listener.start()
+    
+    def close(self):
+        """Flush pending audit records and stop the writer thread"""
+        self._listener.stop()
     
     def log_access(self, user_id: str, resource: str, action: str, 
                    ip_address: str = None, metadata: Dict[str, Any] = None):
         """Log access events for audit trail"""
         audit_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": utc_timestamp(),
             "event_type": "access",
             "user_id": user_id,
             "resource": resource,
@@ -74,14 +107,14 @@ class AuditLogger:
             "metadata": metadata or {}
         }
         
-        self.logger.info(json.dumps(audit_entry))
+        self.logger.info(orjson.dumps(audit_entry, option=_AUDIT_JSON_OPTIONS).decode())
     
     def log_data_processing(self, user_id: str, document_id: str, 
                           operation: str, status: str, 
                           metadata: Dict[str, Any] = None):
         """Log data processing events"""
         audit_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": utc_timestamp(),
             "event_type": "data_processing",
             "user_id": user_id,
             "document_id": document_id,
@@ -90,7 +123,7 @@ class AuditLogger:
             "metadata": metadata or {}
         }
         
-        self.logger.info(json.dumps(audit_entry))
+        self.logger.info(orjson.dumps(audit_entry, option=_AUDIT_JSON_OPTIONS).decode())
 
 
 def setup_logging():
@@ -113,15 +146,15 @@ def setup_logging():
         file_handler = logging.handlers.RotatingFileHandler(
             '/var/log/aivida/application.log',
             maxBytes=50*1024*1024,  # 50MB
-            backupCount=5
+            backupCount=5,
+            delay=True
         )
         file_handler.setFormatter(HIPAAFormatter())
         root_logger.addHandler(file_handler)
     
     # Set library log levels
-    logging.getLogger('uvicorn').setLevel(logging.INFO)
-    logging.getLogger('fastapi').setLevel(logging.INFO)
-    logging.getLogger('asyncpg').setLevel(logging.WARNING)
+    for library_logger, level in _LIBRARY_LOG_LEVELS.items():
+        library_logger.setLevel(level)
     
     logging.info("Logging configured successfully")
 
@@ -5,17 +5,20 @@ Main FastAPI application for processing discharge summaries and clinical data
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 import uvicorn
 import logging
+import os
 from contextlib import asynccontextmanager
 
-from routers.upload import router as upload_router
-from routers.fhir import router as fhir_router
+from routers.upload import router as upload_router, close_discharge_insert_batcher
+from routers.fhir import router as fhir_router, close_fhir_insert_batchers
 from routers.hl7 import router as hl7_router
 from core.config import get_settings
-from core.database import get_database_connection, init_database
-from core.logging_config import setup_logging
+from core.database import get_db_connection, init_database
+from core.logging_config import setup_logging, audit_logger
+from processors.pdf_parser import shutdown_pdf_process_pool
 
 # Setup logging
 setup_logging()
@@ -24,6 +27,14 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 settings = get_settings()
 
+# CORS policy; browsers may cache preflight responses for CORS_MAX_AGE seconds
+CORS_METHODS = ("GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS")
+# x-content-sha256 carries the hash for the HEAD /api/v1/upload/document pre-flight
+CORS_HEADERS = ("authorization", "content-type", "x-content-sha256")
+# The document list's keyset cursor for the next page
+CORS_EXPOSE_HEADERS = ("X-Next-Before-Created-At", "X-Next-Before-Id")
+CORS_MAX_AGE = 600
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -39,6 +50,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down AI-Vida Data Ingestion Service")
+    await close_discharge_insert_batcher()
+    await close_fhir_insert_batchers()
+    shutdown_pdf_process_pool()
+    audit_logger.close()
 
 
 # Create FastAPI application
@@ -46,8 +61,12 @@ app = FastAPI(
     title="AI-Vida Data Ingestion Service",
     description="HIPAA-compliant service for processing discharge summaries and clinical data",
     version="2.0.0",
-    docs_url="/docs" if settings.environment != "production" else None,
-    redoc_url="/redoc" if settings.environment != "production" else None,
+    # No schema in production: the docs are disabled there, so building
+    # the OpenAPI document on a stray /openapi.json hit is wasted work
+    openapi_url=None if settings.is_production else "/openapi.json",
+    docs_url=None if settings.is_production else "/docs",
+    redoc_url=None if settings.is_production else "/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -56,8 +75,10 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
+    allow_methods=CORS_METHODS,
+    allow_headers=CORS_HEADERS,
+    expose_headers=CORS_EXPOSE_HEADERS,
+    max_age=CORS_MAX_AGE,
 )
 
 # Include routers
@@ -81,8 +102,8 @@ async def health_check():
     """Detailed health check"""
     try:
         # Check database connection
-        db = await get_database_connection()
-        await db.execute("SELECT 1")
+        async with get_db_connection() as conn:
+            await conn.fetchval("SELECT 1")
         
         return {
             "status": "healthy",
@@ -99,6 +120,12 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8001,
-        reload=settings.environment == "development",
-        log_level="info"
+        # libuv event loop and C HTTP parser instead of asyncio + h11
+        loop="uvloop",
+        http="httptools",
+        reload=settings.is_development,
+        workers=None if settings.is_development else os.cpu_count(),
+        log_level="info",
+        # Requests are already recorded by the audit logger in production
+        access_log=not settings.is_production
     )
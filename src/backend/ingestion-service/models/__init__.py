@@ -2,14 +2,22 @@
 Data models initialization
 """
 
+from .base import SHARED_MODEL_CONFIG, TrustedModelMixin, UTCDatetime
+
 from .discharge import (
     DischargeSummary,
     DischargeSummaryCreate,
     DischargeSummaryUpdate,
     DischargeSummaryResponse,
     ProcessedContent,
+    MedicationDict,
+    AppointmentDict,
     DocumentStatus,
-    DocumentType
+    DocumentType,
+    DocumentStatusValue,
+    DocumentTypeValue,
+    DOCUMENT_STATUSES,
+    DOCUMENT_TYPES
 )
 
 from .medication import (
@@ -20,7 +28,12 @@ from .medication import (
     MedicationList,
     MedicationSchedule,
     MedicationRoute,
-    MedicationFrequency
+    MedicationFrequency,
+    MedicationRouteValue,
+    MedicationFrequencyValue,
+    MEDICATION_ROUTES,
+    MEDICATION_FREQUENCIES,
+    MEDICATION_SUMMARY_LIST_ADAPTER
 )
 
 from .appointment import (
@@ -32,18 +45,34 @@ from .appointment import (
     AppointmentCalendarEvent,
     AppointmentReminder,
     AppointmentType,
-    AppointmentStatus
+    AppointmentStatus,
+    AppointmentTypeValue,
+    AppointmentStatusValue,
+    APPOINTMENT_TYPES,
+    APPOINTMENT_STATUSES,
+    APPOINTMENT_SUMMARY_LIST_ADAPTER
 )
 
 __all__ = [
+    # Shared helpers
+    'SHARED_MODEL_CONFIG',
+    'TrustedModelMixin',
+    'UTCDatetime',
+    
     # Discharge models
     'DischargeSummary',
     'DischargeSummaryCreate',
     'DischargeSummaryUpdate',
     'DischargeSummaryResponse',
     'ProcessedContent',
+    'MedicationDict',
+    'AppointmentDict',
     'DocumentStatus',
     'DocumentType',
+    'DocumentStatusValue',
+    'DocumentTypeValue',
+    'DOCUMENT_STATUSES',
+    'DOCUMENT_TYPES',
     
     # Medication models
     'Medication',
@@ -54,6 +83,11 @@ __all__ = [
     'MedicationSchedule',
     'MedicationRoute',
     'MedicationFrequency',
+    'MedicationRouteValue',
+    'MedicationFrequencyValue',
+    'MEDICATION_ROUTES',
+    'MEDICATION_FREQUENCIES',
+    'MEDICATION_SUMMARY_LIST_ADAPTER',
     
     # Appointment models
     'Appointment',
@@ -64,5 +98,10 @@ __all__ = [
     'AppointmentCalendarEvent',
     'AppointmentReminder',
     'AppointmentType',
-    'AppointmentStatus'
+    'AppointmentStatus',
+    'AppointmentTypeValue',
+    'AppointmentStatusValue',
+    'APPOINTMENT_TYPES',
+    'APPOINTMENT_STATUSES',
+    'APPOINTMENT_SUMMARY_LIST_ADAPTER'
 ]
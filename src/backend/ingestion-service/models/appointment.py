@@ -2,12 +2,14 @@
 Appointment data models
 """
 
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from dataclasses import dataclass
+from typing import Annotated, FrozenSet, Literal, Optional, List, Dict, Any, get_args
+from pydantic import BaseModel, Field, TypeAdapter, validator
 from enum import Enum
 import uuid
 
+from .base import SHARED_MODEL_CONFIG, TrustedModelMixin, UTCDatetime
+
 
 class AppointmentType(str, Enum):
     """Types of medical appointments"""
@@ -23,6 +25,21 @@ class AppointmentType(str, Enum):
     TELEHEALTH = "telehealth"
 
 
+AppointmentTypeValue = Literal[
+    "follow_up",
+    "specialist",
+    "primary_care",
+    "lab_work",
+    "imaging",
+    "procedure",
+    "therapy",
+    "surgery",
+    "emergency",
+    "telehealth"
+]
+APPOINTMENT_TYPES: FrozenSet[str] = frozenset(get_args(AppointmentTypeValue))
+
+
 class AppointmentStatus(str, Enum):
     """Appointment status"""
     SCHEDULED = "scheduled"
@@ -33,12 +50,23 @@ class AppointmentStatus(str, Enum):
     RESCHEDULED = "rescheduled"
 
 
+AppointmentStatusValue = Literal[
+    "scheduled",
+    "confirmed",
+    "cancelled",
+    "completed",
+    "no_show",
+    "rescheduled"
+]
+APPOINTMENT_STATUSES: FrozenSet[str] = frozenset(get_args(AppointmentStatusValue))
+
+
 class AppointmentBase(BaseModel):
     """Base appointment model"""
-    appointment_type: AppointmentType = Field(..., description="Type of appointment")
+    appointment_type: AppointmentTypeValue = Field(..., description="Type of appointment")
     provider_name: str = Field(..., description="Healthcare provider name")
     department: Optional[str] = Field(None, description="Hospital department")
-    appointment_date: datetime = Field(..., description="Appointment date and time")
+    appointment_date: UTCDatetime = Field(..., description="Appointment date and time")
     location: Optional[str] = Field(None, description="Appointment location")
     address: Optional[str] = Field(None, description="Full address")
     phone: Optional[str] = Field(None, description="Contact phone number")
@@ -66,10 +94,10 @@ class AppointmentCreate(AppointmentBase):
 
 class AppointmentUpdate(BaseModel):
     """Model for updating appointments"""
-    appointment_type: Optional[AppointmentType] = None
+    appointment_type: Optional[AppointmentTypeValue] = None
     provider_name: Optional[str] = None
     department: Optional[str] = None
-    appointment_date: Optional[datetime] = None
+    appointment_date: Optional[UTCDatetime] = None
     location: Optional[str] = None
     address: Optional[str] = None
     phone: Optional[str] = None
@@ -77,61 +105,47 @@ class AppointmentUpdate(BaseModel):
     preparation_notes: Optional[str] = None
 
 
-class Appointment(AppointmentBase):
+class Appointment(TrustedModelMixin, AppointmentBase):
     """Complete appointment model"""
     id: uuid.UUID = Field(..., description="Unique identifier")
     discharge_summary_id: uuid.UUID = Field(..., description="Associated discharge summary ID")
-    created_at: datetime = Field(..., description="Creation timestamp")
+    created_at: UTCDatetime = Field(..., description="Creation timestamp")
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z",
-            uuid.UUID: str
-        }
+    model_config = SHARED_MODEL_CONFIG
 
 
-class AppointmentSummary(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AppointmentSummary:
     """Simplified appointment summary for patient view"""
-    type: str = Field(..., description="Type of appointment (patient-friendly)")
-    provider: str = Field(..., description="Doctor or provider name")
-    date: str = Field(..., description="Formatted date")
-    time: str = Field(..., description="Formatted time")
-    location: Optional[str] = Field(None, description="Where to go")
-    department: Optional[str] = Field(None, description="Which department")
-    phone: Optional[str] = Field(None, description="Contact number")
-    preparation: Optional[str] = Field(None, description="How to prepare")
-    important_notes: Optional[str] = Field(None, description="Important information")
-
-
-class AppointmentCalendarEvent(BaseModel):
+    type: Annotated[str, Field(description="Type of appointment (patient-friendly)")]
+    provider: Annotated[str, Field(description="Doctor or provider name")]
+    date: Annotated[str, Field(description="Formatted date")]
+    time: Annotated[str, Field(description="Formatted time")]
+    location: Annotated[Optional[str], Field(description="Where to go")] = None
+    department: Annotated[Optional[str], Field(description="Which department")] = None
+    phone: Annotated[Optional[str], Field(description="Contact number")] = None
+    preparation: Annotated[Optional[str], Field(description="How to prepare")] = None
+    important_notes: Annotated[Optional[str], Field(description="Important information")] = None
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AppointmentCalendarEvent:
     """Calendar event format for .ics export"""
-    title: str = Field(..., description="Event title")
-    start_datetime: datetime = Field(..., description="Start date and time")
-    end_datetime: datetime = Field(..., description="End date and time")
-    location: Optional[str] = Field(None, description="Event location")
-    description: Optional[str] = Field(None, description="Event description")
-    provider: str = Field(..., description="Provider name")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z"
-        }
+    title: Annotated[str, Field(description="Event title")]
+    start_datetime: Annotated[UTCDatetime, Field(description="Start date and time")]
+    end_datetime: Annotated[UTCDatetime, Field(description="End date and time")]
+    location: Annotated[Optional[str], Field(description="Event location")] = None
+    description: Annotated[Optional[str], Field(description="Event description")] = None
+    provider: Annotated[str, Field(description="Provider name")]
 
 
 class AppointmentReminder(BaseModel):
     """Appointment reminder settings"""
     appointment_id: uuid.UUID
     reminder_type: str = Field(..., description="Type of reminder (email, sms, etc.)")
-    reminder_time: datetime = Field(..., description="When to send reminder")
+    reminder_time: UTCDatetime = Field(..., description="When to send reminder")
     message: str = Field(..., description="Reminder message")
     status: str = Field(default="pending", description="Reminder status")
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z",
-            uuid.UUID: str
-        }
 
 
 class AppointmentList(BaseModel):
@@ -141,3 +155,8 @@ class AppointmentList(BaseModel):
     next_appointment: Optional[AppointmentSummary] = Field(None, description="Next upcoming appointment")
     calendar_events: List[AppointmentCalendarEvent] = Field(..., description="Calendar format events")
     important_reminders: List[str] = Field(default_factory=list, description="Important reminders")
+
+
+# Built once at import: serializes summary lists straight to JSON bytes
+# without wrapping them in an AppointmentList
+APPOINTMENT_SUMMARY_LIST_ADAPTER = TypeAdapter(List[AppointmentSummary])
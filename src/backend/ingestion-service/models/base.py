@@ -0,0 +1,39 @@
+"""
+Shared model helpers
+"""
+
+from datetime import datetime, timezone
+from typing import Annotated, Any, Dict
+
+from pydantic import AfterValidator, ConfigDict
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC and normalize aware ones to UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+# Datetimes are held as aware UTC so pydantic-core's native ISO 8601
+# serialization emits a trailing "Z" without any custom encoder
+UTCDatetime = Annotated[datetime, AfterValidator(_as_utc)]
+
+# Shared by the read-side models, which are built from ORM-style rows and
+# never mutated after construction
+SHARED_MODEL_CONFIG = ConfigDict(from_attributes=True, frozen=True, extra='ignore')
+
+
+class TrustedModelMixin:
+    """Construction helper for data that has already been validated"""
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]):
+        """
+        Build the model without running validation.
+        
+        Only for data the service produced itself or read back from its own
+        database; anything arriving over HTTP must go through normal
+        validation. Nested-model fields must already hold model instances.
+        """
+        return cls.model_construct(**data)
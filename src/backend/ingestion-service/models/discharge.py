@@ -2,12 +2,14 @@
 Discharge summary data models
 """
 
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from typing import FrozenSet, Literal, Optional, List, Dict, Any, get_args
+from pydantic import BaseModel, ConfigDict, Field, with_config
+from typing_extensions import NotRequired, TypedDict
 from enum import Enum
 import uuid
 
+from .base import SHARED_MODEL_CONFIG, TrustedModelMixin, UTCDatetime
+
 
 class DocumentStatus(str, Enum):
     """Document processing status"""
@@ -19,6 +21,20 @@ class DocumentStatus(str, Enum):
     PUBLISHED = "published"
 
 
+# Model fields here and in the medication and appointment models are
+# annotated with Literal aliases like this one, which pydantic-core checks
+# faster than Enum members; the enums stay as named constants for callers
+DocumentStatusValue = Literal[
+    "pending",
+    "processing",
+    "completed",
+    "failed",
+    "reviewed",
+    "published"
+]
+DOCUMENT_STATUSES: FrozenSet[str] = frozenset(get_args(DocumentStatusValue))
+
+
 class DocumentType(str, Enum):
     """Supported document types"""
     DISCHARGE_SUMMARY = "discharge_summary"
@@ -27,11 +43,20 @@ class DocumentType(str, Enum):
     PROCEDURE_NOTE = "procedure_note"
 
 
+DocumentTypeValue = Literal[
+    "discharge_summary",
+    "progress_note",
+    "consultation",
+    "procedure_note"
+]
+DOCUMENT_TYPES: FrozenSet[str] = frozenset(get_args(DocumentTypeValue))
+
+
 class DischargeSummaryBase(BaseModel):
     """Base discharge summary model"""
     patient_id: Optional[str] = Field(None, description="Patient identifier")
     admission_id: Optional[str] = Field(None, description="Admission identifier")
-    document_type: DocumentType = DocumentType.DISCHARGE_SUMMARY
+    document_type: DocumentTypeValue = DocumentType.DISCHARGE_SUMMARY.value
     original_content: str = Field(..., description="Original document content")
     source_system: Optional[str] = Field(None, description="Source system identifier")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
@@ -45,72 +70,67 @@ class DischargeSummaryCreate(DischargeSummaryBase):
 class DischargeSummaryUpdate(BaseModel):
     """Model for updating discharge summaries"""
     processed_content: Optional[Dict[str, Any]] = None
-    status: Optional[DocumentStatus] = None
+    status: Optional[DocumentStatusValue] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
-class DischargeSummary(DischargeSummaryBase):
+class DischargeSummary(TrustedModelMixin, DischargeSummaryBase):
     """Complete discharge summary model"""
     id: uuid.UUID = Field(..., description="Unique identifier")
     processed_content: Optional[Dict[str, Any]] = Field(None, description="Processed content")
     file_hash: Optional[str] = Field(None, description="File content hash")
-    status: DocumentStatus = DocumentStatus.PENDING
-    created_at: datetime = Field(..., description="Creation timestamp")
-    updated_at: datetime = Field(..., description="Last update timestamp")
-    processed_at: Optional[datetime] = Field(None, description="Processing completion timestamp")
+    status: DocumentStatusValue = DocumentStatus.PENDING.value
+    created_at: UTCDatetime = Field(..., description="Creation timestamp")
+    updated_at: UTCDatetime = Field(..., description="Last update timestamp")
+    processed_at: Optional[UTCDatetime] = Field(None, description="Processing completion timestamp")
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z",
-            uuid.UUID: str
-        }
+    model_config = SHARED_MODEL_CONFIG
+
+
+# Item shapes for ProcessedContent lists; pydantic-core checks the required
+# keys itself, and extra keys are kept as they were with plain dicts
+_PROCESSED_ITEM_CONFIG = ConfigDict(extra='allow')
+
 
+@with_config(_PROCESSED_ITEM_CONFIG)
+class MedicationDict(TypedDict):
+    """Medication entry in processed content"""
+    name: str
+    dosage: str
+    frequency: str
+    instructions: NotRequired[Optional[str]]
+    duration: NotRequired[Optional[str]]
 
-class ProcessedContent(BaseModel):
+
+@with_config(_PROCESSED_ITEM_CONFIG)
+class AppointmentDict(TypedDict):
+    """Appointment entry in processed content"""
+    type: str
+    date: str
+    provider: str
+    time: NotRequired[Optional[str]]
+    location: NotRequired[Optional[str]]
+
+
+class ProcessedContent(TrustedModelMixin, BaseModel):
     """Structured processed content"""
     summary: Optional[str] = Field(None, description="Patient-friendly summary")
-    medications: List[Dict[str, Any]] = Field(default_factory=list, description="Medication list")
-    appointments: List[Dict[str, Any]] = Field(default_factory=list, description="Appointment list")
+    medications: List[MedicationDict] = Field(default_factory=list, description="Medication list")
+    appointments: List[AppointmentDict] = Field(default_factory=list, description="Appointment list")
     diet_activity: Optional[Dict[str, Any]] = Field(None, description="Diet and activity instructions")
     warning_signs: Optional[Dict[str, Any]] = Field(None, description="Warning signs to watch for")
     emergency_contacts: List[Dict[str, Any]] = Field(default_factory=list, description="Emergency contacts")
-    
-    @validator('medications')
-    def validate_medications(cls, v):
-        """Validate medication structure"""
-        required_fields = ['name', 'dosage', 'frequency']
-        for med in v:
-            for field in required_fields:
-                if field not in med:
-                    raise ValueError(f"Medication missing required field: {field}")
-        return v
-    
-    @validator('appointments')
-    def validate_appointments(cls, v):
-        """Validate appointment structure"""
-        required_fields = ['type', 'date', 'provider']
-        for apt in v:
-            for field in required_fields:
-                if field not in apt:
-                    raise ValueError(f"Appointment missing required field: {field}")
-        return v
-
-
-class DischargeSummaryResponse(BaseModel):
+
+
+class DischargeSummaryResponse(TrustedModelMixin, BaseModel):
     """API response model for discharge summaries"""
     id: uuid.UUID
-    status: DocumentStatus
+    status: DocumentStatusValue
     patient_id: Optional[str]
     admission_id: Optional[str]
-    document_type: DocumentType
-    created_at: datetime
-    processed_at: Optional[datetime]
+    document_type: DocumentTypeValue
+    created_at: UTCDatetime
+    processed_at: Optional[UTCDatetime]
     processed_content: Optional[ProcessedContent]
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z",
-            uuid.UUID: str
-        }
+    model_config = SHARED_MODEL_CONFIG
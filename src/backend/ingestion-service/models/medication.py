@@ -2,12 +2,14 @@
 Medication data models
 """
 
-from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+from dataclasses import dataclass
+from typing import Annotated, FrozenSet, Literal, Optional, List, get_args
+from pydantic import BaseModel, Field, TypeAdapter, validator
 from enum import Enum
 import uuid
 
+from .base import SHARED_MODEL_CONFIG, TrustedModelMixin, UTCDatetime
+
 
 class MedicationRoute(str, Enum):
     """Medication administration routes"""
@@ -24,6 +26,22 @@ class MedicationRoute(str, Enum):
     NASAL = "nasal"
 
 
+MedicationRouteValue = Literal[
+    "oral",
+    "intravenous",
+    "intramuscular",
+    "subcutaneous",
+    "topical",
+    "inhaled",
+    "sublingual",
+    "rectal",
+    "ophthalmic",
+    "otic",
+    "nasal"
+]
+MEDICATION_ROUTES: FrozenSet[str] = frozenset(get_args(MedicationRouteValue))
+
+
 class MedicationFrequency(str, Enum):
     """Common medication frequencies"""
     ONCE_DAILY = "once_daily"
@@ -42,6 +60,25 @@ class MedicationFrequency(str, Enum):
     AFTER_MEALS = "after_meals"
 
 
+MedicationFrequencyValue = Literal[
+    "once_daily",
+    "twice_daily",
+    "three_times_daily",
+    "four_times_daily",
+    "every_4_hours",
+    "every_6_hours",
+    "every_8_hours",
+    "every_12_hours",
+    "as_needed",
+    "bedtime",
+    "morning",
+    "with_meals",
+    "before_meals",
+    "after_meals"
+]
+MEDICATION_FREQUENCIES: FrozenSet[str] = frozenset(get_args(MedicationFrequencyValue))
+
+
 class MedicationBase(BaseModel):
     """Base medication model"""
     medication_name: str = Field(..., description="Brand or generic medication name")
@@ -50,7 +87,7 @@ class MedicationBase(BaseModel):
     frequency: str = Field(..., description="How often to take medication")
     duration: Optional[str] = Field(None, description="How long to take medication")
     instructions: Optional[str] = Field(None, description="Special instructions")
-    route: Optional[MedicationRoute] = Field(MedicationRoute.ORAL, description="Administration route")
+    route: Optional[MedicationRouteValue] = Field(MedicationRoute.ORAL.value, description="Administration route")
     
     @validator('medication_name')
     def validate_medication_name(cls, v):
@@ -80,50 +117,42 @@ class MedicationUpdate(BaseModel):
     frequency: Optional[str] = None
     duration: Optional[str] = None
     instructions: Optional[str] = None
-    route: Optional[MedicationRoute] = None
+    route: Optional[MedicationRouteValue] = None
     rxnorm_code: Optional[str] = None
     ndc_code: Optional[str] = None
 
 
-class Medication(MedicationBase):
+class Medication(TrustedModelMixin, MedicationBase):
     """Complete medication model"""
     id: uuid.UUID = Field(..., description="Unique identifier")
     discharge_summary_id: uuid.UUID = Field(..., description="Associated discharge summary ID")
     rxnorm_code: Optional[str] = Field(None, description="RxNorm concept code")
     ndc_code: Optional[str] = Field(None, description="National Drug Code")
-    created_at: datetime = Field(..., description="Creation timestamp")
+    created_at: UTCDatetime = Field(..., description="Creation timestamp")
     
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() + "Z",
-            uuid.UUID: str
-        }
+    model_config = SHARED_MODEL_CONFIG
 
 
-class MedicationSchedule(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class MedicationSchedule:
     """Medication schedule for patient display"""
     medication_id: uuid.UUID
     medication_name: str
     dosage: str
-    times: List[str] = Field(..., description="List of times to take medication (e.g., ['8:00 AM', '8:00 PM'])")
+    times: Annotated[List[str], Field(description="List of times to take medication (e.g., ['8:00 AM', '8:00 PM'])")]
     instructions: Optional[str] = None
     route: str = "oral"
-    
-    class Config:
-        json_encoders = {
-            uuid.UUID: str
-        }
 
 
-class MedicationSummary(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class MedicationSummary:
     """Simplified medication summary for patient view"""
-    name: str = Field(..., description="Medication name (brand + generic if available)")
-    dosage: str = Field(..., description="How much to take")
-    frequency: str = Field(..., description="How often to take (patient-friendly)")
-    instructions: Optional[str] = Field(None, description="Special instructions")
-    duration: Optional[str] = Field(None, description="How long to take")
-    important_notes: Optional[str] = Field(None, description="Important safety information")
+    name: Annotated[str, Field(description="Medication name (brand + generic if available)")]
+    dosage: Annotated[str, Field(description="How much to take")]
+    frequency: Annotated[str, Field(description="How often to take (patient-friendly)")]
+    instructions: Annotated[Optional[str], Field(description="Special instructions")] = None
+    duration: Annotated[Optional[str], Field(description="How long to take")] = None
+    important_notes: Annotated[Optional[str], Field(description="Important safety information")] = None
 
 
 class MedicationList(BaseModel):
@@ -132,3 +161,8 @@ class MedicationList(BaseModel):
     total_count: int = Field(..., description="Total number of medications")
     daily_schedule: List[MedicationSchedule] = Field(..., description="Daily medication schedule")
     important_reminders: List[str] = Field(default_factory=list, description="Important reminders")
+
+
+# Built once at import: serializes summary lists straight to JSON bytes
+# without wrapping them in a MedicationList
+MEDICATION_SUMMARY_LIST_ADAPTER = TypeAdapter(List[MedicationSummary])
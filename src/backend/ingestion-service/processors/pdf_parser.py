@@ -3,119 +3,356 @@ PDF processing and text extraction
 """
 
 import io
+import os
+import string
 import logging
-from typing import Optional
-import PyPDF2
-from pdfplumber import PDF
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Callable, Optional, Tuple, TypeVar
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Quality score at which an extraction is accepted without trying the
+# remaining (slower or lower-fidelity) methods
+QUALITY_EARLY_EXIT_THRESHOLD = 5.0
+
+# Upper bound on extracted text per document; discharge summaries are a
+# handful of pages, so anything beyond this is treated as outlier input
+MAX_EXTRACTION_CHARS = 500_000
+
+MEDICAL_TERMS = (
+    'patient', 'medication', 'doctor', 'hospital', 'diagnosis',
+    'treatment', 'discharge', 'follow-up', 'appointment', 'dosage',
+    'symptoms', 'condition', 'therapy', 'prescription', 'clinical'
+)
+
+
+def _count_medical_terms(text_lower: str) -> int:
+    """Count how many distinct MEDICAL_TERMS occur in text_lower"""
+    return sum(1 for term in MEDICAL_TERMS if term in text_lower)
+
+# Deletes ASCII alphanumerics and ordinary prose punctuation/whitespace, so
+# only candidate special characters survive str.translate
+_ORDINARY_ASCII = string.ascii_letters + string.digits + ' .,!?\n\t-'
+_ORDINARY_CHARS_TABLE = str.maketrans('', '', _ORDINARY_ASCII)
+_ORDINARY_ASCII_BYTES = _ORDINARY_ASCII.encode('ascii')
+
+# pdfplumber and PyPDF2 are pure-Python and CPU-bound, so extraction runs
+# in worker processes rather than threads that would contend for the GIL.
+# The pool is created on first use so importing this module (and forking
+# server workers) does not spawn processes.
+_PDF_POOL_SIZE = os.cpu_count() or 1
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Caps in-flight PDF jobs so a burst of uploads cannot queue unbounded
+# payloads behind the pool
+_pdf_job_slots = asyncio.Semaphore(_PDF_POOL_SIZE * 2)
+
+
+def _get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Get the shared PDF process pool, creating it on first use"""
+    global _pdf_process_pool
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(max_workers=_PDF_POOL_SIZE)
+    return _pdf_process_pool
+
+
+def shutdown_pdf_process_pool():
+    """Shut down the PDF process pool if it was started"""
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=True, cancel_futures=True)
+        _pdf_process_pool = None
+
+
+def _discard_broken_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next job starts a fresh one"""
+    global _pdf_process_pool
+    # Concurrent jobs all see the same breakage; only the first replaces it
+    if _pdf_process_pool is pool:
+        _pdf_process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pdf_pool(func: Callable[[bytes], T], pdf_content: bytes) -> T:
+    """Run a synchronous PDF function in the process pool"""
+    async with _pdf_job_slots:
+        loop = asyncio.get_running_loop()
+        pool = _get_pdf_process_pool()
+        try:
+            return await loop.run_in_executor(pool, func, pdf_content)
+        except BrokenProcessPool:
+            # A worker died (OOM, or a PDF library crashing on a hostile
+            # file) and took the pool with it. Replace the pool so later
+            # uploads are unaffected and retry this job once; a file that
+            # kills the fresh pool too fails only its own request
+            logger.warning("PDF process pool broke; restarting it and retrying once")
+            _discard_broken_pdf_pool(pool)
+            pool = _get_pdf_process_pool()
+            try:
+                return await loop.run_in_executor(pool, func, pdf_content)
+            except BrokenProcessPool:
+                _discard_broken_pdf_pool(pool)
+                raise
+
+
+def _write_page_text(
+    writer: io.StringIO,
+    page_num: int,
+    page_text: Optional[str]
+) -> int:
+    """Append one page's text to writer, returning the characters written"""
+    if not page_text:
+        return 0
+    return (
+        writer.write(f"--- Page {page_num + 1} ---\n")
+        + writer.write(page_text)
+        + writer.write("\n\n")
+    )
+
+
+def _pdfplumber_extraction(
+    pdf_buffer: BinaryIO,
+    max_chars: int = MAX_EXTRACTION_CHARS
+) -> str:
+    """Synchronous pdfplumber extraction, stopping once max_chars is exceeded"""
+    # PDF libraries are imported where they are used, so only pool workers
+    # that actually parse a PDF pay their import cost
+    import pdfplumber
+
+    total_chars = 0
+
+    with io.StringIO() as writer:
+        with pdfplumber.open(pdf_buffer) as pdf:
+            for page_num, page in enumerate(pdf.pages):
+                try:
+                    total_chars += _write_page_text(
+                        writer, page_num, page.extract_text()
+                    )
+                except Exception as e:
+                    logger.warning(f"Error extracting page {page_num + 1}: {e}")
+                    continue
+                finally:
+                    # Drop the page's parsed layout objects once its text is out
+                    page.close()
+
+                if total_chars > max_chars:
+                    logger.info(f"Stopping PDF extraction after page {page_num + 1}: "
+                                f"text exceeds {max_chars} characters")
+                    break
+
+        return writer.getvalue()
+
+
+def _pypdf2_extraction(
+    pdf_buffer: BinaryIO,
+    max_chars: int = MAX_EXTRACTION_CHARS
+) -> str:
+    """Synchronous PyPDF2 extraction, stopping once max_chars is exceeded"""
+    import PyPDF2
+
+    total_chars = 0
+
+    with io.StringIO() as writer:
+        pdf_reader = PyPDF2.PdfReader(pdf_buffer)
+
+        for page_num, page in enumerate(pdf_reader.pages):
+            try:
+                total_chars += _write_page_text(
+                    writer, page_num, page.extract_text()
+                )
+            except Exception as e:
+                logger.warning(f"Error extracting page {page_num + 1}: {e}")
+                continue
+
+            if total_chars > max_chars:
+                logger.info(f"Stopping PDF extraction after page {page_num + 1}: "
+                            f"text exceeds {max_chars} characters")
+                break
+
+        return writer.getvalue()
+
+
+# Structured extractors in order of preference; later ones only run when
+# earlier ones fail or score below QUALITY_EARLY_EXIT_THRESHOLD
+_STRUCTURED_EXTRACTORS = (_pdfplumber_extraction, _pypdf2_extraction)
+
+
+def _run_structured_extractors(
+    pdf_buffer: BinaryIO
+) -> Optional[Tuple[str, str, float]]:
+    """
+    Run the structured extractors over one buffer, rewinding between them
+    Returns (method, text, quality_score) for the first result at or above
+    the early-exit threshold, otherwise the best result seen, or None
+    """
+    best_result = None
+
+    for extractor in _STRUCTURED_EXTRACTORS:
+        pdf_buffer.seek(0)
+        try:
+            text = extractor(pdf_buffer)
+        except Exception as e:
+            logger.warning(f"PDF extraction method {extractor.__name__} failed: {e}")
+            continue
+
+        if not text or not text.strip():
+            continue
+
+        quality_score = calculate_quality_score(text)
+        if best_result is None or quality_score > best_result[2]:
+            best_result = (extractor.__name__, text, quality_score)
+
+        if quality_score >= QUALITY_EARLY_EXIT_THRESHOLD:
+            break
+
+    return best_result
+
+
+def _extract_best_text(pdf_content: bytes) -> Optional[Tuple[str, str, float]]:
+    """Structured text extraction as a single pool job"""
+    with io.BytesIO(pdf_content) as pdf_buffer:
+        return _run_structured_extractors(pdf_buffer)
+
+
+def _extract_text_and_metadata_sync(
+    pdf_content: bytes
+) -> Tuple[Optional[Tuple[str, str, float]], dict]:
+    """Structured text and metadata extraction as a single pool job"""
+    with io.BytesIO(pdf_content) as pdf_buffer:
+        best_result = _run_structured_extractors(pdf_buffer)
+        pdf_buffer.seek(0)
+        return best_result, _read_metadata(pdf_buffer)
+
+
+def calculate_quality_score(text: str) -> float:
+    """
+    Calculate quality score for extracted text
+    Higher score = better extraction
+    """
+    if not text or len(text.strip()) == 0:
+        return 0.0
+
+    score = 0.0
+
+    # Length bonus (longer text usually better)
+    score += min(len(text) / 1000.0, 10.0)
+
+    # Medical terminology bonus
+    medical_score = _count_medical_terms(text.lower())
+    score += medical_score * 0.5
+
+    # Structure bonus (proper sentences and paragraphs)
+    sentences = text.count('.')
+    paragraphs = text.count('\n\n')
+    score += (sentences / 100.0) + (paragraphs / 10.0)
+
+    # Penalty for too many special characters (indicates poor extraction)
+    if text.isascii():
+        # All-ASCII text (the common case) is counted entirely in C: every
+        # byte left after deleting ordinary characters is a special one
+        special_chars = len(text.encode('ascii').translate(None, _ORDINARY_ASCII_BYTES))
+    else:
+        remaining = text.translate(_ORDINARY_CHARS_TABLE)
+        special_chars = sum(1 for c in remaining if not c.isalnum())
+    special_ratio = special_chars / max(len(text), 1)
+    if special_ratio > 0.3:
+        score *= 0.5
+
+    return score
+
+
+def _read_metadata(pdf_buffer: BinaryIO) -> dict:
+    """Read document metadata from an open PDF buffer"""
+    import PyPDF2
+
+    metadata = {}
+
+    try:
+        pdf_reader = PyPDF2.PdfReader(pdf_buffer)
+
+        # Basic info
+        metadata['page_count'] = len(pdf_reader.pages)
+
+        # Document info
+        if pdf_reader.metadata:
+            info = pdf_reader.metadata
+            metadata['title'] = info.get('/Title', '')
+            metadata['author'] = info.get('/Author', '')
+            metadata['subject'] = info.get('/Subject', '')
+            metadata['creator'] = info.get('/Creator', '')
+            metadata['producer'] = info.get('/Producer', '')
+            metadata['creation_date'] = str(info.get('/CreationDate', ''))
+            metadata['modification_date'] = str(info.get('/ModDate', ''))
+
+        # Security info
+        metadata['encrypted'] = pdf_reader.is_encrypted
+
+    except Exception as e:
+        logger.error(f"Error extracting PDF metadata: {e}")
+        metadata['error'] = str(e)
+
+    return metadata
+
+
+def _extract_metadata_sync(pdf_content: bytes) -> dict:
+    """Synchronous metadata extraction"""
+    with io.BytesIO(pdf_content) as pdf_buffer:
+        return _read_metadata(pdf_buffer)
+
 
 class PDFParser:
     """PDF text extraction with multiple fallback methods"""
     
-    def __init__(self):
-        self.extraction_methods = [
-            self._extract_with_pdfplumber,
-            self._extract_with_pypdf2,
-            self._extract_with_basic_text
-        ]
-    
     async def extract_text(self, pdf_content: bytes) -> str:
         """
-        Extract text from PDF using multiple methods
-        Returns the best extraction result
+        Extract text from PDF, trying methods in order of preference
+        Returns the first result scoring at or above the early-exit
+        threshold, otherwise the best result seen
         """
         
-        results = []
-        
-        for method in self.extraction_methods:
-            try:
-                text = await method(pdf_content)
-                if text and len(text.strip()) > 0:
-                    results.append({
-                        'method': method.__name__,
-                        'text': text,
-                        'length': len(text.strip()),
-                        'quality_score': self._calculate_quality_score(text)
-                    })
-            except Exception as e:
-                logger.warning(f"PDF extraction method {method.__name__} failed: {e}")
-                continue
-        
-        if not results:
-            raise ValueError("Unable to extract text from PDF using any method")
-        
-        # Return the result with the highest quality score
-        best_result = max(results, key=lambda x: x['quality_score'])
-        logger.info(f"PDF extraction successful using {best_result['method']} "
-                   f"(quality: {best_result['quality_score']:.2f})")
-        
-        return best_result['text']
-    
-    async def _extract_with_pdfplumber(self, pdf_content: bytes) -> str:
-        """Extract text using pdfplumber (most accurate for complex layouts)"""
-        try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                None,
-                self._pdfplumber_extraction,
-                pdf_content
-            )
-        except ImportError:
-            raise ValueError("pdfplumber not available")
-    
-    def _pdfplumber_extraction(self, pdf_content: bytes) -> str:
-        """Synchronous pdfplumber extraction"""
-        import pdfplumber
-        
-        text_parts = []
-        
-        with io.BytesIO(pdf_content) as pdf_buffer:
-            with pdfplumber.open(pdf_buffer) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(f"--- Page {page_num + 1} ---\n")
-                            text_parts.append(page_text)
-                            text_parts.append("\n\n")
-                    except Exception as e:
-                        logger.warning(f"Error extracting page {page_num + 1}: {e}")
-                        continue
-        
-        return ''.join(text_parts)
+        # The whole structured chain runs as one pool job so the payload is
+        # shipped to a worker and wrapped in a buffer only once
+        best_result = await _run_in_pdf_pool(_extract_best_text, pdf_content)
+        return await self._finish_extraction(pdf_content, best_result)
     
-    async def _extract_with_pypdf2(self, pdf_content: bytes) -> str:
-        """Extract text using PyPDF2 (fallback method)"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._pypdf2_extraction,
-            pdf_content
+    async def extract_text_and_metadata(self, pdf_content: bytes) -> Tuple[str, dict]:
+        """
+        Extract text and document metadata in a single pool job
+        Prefer this over calling extract_text and
+        PDFMetadataExtractor.extract_metadata separately
+        """
+        best_result, metadata = await _run_in_pdf_pool(
+            _extract_text_and_metadata_sync, pdf_content
         )
+        return await self._finish_extraction(pdf_content, best_result), metadata
     
-    def _pypdf2_extraction(self, pdf_content: bytes) -> str:
-        """Synchronous PyPDF2 extraction"""
-        text_parts = []
+    async def _finish_extraction(
+        self,
+        pdf_content: bytes,
+        best_result: Optional[Tuple[str, str, float]]
+    ) -> str:
+        """Apply the last-resort fallback and log the chosen method"""
+        if best_result is None:
+            # Decoding raw PDF bytes is mostly noise, so it is only used when
+            # no structured extractor produced any text at all
+            text = await self._extract_with_basic_text(pdf_content)
+            if not text or not text.strip():
+                raise ValueError("Unable to extract text from PDF using any method")
+            best_result = (
+                self._extract_with_basic_text.__name__,
+                text,
+                self._calculate_quality_score(text)
+            )
         
-        with io.BytesIO(pdf_content) as pdf_buffer:
-            pdf_reader = PyPDF2.PdfReader(pdf_buffer)
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(f"--- Page {page_num + 1} ---\n")
-                        text_parts.append(page_text)
-                        text_parts.append("\n\n")
-                except Exception as e:
-                    logger.warning(f"Error extracting page {page_num + 1}: {e}")
-                    continue
+        method, text, quality_score = best_result
+        logger.info(f"PDF extraction successful using {method} "
+                   f"(quality: {quality_score:.2f})")
         
-        return ''.join(text_parts)
+        return text
     
     async def _extract_with_basic_text(self, pdf_content: bytes) -> str:
         """Basic text extraction as last resort"""
@@ -126,41 +363,8 @@ class PDFParser:
             return pdf_content.decode('latin-1', errors='ignore')
     
     def _calculate_quality_score(self, text: str) -> float:
-        """
-        Calculate quality score for extracted text
-        Higher score = better extraction
-        """
-        if not text or len(text.strip()) == 0:
-            return 0.0
-        
-        score = 0.0
-        
-        # Length bonus (longer text usually better)
-        score += min(len(text) / 1000.0, 10.0)
-        
-        # Medical terminology bonus
-        medical_terms = [
-            'patient', 'medication', 'doctor', 'hospital', 'diagnosis',
-            'treatment', 'discharge', 'follow-up', 'appointment', 'dosage',
-            'symptoms', 'condition', 'therapy', 'prescription', 'clinical'
-        ]
-        
-        text_lower = text.lower()
-        medical_score = sum(1 for term in medical_terms if term in text_lower)
-        score += medical_score * 0.5
-        
-        # Structure bonus (proper sentences and paragraphs)
-        sentences = text.count('.')
-        paragraphs = text.count('\n\n')
-        score += (sentences / 100.0) + (paragraphs / 10.0)
-        
-        # Penalty for too many special characters (indicates poor extraction)
-        special_chars = sum(1 for c in text if not c.isalnum() and c not in ' .,!?\n\t-')
-        special_ratio = special_chars / max(len(text), 1)
-        if special_ratio > 0.3:
-            score *= 0.5
-        
-        return score
+        """Calculate quality score for extracted text"""
+        return calculate_quality_score(text)
 
 
 class PDFMetadataExtractor:
@@ -169,41 +373,4 @@ class PDFMetadataExtractor:
     @staticmethod
     async def extract_metadata(pdf_content: bytes) -> dict:
         """Extract PDF metadata"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            PDFMetadataExtractor._extract_metadata_sync,
-            pdf_content
-        )
-    
-    @staticmethod
-    def _extract_metadata_sync(pdf_content: bytes) -> dict:
-        """Synchronous metadata extraction"""
-        metadata = {}
-        
-        try:
-            with io.BytesIO(pdf_content) as pdf_buffer:
-                pdf_reader = PyPDF2.PdfReader(pdf_buffer)
-                
-                # Basic info
-                metadata['page_count'] = len(pdf_reader.pages)
-                
-                # Document info
-                if pdf_reader.metadata:
-                    info = pdf_reader.metadata
-                    metadata['title'] = info.get('/Title', '')
-                    metadata['author'] = info.get('/Author', '')
-                    metadata['subject'] = info.get('/Subject', '')
-                    metadata['creator'] = info.get('/Creator', '')
-                    metadata['producer'] = info.get('/Producer', '')
-                    metadata['creation_date'] = str(info.get('/CreationDate', ''))
-                    metadata['modification_date'] = str(info.get('/ModDate', ''))
-                
-                # Security info
-                metadata['encrypted'] = pdf_reader.is_encrypted
-                
-        except Exception as e:
-            logger.error(f"Error extracting PDF metadata: {e}")
-            metadata['error'] = str(e)
-        
-        return metadata
+        return await _run_in_pdf_pool(_extract_metadata_sync, pdf_content)
@@ -2,196 +2,312 @@
 Text processing and normalization utilities
 """
 
-import json
+import io
 import re
 import logging
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
-import asyncio
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import rather than looked up in the re
+# module cache on every call
+_WHITESPACE_RE = re.compile(r'\s+')
+_OCR_ARTIFACT_RE = re.compile(r'[^\w\s\.,!?;:()\-\/]')
+# The same filter for ASCII text as a str.translate deletion table, derived
+# from the regex so the two cannot drift apart
+_OCR_ARTIFACT_TABLE = str.maketrans(
+    '', '', ''.join(chr(cp) for cp in range(128) if _OCR_ARTIFACT_RE.match(chr(cp)))
+)
+# Anything _clean_text could rewrite: a character other than a word character
+# or space (punctuation, artifacts, tabs and line breaks) or a double space
+_NEEDS_CLEANING_RE = re.compile(r'[^\w ]|  ')
+# Collapses period runs and drops whitespace before punctuation in one pass;
+# both alternatives are deletions, so sub() takes the constant-replacement path
+_PUNCT_FIX_RE = re.compile(r'\s+(?=[.,!?;:])|(?<=\.)\.+')
+_SENTENCE_SPACING_RE = re.compile(r'\.(?=\w)')
+_NEWLINE_RE = re.compile(r'\n+')
+_PARA_RE = re.compile(r'\n\s*\n')
+
+# Common section headers
+_SECTION_PATTERNS = {
+    name: re.compile(pattern, re.DOTALL)
+    for name, pattern in {
+        'chief_complaint': r'(?i)chief\s+complaint:?\s*(.*?)(?=\n\w+:|$)',
+        'history_present_illness': r'(?i)history\s+of\s+present\s+illness:?\s*(.*?)(?=\n\w+:|$)',
+        'past_medical_history': r'(?i)past\s+medical\s+history:?\s*(.*?)(?=\n\w+:|$)',
+        'medications': r'(?i)(?:discharge\s+)?medications?:?\s*(.*?)(?=\n\w+:|$)',
+        'allergies': r'(?i)allergies:?\s*(.*?)(?=\n\w+:|$)',
+        'physical_exam': r'(?i)physical\s+exam(?:ination)?:?\s*(.*?)(?=\n\w+:|$)',
+        'assessment': r'(?i)assessment:?\s*(.*?)(?=\n\w+:|$)',
+        'plan': r'(?i)plan:?\s*(.*?)(?=\n\w+:|$)',
+        'follow_up': r'(?i)follow[-\s]?up:?\s*(.*?)(?=\n\w+:|$)',
+        'instructions': r'(?i)(?:discharge\s+)?instructions:?\s*(.*?)(?=\n\w+:|$)'
+    }.items()
+}
+
+# A literal every match of the section pattern has to contain, lowercased.
+# On ASCII text a substring search for it tells whether the pattern can match
+# at all and where the first match can start; with this few keywords, str.find
+# on the lowered text is faster than an Aho-Corasick pass
+_SECTION_KEYWORDS = {
+    'chief_complaint': 'chief',
+    'history_present_illness': 'history',
+    'past_medical_history': 'past',
+    'medications': 'medication',
+    'allergies': 'allergies',
+    'physical_exam': 'physical',
+    'assessment': 'assessment',
+    'plan': 'plan',
+    'follow_up': 'follow',
+    'instructions': 'instructions'
+}
+
+# Document sections written first, in this order, when converting JSON to text
+_SECTION_ORDER = (
+    'patient_info', 'admission_info', 'chief_complaint',
+    'history_present_illness', 'past_medical_history',
+    'medications', 'allergies', 'social_history',
+    'physical_exam', 'assessment', 'plan',
+    'discharge_medications', 'follow_up', 'instructions'
+)
+_SECTION_ORDER_KEYS = frozenset(_SECTION_ORDER)
+
+# Every medication match ends in a dose; when no dose appears anywhere, the
+# backtracking-heavy medication patterns are not run at all
+_DOSE_RE = re.compile(r'(?i)\d\s*(?:mg|mcg|g|ml|units?)')
+
 
 class TextProcessor:
     """Text processing and normalization for clinical documents"""
+
+    # Medication patterns. The name is whole words on one line: blanks only
+    # appear between words, so there is a single way to split the name from
+    # the whitespace before the dose and a failed match gives up without
+    # backtracking through every shorter name
+    _MED_PATTERNS = [
+        re.compile(pattern, re.MULTILINE)
+        for pattern in (
+            r'(?i)(?:^|\n)\s*(?:\d+\.?\s*)?([A-Za-z][A-Za-z\-]*(?:[ \t]+[A-Za-z\-]+)*)\s+(?:\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml|units?))',
+            r'(?i)(?:^|\n)\s*[-*•]\s*([A-Za-z][A-Za-z\-]*(?:[ \t]+[A-Za-z\-]+)*)\s+(?:\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml|units?))'
+        )
+    ]
+
+    # Appointment patterns
+    _APT_PATTERNS = [
+        re.compile(pattern, re.MULTILINE)
+        for pattern in (
+            r'(?i)follow[-\s]?up\s+(?:with\s+)?([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})',
+            r'(?i)appointment\s+(?:with\s+)?([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})',
+            r'(?i)see\s+([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})'
+        )
+    ]
+    # The literal each appointment pattern starts with, lowercased, used to
+    # skip or shorten its scan the way _SECTION_KEYWORDS does for sections
+    _APT_KEYWORDS = ('follow', 'appointment', 'see')
+
+    # Shared by every instance, so constructing a TextProcessor per request is
+    # free; read-only, since the regex below is built from it
+    medical_abbreviations = MappingProxyType({
+        'pt': 'patient',
+        'dx': 'diagnosis',
+        'tx': 'treatment',
+        'rx': 'prescription',
+        'hx': 'history',
+        'sx': 'symptoms',
+        'f/u': 'follow-up',
+        'w/': 'with',
+        'w/o': 'without',
+        'c/o': 'complains of',
+        'r/o': 'rule out',
+        's/p': 'status post',
+        'bid': 'twice daily',
+        'tid': 'three times daily',
+        'qid': 'four times daily',
+        'prn': 'as needed',
+        'po': 'by mouth',
+        'iv': 'intravenous',
+        'im': 'intramuscular',
+        'sc': 'subcutaneous'
+    })
+    # Matches a whole token that is an abbreviation once the surrounding
+    # punctuation is stripped; longest keys first so 'w/o' wins over 'w/'.
+    # Leading with \s rather than a (?<!\S) lookbehind lets the regex
+    # engine skip ahead to whitespace between candidates
+    _abbreviation_re = re.compile(
+        r'(\s[.,!?;:]*)('
+        + '|'.join(
+            re.escape(abbreviation)
+            for abbreviation in sorted(medical_abbreviations, key=len, reverse=True)
+        )
+        + r')(?=[.,!?;:]*(?!\S))'
+    )
     
-    def __init__(self):
-        self.medical_abbreviations = {
-            'pt': 'patient',
-            'dx': 'diagnosis',
-            'tx': 'treatment',
-            'rx': 'prescription',
-            'hx': 'history',
-            'sx': 'symptoms',
-            'f/u': 'follow-up',
-            'w/': 'with',
-            'w/o': 'without',
-            'c/o': 'complains of',
-            'r/o': 'rule out',
-            's/p': 'status post',
-            'bid': 'twice daily',
-            'tid': 'three times daily',
-            'qid': 'four times daily',
-            'prn': 'as needed',
-            'po': 'by mouth',
-            'iv': 'intravenous',
-            'im': 'intramuscular',
-            'sc': 'subcutaneous'
-        }
-    
-    async def process_json(self, json_content: bytes) -> str:
+    def process_json(self, json_content: bytes) -> str:
         """Process structured JSON content"""
         try:
-            data = json.loads(json_content.decode('utf-8'))
+            # orjson parses the UTF-8 bytes directly, without an intermediate str
+            data = orjson.loads(json_content)
             
             # Convert structured data to text format
             if isinstance(data, dict):
-                return await self._dict_to_text(data)
+                return self._dict_to_text(data)
             elif isinstance(data, list):
-                return await self._list_to_text(data)
+                return self._list_to_text(data)
             else:
                 return str(data)
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON content: {e}")
             raise ValueError("Invalid JSON format")
     
-    async def _dict_to_text(self, data: Dict[str, Any]) -> str:
+    def _dict_to_text(self, data: Dict[str, Any]) -> str:
         """Convert dictionary to readable text"""
-        text_parts = []
-        
-        # Handle common document sections
-        section_order = [
-            'patient_info', 'admission_info', 'chief_complaint',
-            'history_present_illness', 'past_medical_history',
-            'medications', 'allergies', 'social_history',
-            'physical_exam', 'assessment', 'plan',
-            'discharge_medications', 'follow_up', 'instructions'
-        ]
-        
-        # Process known sections first
-        processed_keys = set()
-        for section in section_order:
+        with io.StringIO() as writer:
+            self._write_dict(writer, data)
+            return writer.getvalue()
+    
+    def _list_to_text(self, data: List[Any]) -> str:
+        """Convert list to readable text"""
+        with io.StringIO() as writer:
+            self._write_list(writer, data)
+            return writer.getvalue()
+    
+    def _format_section(self, section_name: str, content: Any) -> str:
+        """Format a section with appropriate heading"""
+        with io.StringIO() as writer:
+            self._write_section(writer, section_name, content)
+            return writer.getvalue()
+    
+    # Nested sections are written straight into one buffer instead of each
+    # level joining its children's text, which copied deep content once per level
+    def _write_dict(self, writer: io.StringIO, data: Dict[str, Any]):
+        """Write a dictionary's sections, known sections first"""
+        separator = ''
+        for section in _SECTION_ORDER:
             if section in data:
-                text_parts.append(await self._format_section(section, data[section]))
-                processed_keys.add(section)
+                writer.write(separator)
+                self._write_section(writer, section, data[section])
+                separator = '\n\n'
         
         # Process remaining keys
         for key, value in data.items():
-            if key not in processed_keys:
-                text_parts.append(await self._format_section(key, value))
-        
-        return '\n\n'.join(text_parts)
+            if key not in _SECTION_ORDER_KEYS:
+                writer.write(separator)
+                self._write_section(writer, key, value)
+                separator = '\n\n'
     
-    async def _list_to_text(self, data: List[Any]) -> str:
-        """Convert list to readable text"""
-        text_parts = []
-        
+    def _write_list(self, writer: io.StringIO, data: List[Any]):
+        """Write list items, numbered from 1"""
         for i, item in enumerate(data):
+            if i:
+                writer.write('\n')
             if isinstance(item, dict):
-                text_parts.append(f"Item {i + 1}:")
-                text_parts.append(await self._dict_to_text(item))
+                writer.write(f"Item {i + 1}:\n")
+                self._write_dict(writer, item)
             else:
-                text_parts.append(f"Item {i + 1}: {str(item)}")
-        
-        return '\n'.join(text_parts)
+                writer.write(f"Item {i + 1}: {str(item)}")
     
-    async def _format_section(self, section_name: str, content: Any) -> str:
-        """Format a section with appropriate heading"""
+    def _write_section(self, writer: io.StringIO, section_name: str, content: Any):
+        """Write a section with appropriate heading"""
         # Clean up section name
-        clean_name = section_name.replace('_', ' ').title()
+        writer.write(section_name.replace('_', ' ').title())
+        writer.write(':\n')
         
         if isinstance(content, dict):
-            content_text = await self._dict_to_text(content)
+            self._write_dict(writer, content)
         elif isinstance(content, list):
-            content_text = await self._list_to_text(content)
+            self._write_list(writer, content)
         else:
-            content_text = str(content)
-        
-        return f"{clean_name}:\n{content_text}"
+            writer.write(str(content))
     
-    async def normalize_text(self, text: str) -> str:
+    def normalize_text(self, text: str) -> str:
         """Normalize clinical text"""
         if not text:
             return ""
         
         # Basic text cleaning
-        text = await self._clean_text(text)
+        text = self._clean_text(text)
         
         # Expand medical abbreviations
-        text = await self._expand_abbreviations(text)
+        text = self._expand_abbreviations(text)
         
         # Normalize formatting
-        text = await self._normalize_formatting(text)
+        text = self._normalize_formatting(text)
         
         return text
     
-    async def _clean_text(self, text: str) -> str:
+    def _clean_text(self, text: str) -> str:
         """Basic text cleaning"""
+        # Nothing below changes text made only of word characters and single
+        # spaces; search() stops at the first other character, so text that
+        # does need cleaning pays almost nothing for the check
+        if not _NEEDS_CLEANING_RE.search(text):
+            return text.strip()
+        
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Remove common OCR artifacts
-        text = re.sub(r'[^\w\s\.,!?;:()\-\/]', '', text)
+        if text.isascii():
+            text = text.translate(_OCR_ARTIFACT_TABLE)
+        else:
+            text = _OCR_ARTIFACT_RE.sub('', text)
+        
+        # An artifact standing alone between two spaces leaves a double space
+        if '  ' in text:
+            text = _WHITESPACE_RE.sub(' ', text)
         
-        # Fix common formatting issues
-        text = re.sub(r'\.+', '.', text)  # Multiple periods
-        text = re.sub(r'\s+([.,!?;:])', r'\1', text)  # Space before punctuation
+        # Fix common formatting issues: multiple periods, space before punctuation
+        text = _PUNCT_FIX_RE.sub('', text)
         
         return text.strip()
     
-    async def _expand_abbreviations(self, text: str) -> str:
+    def _expand_abbreviations(self, text: str) -> str:
         """Expand medical abbreviations"""
-        words = text.split()
-        expanded_words = []
-        
-        for word in words:
-            clean_word = word.lower().strip('.,!?;:')
-            if clean_word in self.medical_abbreviations:
-                replacement = self.medical_abbreviations[clean_word]
-                # Preserve original capitalization pattern
-                if word.isupper():
-                    replacement = replacement.upper()
-                elif word.istitle():
-                    replacement = replacement.title()
-                expanded_words.append(word.replace(clean_word, replacement))
-            else:
-                expanded_words.append(word)
-        
-        return ' '.join(expanded_words)
+        # Matching is case-sensitive, so only lowercase abbreviations expand.
+        # The leading space lets a token at the very start match like the rest
+        return self._abbreviation_re.sub(self._replace_abbreviation, ' ' + text)[1:]
+    
+    def _replace_abbreviation(self, match: re.Match) -> str:
+        """Substitute the expansion for one matched abbreviation"""
+        # One groups() call instead of two group() calls per match
+        lead, abbreviation = match.groups()
+        return lead + self.medical_abbreviations[abbreviation]
     
-    async def _normalize_formatting(self, text: str) -> str:
+    def _normalize_formatting(self, text: str) -> str:
         """Normalize text formatting"""
         # Ensure proper sentence spacing
-        text = re.sub(r'\.(\w)', r'. \1', text)
+        text = _SENTENCE_SPACING_RE.sub('. ', text)
         
-        # Normalize line breaks
-        text = re.sub(r'\n+', '\n', text)
-        
-        # Ensure proper paragraph breaks
-        text = re.sub(r'\n\s*\n', '\n\n', text)
+        # Text coming out of _clean_text has no line breaks left, so the
+        # line break passes only run for callers passing raw text
+        if '\n' in text:
+            # Normalize line breaks
+            text = _NEWLINE_RE.sub('\n', text)
+            
+            # Ensure proper paragraph breaks
+            text = _PARA_RE.sub('\n\n', text)
         
         return text.strip()
     
-    async def extract_sections(self, text: str) -> Dict[str, str]:
+    def extract_sections(self, text: str) -> Dict[str, str]:
         """Extract common sections from discharge summary text"""
         sections = {}
         
-        # Common section headers
-        section_patterns = {
-            'chief_complaint': r'(?i)chief\s+complaint:?\s*(.*?)(?=\n\w+:|$)',
-            'history_present_illness': r'(?i)history\s+of\s+present\s+illness:?\s*(.*?)(?=\n\w+:|$)',
-            'past_medical_history': r'(?i)past\s+medical\s+history:?\s*(.*?)(?=\n\w+:|$)',
-            'medications': r'(?i)(?:discharge\s+)?medications?:?\s*(.*?)(?=\n\w+:|$)',
-            'allergies': r'(?i)allergies:?\s*(.*?)(?=\n\w+:|$)',
-            'physical_exam': r'(?i)physical\s+exam(?:ination)?:?\s*(.*?)(?=\n\w+:|$)',
-            'assessment': r'(?i)assessment:?\s*(.*?)(?=\n\w+:|$)',
-            'plan': r'(?i)plan:?\s*(.*?)(?=\n\w+:|$)',
-            'follow_up': r'(?i)follow[-\s]?up:?\s*(.*?)(?=\n\w+:|$)',
-            'instructions': r'(?i)(?:discharge\s+)?instructions:?\s*(.*?)(?=\n\w+:|$)'
-        }
-        
-        for section_name, pattern in section_patterns.items():
-            match = re.search(pattern, text, re.DOTALL)
+        # str.lower() only agrees with the patterns' IGNORECASE matching, and
+        # keeps offsets aligned, for ASCII text
+        lowered = text.lower() if text.isascii() else None
+        
+        for section_name, pattern in _SECTION_PATTERNS.items():
+            start = 0
+            if lowered is not None:
+                start = lowered.find(_SECTION_KEYWORDS[section_name])
+                if start < 0:
+                    continue
+            match = pattern.search(text, start)
             if match:
                 section_content = match.group(1).strip()
                 if section_content:
@@ -199,18 +315,15 @@ class TextProcessor:
         
         return sections
     
-    async def identify_medication_list(self, text: str) -> List[str]:
+    def identify_medication_list(self, text: str) -> List[str]:
         """Extract medication list from text"""
         medications = []
         
-        # Look for medication patterns
-        med_patterns = [
-            r'(?i)(?:^|\n)\s*(?:\d+\.?\s*)?([A-Za-z][A-Za-z\s\-]+)\s+(?:\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml|units?))',
-            r'(?i)(?:^|\n)\s*[-*•]\s*([A-Za-z][A-Za-z\s\-]+)\s+(?:\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml|units?))'
-        ]
+        if not _DOSE_RE.search(text):
+            return medications
         
-        for pattern in med_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
+        for pattern in self._MED_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 med_name = match.strip()
                 if len(med_name) > 2 and med_name not in medications:
@@ -218,19 +331,19 @@ class TextProcessor:
         
         return medications
     
-    async def identify_appointments(self, text: str) -> List[Dict[str, str]]:
+    def identify_appointments(self, text: str) -> List[Dict[str, str]]:
         """Extract appointment information from text"""
         appointments = []
         
-        # Look for appointment patterns
-        apt_patterns = [
-            r'(?i)follow[-\s]?up\s+(?:with\s+)?([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})',
-            r'(?i)appointment\s+(?:with\s+)?([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})',
-            r'(?i)see\s+([^.]+?)(?:on\s+|in\s+)?(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\w+\s+\d{1,2})'
-        ]
+        lowered = text.lower() if text.isascii() else None
         
-        for pattern in apt_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
+        for keyword, pattern in zip(self._APT_KEYWORDS, self._APT_PATTERNS):
+            start = 0
+            if lowered is not None:
+                start = lowered.find(keyword)
+                if start < 0:
+                    continue
+            matches = pattern.findall(text, start)
             for provider, date in matches:
                 appointments.append({
                     'provider': provider.strip(),
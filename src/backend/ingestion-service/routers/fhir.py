@@ -2,13 +2,25 @@
 FHIR resource processing router
 """
 
-import json
+import binascii
 import logging
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Body
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Tuple
+import ijson
+import orjson
+try:
+    from ciso8601 import parse_datetime
+except ImportError:  # optional; falls back to datetime.fromisoformat
+    parse_datetime = None
+from fastapi import APIRouter, HTTPException, Depends, Body, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from core.batching import BatchCollector
 from core.config import get_settings
 from core.database import get_db_connection
 from core.logging_config import audit_logger
@@ -35,6 +47,145 @@ class FHIRBundle(BaseModel):
     entry: List[Dict[str, Any]] = []
 
 
+_ENTRY_ADAPTER = TypeAdapter(Dict[str, Any])
+
+
+class _RequestBodyReader:
+    """Adapts Request.stream() to the async read() ijson pulls from"""
+    
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+    
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to learn whether it gets bytes or str
+        if size == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+async def _build_json_value(events, event: str, value: Any) -> Any:
+    """Assemble the JSON value that starts with (event, value) from ijson events"""
+    if event not in ("start_map", "start_array"):
+        return value
+    
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    while True:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return builder.value
+        _, event, value = await events.__anext__()
+
+
+class FHIRBundleStream:
+    """
+    Stream a FHIR Bundle request body, yielding entries as they are parsed
+    
+    Only the entry being processed is held in memory rather than the whole
+    body plus its decoded tree. The bundle's own fields can come after the
+    entries in the document, so they are validated by validate() once all
+    entries have been read; the 422 it raises matches FHIRBundle's, except
+    that a missing field's input, the bundle itself, leaves out the entries.
+    """
+    
+    def __init__(self, request: Request):
+        self._request = request
+        self._fields: Dict[str, Any] = {}
+        self._entry_errors: List[Dict[str, Any]] = []
+        self.entry_count = 0
+        # Counts "entry" keys read so far; a repeated key replaces every
+        # entry before it, so callers start over when this changes
+        self.entry_arrays = 0
+        self.id: Optional[str] = None
+    
+    async def entries(self) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (index, entry) for each bundle entry as soon as it is parsed"""
+        events = ijson.parse_async(_RequestBodyReader(self._request), use_float=True)
+        try:
+            _, event, value = await events.__anext__()
+            if event != "start_map":
+                # Not an object at all; validate() reports it
+                self._fields = await _build_json_value(events, event, value)
+            else:
+                while True:
+                    _, event, key = await events.__anext__()
+                    if event == "end_map":
+                        break
+                    
+                    _, event, value = await events.__anext__()
+                    if key == "entry":
+                        # As when the whole body is decoded, the last "entry"
+                        # wins; forget the entries of any earlier one
+                        self._fields.pop("entry", None)
+                        self._entry_errors = []
+                        self.entry_count = 0
+                        self.entry_arrays += 1
+                    if key != "entry" or event != "start_array":
+                        self._fields[key] = await _build_json_value(
+                            events, event, value
+                        )
+                        continue
+                    
+                    while True:
+                        _, event, value = await events.__anext__()
+                        if event == "end_array":
+                            break
+                        entry = await _build_json_value(events, event, value)
+                        index = self.entry_count
+                        self.entry_count += 1
+                        if isinstance(entry, dict):
+                            yield index, entry
+                        else:
+                            self._add_entry_error(index, entry)
+            
+            # Run the parser to the end so trailing data is still rejected
+            async for _ in events:
+                pass
+        except (ijson.JSONError, StopAsyncIteration) as e:
+            # yajl appends the offending input and a caret on further lines
+            error = str(e).partition("\n")[0] or "unexpected end of input"
+            raise RequestValidationError([{
+                "type": "json_invalid",
+                "loc": ("body",),
+                "msg": f"Invalid JSON: {error}",
+                "input": {},
+                "ctx": {"error": error}
+            }])
+    
+    def validate(self):
+        """Validate the bundle's own fields; call after entries() is exhausted"""
+        errors = []
+        try:
+            # Round-tripped through JSON so messages read as for the raw body
+            bundle = FHIRBundle.model_validate_json(orjson.dumps(self._fields))
+            self.id = bundle.id
+        except ValidationError as e:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ]
+        errors.extend(self._entry_errors)
+        if errors:
+            raise RequestValidationError(errors)
+    
+    def _add_entry_error(self, index: int, entry: Any):
+        """Record the error FHIRBundle would report for a non-object entry"""
+        try:
+            _ENTRY_ADAPTER.validate_json(orjson.dumps(entry))
+        except ValidationError as e:
+            self._entry_errors.extend(
+                {**error, "loc": ("body", "entry", index, *error["loc"])}
+                for error in e.errors(include_url=False)
+            )
+
+
 async def verify_fhir_permissions(token: str = Depends(security)):
     """Verify user has FHIR processing permissions"""
     # TODO: Implement proper JWT validation
@@ -43,9 +194,17 @@ async def verify_fhir_permissions(token: str = Depends(security)):
     return token.credentials
 
 
-@router.post("/process-bundle")
+@router.post(
+    "/process-bundle",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": FHIRBundle.model_json_schema()}}
+        }
+    }
+)
 async def process_fhir_bundle(
-    bundle: FHIRBundle = Body(...),
+    request: Request,
     patient_id: Optional[str] = None,
     token: str = Depends(verify_fhir_permissions)
 ):
@@ -70,29 +229,39 @@ async def process_fhir_bundle(
             "errors": []
         }
         
-        # Process bundle entries
-        for entry in bundle.entry:
+        # Entries are turned into rows in bundle order and written together
+        # once the whole bundle has been read
+        writer = _BundleWriter()
+        added = []
+        errors = {}
+        requested_patient_id = patient_id
+        entry_arrays = 1
+        
+        # Process bundle entries as they are parsed from the request body
+        bundle = FHIRBundleStream(request)
+        async for index, entry in bundle.entries():
+            if bundle.entry_arrays != entry_arrays:
+                # A repeated "entry" key replaced the entries handled so far;
+                # nothing has been written yet, so start over on the new array
+                entry_arrays = bundle.entry_arrays
+                writer = _BundleWriter()
+                added = []
+                errors = {}
+                patient_id = requested_patient_id
             try:
                 resource = entry.get("resource", {})
                 resource_type = resource.get("resourceType")
                 
-                if resource_type == "DocumentReference":
-                    # Process discharge summary document
-                    discharge_id = await _process_document_reference(resource, patient_id)
-                    if discharge_id:
-                        results["discharge_summaries"].append(str(discharge_id))
-                
-                elif resource_type == "MedicationStatement":
-                    # Process medication
-                    medication_id = await _process_medication_statement(resource, patient_id)
-                    if medication_id:
-                        results["medications"].append(str(medication_id))
-                
-                elif resource_type == "Appointment":
-                    # Process appointment
-                    appointment_id = await _process_appointment(resource, patient_id)
-                    if appointment_id:
-                        results["appointments"].append(str(appointment_id))
+                # Resources that become rows: discharge summary documents,
+                # medications and appointments
+                handler = (
+                    _BUNDLE_ROW_HANDLERS.get(resource_type)
+                    if isinstance(resource_type, str) else None
+                )
+                if handler is not None:
+                    result_key, add_resource = handler
+                    resource_id = add_resource(writer, index, resource, patient_id)
+                    added.append((index, resource_type, result_key, resource_id))
                 
                 elif resource_type == "Patient":
                     # Extract patient information
@@ -102,14 +271,27 @@ async def process_fhir_bundle(
                     # Process encounter information
                     await _process_encounter(resource, patient_id)
                 
-                results["processed_resources"] += 1
-                
             except Exception as e:
                 logger.error(f"Error processing FHIR resource: {e}")
-                results["errors"].append({
+                errors[index] = {
                     "resource_type": resource.get("resourceType", "unknown"),
                     "error": str(e)
-                })
+                }
+        
+        # Nothing has been written yet, so an invalid bundle is rejected whole
+        bundle.validate()
+        await writer.write()
+        
+        for index, resource_type, result_key, resource_id in added:
+            error = writer.failed.get(index)
+            if error is None:
+                results[result_key].append(str(resource_id))
+            else:
+                logger.error(f"Error processing FHIR resource: {error}")
+                errors[index] = {"resource_type": resource_type, "error": str(error)}
+        
+        results["errors"] = [errors[index] for index in sorted(errors)]
+        results["processed_resources"] = bundle.entry_count - len(errors)
         
         # Log audit event
         audit_logger.log_data_processing(
@@ -125,6 +307,8 @@ async def process_fhir_bundle(
         
         return results
         
+    except RequestValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error processing FHIR bundle: {e}")
         raise HTTPException(status_code=500, detail="Error processing FHIR bundle")
@@ -184,8 +368,298 @@ async def process_appointment_resource(
 
 # Helper functions
 
-async def _process_document_reference(resource: Dict[str, Any], patient_id: Optional[str] = None):
-    """Process FHIR DocumentReference"""
+_LATEST_SUMMARY_QUERY = """
+SELECT id FROM discharge_summaries
+WHERE patient_id = $1
+ORDER BY created_at DESC
+LIMIT 1
+"""
+
+_LATEST_SUMMARIES_QUERY = """
+SELECT DISTINCT ON (patient_id) patient_id, id
+FROM discharge_summaries
+WHERE patient_id = ANY($1::text[])
+ORDER BY patient_id, created_at DESC
+"""
+
+# Concurrent single-resource requests share inserts within this window
+BATCH_MAX_ITEMS = 50
+BATCH_FLUSH_MS = 5
+
+# One multi-row insert per table; ids are generated client-side so rows can
+# reference each other before they are written
+_INSERT_QUERIES = {
+    "discharge_summaries": """
+    INSERT INTO discharge_summaries
+    (id, patient_id, original_content, source_system, metadata, status)
+    SELECT * FROM unnest(
+        $1::uuid[], $2::text[], $3::text[], $4::text[], $5::jsonb[], $6::text[]
+    )
+    """,
+    "medications": """
+    INSERT INTO medications
+    (id, discharge_summary_id, medication_name, dosage, frequency, rxnorm_code)
+    SELECT * FROM unnest(
+        $1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::text[], $6::text[]
+    )
+    """,
+    "appointments": """
+    INSERT INTO appointments
+    (id, discharge_summary_id, appointment_type, provider_name, appointment_date)
+    SELECT * FROM unnest(
+        $1::uuid[], $2::uuid[], $3::text[], $4::text[], $5::timestamptz[]
+    )
+    """
+}
+
+
+async def _insert_rows(table: str, rows: List[tuple]) -> List[uuid.UUID]:
+    """Insert a batch of rows into one table in one round trip"""
+    async with get_db_connection() as conn:
+        await conn.execute(
+            _INSERT_QUERIES[table], *(list(column) for column in zip(*rows))
+        )
+    logger.debug(f"Inserted {len(rows)} {table} rows in one batch")
+    return [row[0] for row in rows]
+
+
+async def _insert_medications(rows: List[tuple]) -> List[uuid.UUID]:
+    """Insert a batch of medication rows"""
+    return await _insert_rows("medications", rows)
+
+
+async def _insert_appointments(rows: List[tuple]) -> List[uuid.UUID]:
+    """Insert a batch of appointment rows"""
+    return await _insert_rows("appointments", rows)
+
+
+_medication_insert_batcher = BatchCollector(
+    _insert_medications,
+    max_items=BATCH_MAX_ITEMS,
+    flush_interval_ms=BATCH_FLUSH_MS,
+    name="fhir_medication_insert"
+)
+
+_appointment_insert_batcher = BatchCollector(
+    _insert_appointments,
+    max_items=BATCH_MAX_ITEMS,
+    flush_interval_ms=BATCH_FLUSH_MS,
+    name="fhir_appointment_insert"
+)
+
+
+async def close_fhir_insert_batchers():
+    """Flush pending medication and appointment inserts; called on shutdown"""
+    await _medication_insert_batcher.close()
+    await _appointment_insert_batcher.close()
+
+
+@dataclass(slots=True)
+class _SummaryLookup:
+    """A patient's latest stored discharge summary, resolved at write time"""
+    patient_id: str
+    # Written instead when the patient has no summary yet; None for
+    # appointments, which fail rather than create one
+    placeholder_id: Optional[uuid.UUID] = None
+    found_id: Optional[uuid.UUID] = None
+
+
+@dataclass(slots=True)
+class _PendingRow:
+    """A row waiting to be written for a bundle entry"""
+    table: str
+    entry_index: Optional[int]
+    values: list
+    # Set on placeholder summaries, which are skipped if the lookup finds one
+    unless_found: Optional[_SummaryLookup] = None
+
+
+class _BundleWriter:
+    """
+    Collect the rows a FHIR bundle produces and write them together
+    
+    Resources used to be inserted one by one, each medication and appointment
+    first querying for the patient's latest discharge summary. Rows are now
+    gathered in bundle order, links to summaries added earlier in the bundle
+    are tracked in memory, existing summaries are looked up for all patients
+    in one query, and each table is written with a single insert.
+    """
+    
+    def __init__(self):
+        self._rows: List[_PendingRow] = []
+        # patient_id -> id of the latest summary added by this bundle, or the
+        # lookup standing in for the latest one already stored
+        self._latest_summary: Dict[str, Any] = {}
+        self._lookups: Dict[str, List[_SummaryLookup]] = {}
+        # entry index -> error for entries whose rows could not be written
+        self.failed: Dict[int, Exception] = {}
+    
+    def add_discharge_summary(
+        self,
+        index: int,
+        discharge_data: DischargeSummaryCreate
+    ) -> uuid.UUID:
+        """Queue a discharge summary row"""
+        summary_id = uuid.uuid4()
+        self._rows.append(_PendingRow("discharge_summaries", index, [
+            summary_id,
+            discharge_data.patient_id,
+            discharge_data.original_content,
+            discharge_data.source_system,
+            discharge_data.metadata,
+            "pending"
+        ]))
+        if discharge_data.patient_id is not None:
+            self._latest_summary[discharge_data.patient_id] = summary_id
+        return summary_id
+    
+    def add_medication(
+        self,
+        index: int,
+        medication: Tuple[str, str, str, Optional[str]],
+        patient_id: Optional[str]
+    ) -> uuid.UUID:
+        """Queue a medication row linked to the patient's latest summary"""
+        if patient_id is None:
+            # Looking up a NULL patient never matches, so each medication
+            # without a patient gets a placeholder of its own
+            summary = self._add_placeholder(None)
+        else:
+            summary = self._latest_summary.get(patient_id)
+            if summary is None:
+                # The first medication with no summary to attach to creates a
+                # placeholder; later resources for the patient reuse it
+                summary = self._lookup(patient_id)
+                summary.placeholder_id = self._add_placeholder(
+                    patient_id, unless_found=summary
+                )
+                self._latest_summary[patient_id] = summary
+        
+        medication_id = uuid.uuid4()
+        self._rows.append(_PendingRow(
+            "medications", index, [medication_id, summary, *medication]
+        ))
+        return medication_id
+    
+    def add_appointment(
+        self,
+        index: int,
+        appointment: Tuple[str, str, Optional[datetime]],
+        patient_id: Optional[str]
+    ) -> uuid.UUID:
+        """Queue an appointment row linked to the patient's latest summary"""
+        if not patient_id:
+            raise ValueError("No discharge summary found for appointment")
+        
+        summary = self._latest_summary.get(patient_id)
+        if summary is None:
+            summary = self._lookup(patient_id)
+        
+        appointment_id = uuid.uuid4()
+        self._rows.append(_PendingRow(
+            "appointments", index, [appointment_id, summary, *appointment]
+        ))
+        return appointment_id
+    
+    def _lookup(self, patient_id: str) -> _SummaryLookup:
+        """Register a lookup of the patient's latest stored summary"""
+        lookup = _SummaryLookup(patient_id)
+        self._lookups.setdefault(patient_id, []).append(lookup)
+        return lookup
+    
+    def _add_placeholder(
+        self,
+        patient_id: Optional[str],
+        unless_found: Optional[_SummaryLookup] = None
+    ) -> uuid.UUID:
+        """Queue a placeholder discharge summary for medication data"""
+        placeholder_id = uuid.uuid4()
+        self._rows.append(_PendingRow(
+            "discharge_summaries",
+            None,
+            [placeholder_id, patient_id, "FHIR medication data", "fhir", {}, "pending"],
+            unless_found
+        ))
+        return placeholder_id
+    
+    async def write(self):
+        """Resolve summary links and insert every queued row"""
+        if not self._rows:
+            return
+        
+        try:
+            async with get_db_connection() as conn:
+                rows = await self._resolve(conn)
+                await self._insert(conn, rows)
+        except Exception as e:
+            for row in self._rows:
+                if row.entry_index is not None:
+                    self.failed.setdefault(row.entry_index, e)
+    
+    async def _resolve(self, conn) -> List[_PendingRow]:
+        """Look up existing summaries and return the rows left to write"""
+        if self._lookups:
+            records = await conn.fetch(_LATEST_SUMMARIES_QUERY, list(self._lookups))
+            for record in records:
+                for lookup in self._lookups[record['patient_id']]:
+                    lookup.found_id = record['id']
+        
+        rows = []
+        for row in self._rows:
+            if row.unless_found is not None and row.unless_found.found_id is not None:
+                continue
+            if (
+                row.table != "discharge_summaries"
+                and isinstance(row.values[1], _SummaryLookup)
+            ):
+                lookup = row.values[1]
+                summary_id = lookup.found_id or lookup.placeholder_id
+                if summary_id is None:
+                    self.failed[row.entry_index] = ValueError(
+                        "No discharge summary found for appointment"
+                    )
+                    continue
+                row.values[1] = summary_id
+            rows.append(row)
+        return rows
+    
+    async def _insert(self, conn, rows: List[_PendingRow]):
+        """Insert the rows one statement per table, or one by one if that fails"""
+        try:
+            async with conn.transaction():
+                for table, query in _INSERT_QUERIES.items():
+                    table_rows = [row.values for row in rows if row.table == table]
+                    if table_rows:
+                        await conn.execute(
+                            query, *(list(column) for column in zip(*table_rows))
+                        )
+        except Exception as e:
+            # Replay in bundle order so only the offending resources (and
+            # anything linked to them) fail, as with per-resource inserts
+            logger.warning(
+                f"Batched FHIR bundle insert failed, writing rows individually: {e}"
+            )
+            for row in rows:
+                try:
+                    await conn.execute(
+                        _INSERT_QUERIES[row.table],
+                        *([value] for value in row.values)
+                    )
+                except Exception as row_error:
+                    if row.entry_index is not None:
+                        self.failed[row.entry_index] = row_error
+
+
+# Any character outside the base64 alphabet and line breaks marks attachment
+# data that was sent as plain text
+_NON_BASE64_RE = re.compile(r'[^A-Za-z0-9+/=\r\n]')
+
+
+def _build_discharge_summary(
+    resource: Dict[str, Any],
+    patient_id: Optional[str] = None
+) -> DischargeSummaryCreate:
+    """Build a discharge summary from a FHIR DocumentReference"""
     
     # Extract document content
     content = resource.get("content", [])
@@ -205,15 +679,16 @@ async def _process_document_reference(resource: Dict[str, Any], patient_id: Opti
         else:
             raise ValueError("No document content or URL provided")
     
-    # Decode base64 content if present
-    import base64
-    try:
-        document_text = base64.b64decode(document_text).decode('utf-8')
-    except Exception:
-        pass  # Content might already be plain text
+    # Decode base64 content if present. Plain text almost always contains a
+    # space or punctuation, which base64 never does, so it is recognised
+    # without attempting a decode
+    if not _NON_BASE64_RE.search(document_text):
+        try:
+            document_text = binascii.a2b_base64(document_text).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError):
+            pass  # Content might already be plain text
     
-    # Create discharge summary
-    discharge_data = DischargeSummaryCreate(
+    return DischargeSummaryCreate(
         patient_id=patient_id or _extract_patient_reference(resource.get("subject")),
         original_content=document_text,
         source_system="fhir",
@@ -223,32 +698,10 @@ async def _process_document_reference(resource: Dict[str, Any], patient_id: Opti
             "creation_date": resource.get("date")
         }
     )
-    
-    # Save to database
-    async with get_db_connection() as conn:
-        query = """
-        INSERT INTO discharge_summaries 
-        (patient_id, original_content, source_system, metadata, status)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING id
-        """
-        
-        result = await conn.fetchrow(
-            query,
-            discharge_data.patient_id,
-            discharge_data.original_content,
-            discharge_data.source_system,
-            discharge_data.metadata,
-            "pending"
-        )
-        
-        return result['id']
 
 
-async def _process_medication_statement(resource: Dict[str, Any], 
-                                      patient_id: Optional[str] = None,
-                                      discharge_summary_id: Optional[str] = None):
-    """Process FHIR MedicationStatement"""
+def _build_medication(resource: Dict[str, Any]) -> Tuple[str, str, str, Optional[str]]:
+    """Extract name, dosage, frequency and RxNorm code from a MedicationStatement"""
     
     # Extract medication information
     medication = resource.get("medicationCodeableConcept") or resource.get("medicationReference", {})
@@ -273,14 +726,98 @@ async def _process_medication_statement(resource: Dict[str, Any],
     timing = dosage_info.get("timing", {})
     frequency = _extract_frequency_from_timing(timing)
     
+    return medication_name, dosage, frequency, rxnorm_code
+
+
+def _parse_fhir_datetime(value: str) -> datetime:
+    """Parse a FHIR dateTime/instant string"""
+    if parse_datetime is not None:
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            pass  # Forms ciso8601 rejects are left to fromisoformat
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _build_appointment(resource: Dict[str, Any]) -> Tuple[str, str, Optional[datetime]]:
+    """Extract type, provider and start time from a FHIR Appointment"""
+    
+    # Extract appointment information
+    appointment_type = "follow_up"  # Default
+    if resource.get("appointmentType"):
+        appointment_type = resource["appointmentType"].get("coding", [{}])[0].get("display", "follow_up")
+    
+    # Extract participants (providers)
+    participants = resource.get("participant", [])
+    provider_name = "Unknown provider"
+    for participant in participants:
+        actor = participant.get("actor", {})
+        if actor.get("reference", "").startswith("Practitioner/"):
+            provider_name = actor.get("display", "Unknown provider")
+            break
+    
+    # Extract date/time
+    start_time = resource.get("start")
+    if start_time:
+        appointment_date = _parse_fhir_datetime(start_time)
+    else:
+        appointment_date = None
+    
+    return appointment_type, provider_name, appointment_date
+
+
+def _add_document_reference(
+    writer: _BundleWriter,
+    index: int,
+    resource: Dict[str, Any],
+    patient_id: Optional[str]
+) -> uuid.UUID:
+    """Queue the discharge summary a DocumentReference carries"""
+    return writer.add_discharge_summary(
+        index, _build_discharge_summary(resource, patient_id)
+    )
+
+
+def _add_medication_statement(
+    writer: _BundleWriter,
+    index: int,
+    resource: Dict[str, Any],
+    patient_id: Optional[str]
+) -> uuid.UUID:
+    """Queue the medication a MedicationStatement describes"""
+    return writer.add_medication(index, _build_medication(resource), patient_id)
+
+
+def _add_appointment(
+    writer: _BundleWriter,
+    index: int,
+    resource: Dict[str, Any],
+    patient_id: Optional[str]
+) -> uuid.UUID:
+    """Queue the appointment a FHIR Appointment describes"""
+    return writer.add_appointment(index, _build_appointment(resource), patient_id)
+
+
+# resourceType -> (results key, function queueing the resource's row)
+_BUNDLE_ROW_HANDLERS: Dict[str, Tuple[str, Callable[..., uuid.UUID]]] = {
+    "DocumentReference": ("discharge_summaries", _add_document_reference),
+    "MedicationStatement": ("medications", _add_medication_statement),
+    "Appointment": ("appointments", _add_appointment)
+}
+
+
+async def _process_medication_statement(resource: Dict[str, Any], 
+                                      patient_id: Optional[str] = None,
+                                      discharge_summary_id: Optional[str] = None):
+    """Process FHIR MedicationStatement"""
+    
+    medication_name, dosage, frequency, rxnorm_code = _build_medication(resource)
+    
     # Create medication record (need discharge_summary_id)
     if not discharge_summary_id:
         # Find most recent discharge summary for this patient
         async with get_db_connection() as conn:
-            result = await conn.fetchrow(
-                "SELECT id FROM discharge_summaries WHERE patient_id = $1 ORDER BY created_at DESC LIMIT 1",
-                patient_id
-            )
+            result = await conn.fetchrow(_LATEST_SUMMARY_QUERY, patient_id)
             if result:
                 discharge_summary_id = result['id']
             else:
@@ -295,25 +832,15 @@ async def _process_medication_statement(resource: Dict[str, Any],
                 )
                 discharge_summary_id = placeholder_result['id']
     
-    # Create medication
-    async with get_db_connection() as conn:
-        query = """
-        INSERT INTO medications 
-        (discharge_summary_id, medication_name, dosage, frequency, rxnorm_code)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING id
-        """
-        
-        result = await conn.fetchrow(
-            query,
-            discharge_summary_id,
-            medication_name,
-            dosage,
-            frequency,
-            rxnorm_code
-        )
-        
-        return result['id']
+    # Create medication, batched with concurrent requests
+    return await _medication_insert_batcher.submit((
+        uuid.uuid4(),
+        discharge_summary_id,
+        medication_name,
+        dosage,
+        frequency,
+        rxnorm_code
+    ))
 
 
 async def _process_appointment(resource: Dict[str, Any], 
@@ -321,59 +848,26 @@ async def _process_appointment(resource: Dict[str, Any],
                              discharge_summary_id: Optional[str] = None):
     """Process FHIR Appointment"""
     
-    # Extract appointment information
-    appointment_type = "follow_up"  # Default
-    if resource.get("appointmentType"):
-        appointment_type = resource["appointmentType"].get("coding", [{}])[0].get("display", "follow_up")
-    
-    # Extract participants (providers)
-    participants = resource.get("participant", [])
-    provider_name = "Unknown provider"
-    for participant in participants:
-        actor = participant.get("actor", {})
-        if actor.get("reference", "").startswith("Practitioner/"):
-            provider_name = actor.get("display", "Unknown provider")
-            break
-    
-    # Extract date/time
-    start_time = resource.get("start")
-    if start_time:
-        from datetime import datetime
-        appointment_date = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-    else:
-        appointment_date = None
+    appointment_type, provider_name, appointment_date = _build_appointment(resource)
     
     # Find discharge summary if not provided
     if not discharge_summary_id and patient_id:
         async with get_db_connection() as conn:
-            result = await conn.fetchrow(
-                "SELECT id FROM discharge_summaries WHERE patient_id = $1 ORDER BY created_at DESC LIMIT 1",
-                patient_id
-            )
+            result = await conn.fetchrow(_LATEST_SUMMARY_QUERY, patient_id)
             if result:
                 discharge_summary_id = result['id']
     
     if not discharge_summary_id:
         raise ValueError("No discharge summary found for appointment")
     
-    # Create appointment
-    async with get_db_connection() as conn:
-        query = """
-        INSERT INTO appointments 
-        (discharge_summary_id, appointment_type, provider_name, appointment_date)
-        VALUES ($1, $2, $3, $4)
-        RETURNING id
-        """
-        
-        result = await conn.fetchrow(
-            query,
-            discharge_summary_id,
-            appointment_type,
-            provider_name,
-            appointment_date
-        )
-        
-        return result['id']
+    # Create appointment, batched with concurrent requests
+    return await _appointment_insert_batcher.submit((
+        uuid.uuid4(),
+        discharge_summary_id,
+        appointment_type,
+        provider_name,
+        appointment_date
+    ))
 
 
 async def _process_encounter(resource: Dict[str, Any], patient_id: Optional[str] = None):
@@ -400,6 +894,15 @@ def _extract_patient_reference(subject: Dict[str, Any]) -> str:
     return ""
 
 
+# (periodUnit, period, frequency) -> wording for the common daily schedules
+_TIMING_FREQUENCIES = {
+    ("d", 1, 1): "once daily",
+    ("d", 1, 2): "twice daily",
+    ("d", 1, 3): "three times daily",
+    ("d", 1, 4): "four times daily"
+}
+
+
 def _extract_frequency_from_timing(timing: Dict[str, Any]) -> str:
     """Extract frequency from FHIR Timing"""
     if not timing:
@@ -411,14 +914,11 @@ def _extract_frequency_from_timing(timing: Dict[str, Any]) -> str:
     period_unit = repeat.get("periodUnit", "d")
     
     # Convert to readable format
-    if period_unit == "d" and period == 1:
-        if frequency == 1:
-            return "once daily"
-        elif frequency == 2:
-            return "twice daily"
-        elif frequency == 3:
-            return "three times daily"
-        elif frequency == 4:
-            return "four times daily"
+    try:
+        readable = _TIMING_FREQUENCIES.get((period_unit, period, frequency))
+    except TypeError:
+        readable = None  # Unhashable JSON values (lists, objects) never match
+    if readable is not None:
+        return readable
     
     return f"{frequency} times per {period} {period_unit}"
@@ -2,16 +2,20 @@
 HL7 message processing router
 """
 
+import hashlib
 import logging
 import re
-from typing import Dict, Any, Optional, List
-from fastapi import APIRouter, HTTPException, Depends, Body
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping
+from fastapi import APIRouter, HTTPException, Depends, Body, Response
 from fastapi.security import HTTPBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from asyncpg import Connection
 from datetime import datetime
 
 from core.config import get_settings
-from core.database import get_db_connection
+from core.database import db_connection
 from core.logging_config import audit_logger
 
 logger = logging.getLogger(__name__)
@@ -19,6 +23,19 @@ router = APIRouter()
 security = HTTPBearer()
 settings = get_settings()
 
+_SEGMENT_SPLIT_RE = re.compile(r"[\r\n]+")
+_MESSAGE_START_RE = re.compile(r"\s*MSH\|")
+
+# Segment types that may repeat in a message; parse_message always returns
+# these as sequences so consumers never have to check
+_REPEATING_SEGMENTS = frozenset({"OBX", "DG1", "NK1", "AL1", "IN1", "PR1"})
+
+# Recently parsed messages keyed by a digest of their content, so feeds that
+# re-send the same message (retries, replays) skip the parse; the digest keeps
+# large messages from being held just as cache keys
+PARSED_MESSAGE_CACHE_SIZE = 256
+_parsed_message_cache: "OrderedDict[bytes, Mapping[str, Any]]" = OrderedDict()
+
 
 class HL7Message(BaseModel):
     """HL7 message model"""
@@ -38,6 +55,9 @@ class HL7ProcessingResult(BaseModel):
     errors: List[str] = []
 
 
+_HL7_RESULT_LIST_ADAPTER = TypeAdapter(List[HL7ProcessingResult])
+
+
 async def verify_hl7_permissions(token: str = Depends(security)):
     """Verify user has HL7 processing permissions"""
     if not token or not token.credentials:
@@ -45,6 +65,22 @@ async def verify_hl7_permissions(token: str = Depends(security)):
     return token.credentials
 
 
+def _check_message_content(message_content: str):
+    """Reject oversized or non-HL7 content before it reaches the parser"""
+    if len(message_content) > settings.hl7_max_message_size:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                "HL7 message too large. "
+                f"Maximum size: {settings.hl7_max_message_size} characters"
+            )
+        )
+    if not _MESSAGE_START_RE.match(message_content):
+        raise HTTPException(
+            status_code=400, detail="HL7 message must start with an MSH segment"
+        )
+
+
 @router.post("/process-message", response_model=HL7ProcessingResult)
 async def process_hl7_message(
     message: HL7Message = Body(...),
@@ -60,18 +96,10 @@ async def process_hl7_message(
     - ORU^R01 (Results)
     """
     
+    _check_message_content(message.message_content)
+    
     try:
-        # Parse HL7 message
-        parser = HL7Parser()
-        parsed_data = await parser.parse_message(message.message_content)
-        
-        # Process based on message type
-        if message.message_type.startswith("ADT"):
-            result = await _process_adt_message(parsed_data, message.message_content)
-        elif message.message_type.startswith("ORU"):
-            result = await _process_oru_message(parsed_data, message.message_content)
-        else:
-            raise ValueError(f"Unsupported message type: {message.message_type}")
+        result = _process_message(message)
         
         # Log audit event
         audit_logger.log_data_processing(
@@ -85,34 +113,105 @@ async def process_hl7_message(
             }
         )
         
-        return result
+        # Serialize directly; response_model documents the shape without
+        # re-validating a result we just built
+        return Response(content=result.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error processing HL7 message: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing HL7 message: {str(e)}")
 
 
+@router.post("/process-messages", response_model=List[HL7ProcessingResult])
+async def process_hl7_messages(
+    messages: List[HL7Message] = Body(...),
+    token: str = Depends(verify_hl7_permissions)
+):
+    """
+    Process several HL7 messages in one request
+    
+    Each message gets its own result; one bad message does not fail the
+    others. The batch is audited as a single event.
+    """
+    
+    results = []
+    for message in messages:
+        try:
+            _check_message_content(message.message_content)
+            results.append(_process_message(message))
+        except HTTPException as e:
+            results.append(HL7ProcessingResult(
+                message_id="error",
+                status="error",
+                processed_segments=0,
+                extracted_data={},
+                errors=[e.detail]
+            ))
+        except Exception as e:
+            logger.error(f"Error processing HL7 message: {e}")
+            results.append(HL7ProcessingResult(
+                message_id="error",
+                status="error",
+                processed_segments=0,
+                extracted_data={},
+                errors=[str(e)]
+            ))
+    
+    processed = [result for result in results if result.status == "success"]
+    audit_logger.log_data_processing(
+        user_id=token[:10] + "...",
+        document_id=",".join(result.message_id for result in processed) or "none",
+        operation="hl7_batch_processing",
+        status=(
+            "success" if len(processed) == len(results)
+            else "partial_success" if processed else "error"
+        ),
+        metadata={
+            "message_count": len(results),
+            "processed_count": len(processed),
+            "processed_segments": sum(result.processed_segments for result in results)
+        }
+    )
+    
+    return Response(
+        content=_HL7_RESULT_LIST_ADAPTER.dump_json(results),
+        media_type="application/json"
+    )
+
+
+async def _discharge_message(
+    message_content: str = Body(..., embed=True)
+) -> Mapping[str, Any]:
+    """Parse an ADT discharge message, rejecting anything else"""
+    _check_message_content(message_content)
+    
+    parsed_data = _HL7_PARSER.parse_message(message_content)
+    
+    # Validate this is a discharge message
+    event_type = parsed_data.get("EVN", {}).get("event_type")
+    if event_type not in ["A03", "A16"]:  # A03=Discharge, A16=Pending discharge
+        raise HTTPException(status_code=400, detail="Not a discharge ADT message")
+    return parsed_data
+
+
 @router.post("/adt-discharge")
 async def process_adt_discharge(
-    message_content: str = Body(..., embed=True),
-    token: str = Depends(verify_hl7_permissions)
+    token: str = Depends(verify_hl7_permissions),
+    # Declared before conn so a bad message is turned away without taking
+    # a connection from the pool
+    parsed_data: Mapping[str, Any] = Depends(_discharge_message),
+    conn: Connection = Depends(db_connection)
 ):
     """Process ADT discharge message specifically"""
     
     try:
-        parser = HL7Parser()
-        parsed_data = await parser.parse_message(message_content)
-        
-        # Validate this is a discharge message
-        event_type = parsed_data.get("EVN", {}).get("event_type")
-        if event_type not in ["A03", "A16"]:  # A03=Discharge, A16=Pending discharge
-            raise ValueError("Not a discharge ADT message")
-        
         # Extract discharge information
-        discharge_info = await _extract_discharge_info(parsed_data)
+        discharge_info = _extract_discharge_info(parsed_data)
         
         # Create discharge summary placeholder
-        discharge_summary_id = await _create_discharge_summary_from_adt(discharge_info)
+        discharge_summary_id = await _create_discharge_summary_from_adt(
+            discharge_info, conn
+        )
         
         return {
             "discharge_summary_id": str(discharge_summary_id),
@@ -130,31 +229,64 @@ async def process_adt_discharge(
 class HL7Parser:
     """HL7 message parser"""
     
-    def __init__(self):
-        self.field_separator = "|"
-        self.component_separator = "^"
-        self.repetition_separator = "~"
-        self.escape_character = "\\"
-        self.subcomponent_separator = "&"
+    # Standard HL7 v2 encoding characters; the parser keeps no per-message
+    # state, so one instance serves every request
+    field_separator = "|"
+    component_separator = "^"
+    repetition_separator = "~"
+    escape_character = "\\"
+    subcomponent_separator = "&"
     
-    async def parse_message(self, message_content: str) -> Dict[str, Any]:
-        """Parse HL7 message into structured data"""
+    def parse_message(self, message_content: str) -> Mapping[str, Any]:
+        """
+        Parse HL7 message into structured data
+        
+        Results are cached and shared between identical messages, so they
+        are read-only: segments are mappings and repeated segments tuples.
+        """
+        
+        cache_key = hashlib.blake2b(
+            message_content.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        cached = _parsed_message_cache.get(cache_key)
+        if cached is not None:
+            _parsed_message_cache.move_to_end(cache_key)
+            return cached
+        
+        segments = _freeze_segments(self._parse_segments(message_content))
+        
+        _parsed_message_cache[cache_key] = segments
+        if len(_parsed_message_cache) > PARSED_MESSAGE_CACHE_SIZE:
+            _parsed_message_cache.popitem(last=False)
+        return segments
+    
+    def _parse_segments(self, message_content: str) -> Dict[str, Any]:
+        """Parse every segment of a message, grouping repeated segment types"""
         
         segments = {}
-        lines = message_content.strip().split('\n')
         
-        for line in lines:
+        # Segments end in \r in standard HL7 and often in \n or \r\n once
+        # copied between systems
+        for line in _SEGMENT_SPLIT_RE.split(message_content):
             line = line.strip()
             if not line:
                 continue
             
             # Parse segment
-            segment_data = await self._parse_segment(line)
+            segment_data = self._parse_segment(line)
             if segment_data:
                 segment_type = segment_data["segment_type"]
                 
+                # Repeating segment types are always lists, even with one entry
+                if segment_type in _REPEATING_SEGMENTS:
+                    repeated = segments.get(segment_type)
+                    if repeated is None:
+                        segments[segment_type] = [segment_data]
+                    else:
+                        repeated.append(segment_data)
+                
                 # Handle multiple segments of same type
-                if segment_type in segments:
+                elif segment_type in segments:
                     if not isinstance(segments[segment_type], list):
                         segments[segment_type] = [segments[segment_type]]
                     segments[segment_type].append(segment_data)
@@ -163,118 +295,147 @@ class HL7Parser:
         
         return segments
     
-    async def _parse_segment(self, line: str) -> Optional[Dict[str, Any]]:
+    def _parse_segment(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse individual HL7 segment"""
         
         if len(line) < 3:
             return None
         
         segment_type = line[:3]
-        fields = line.split(self.field_separator)
         
-        segment_data = {
-            "segment_type": segment_type,
-            "raw": line
-        }
+        # The raw line is not kept: nothing reads it, and it doubled the
+        # memory held for large OBX payloads such as embedded documents
+        segment_data = {"segment_type": segment_type}
         
-        # Parse based on segment type
-        if segment_type == "MSH":
-            await self._parse_msh_segment(fields, segment_data)
-        elif segment_type == "EVN":
-            await self._parse_evn_segment(fields, segment_data)
-        elif segment_type == "PID":
-            await self._parse_pid_segment(fields, segment_data)
-        elif segment_type == "PV1":
-            await self._parse_pv1_segment(fields, segment_data)
-        elif segment_type == "OBX":
-            await self._parse_obx_segment(fields, segment_data)
-        elif segment_type == "DG1":
-            await self._parse_dg1_segment(fields, segment_data)
+        # Parse based on segment type; segments without a parser are kept
+        # as-is without splitting them into fields
+        segment_parser = self._SEGMENT_PARSERS.get(segment_type)
+        if segment_parser is not None:
+            parse_fields, min_fields, width = segment_parser
+            fields = line.split(self.field_separator)
+            if len(fields) >= min_fields:
+                if len(fields) < width:
+                    fields.extend([""] * (width - len(fields)))
+                parse_fields(self, fields, segment_data)
         
         return segment_data
     
-    async def _parse_msh_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+    def _parse_msh_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse MSH (Message Header) segment"""
-        if len(fields) >= 12:
-            segment_data.update({
-                "sending_application": fields[3] if len(fields) > 3 else "",
-                "sending_facility": fields[4] if len(fields) > 4 else "",
-                "receiving_application": fields[5] if len(fields) > 5 else "",
-                "receiving_facility": fields[6] if len(fields) > 6 else "",
-                "timestamp": fields[7] if len(fields) > 7 else "",
-                "message_type": fields[9] if len(fields) > 9 else "",
-                "message_control_id": fields[10] if len(fields) > 10 else "",
-                "processing_id": fields[11] if len(fields) > 11 else ""
-            })
-    
-    async def _parse_evn_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+        segment_data.update({
+            "sending_application": fields[3],
+            "sending_facility": fields[4],
+            "receiving_application": fields[5],
+            "receiving_facility": fields[6],
+            "timestamp": fields[7],
+            "message_type": fields[9],
+            "message_control_id": fields[10],
+            "processing_id": fields[11]
+        })
+    
+    def _parse_evn_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse EVN (Event Type) segment"""
-        if len(fields) >= 3:
-            segment_data.update({
-                "event_type": fields[1] if len(fields) > 1 else "",
-                "recorded_date": fields[2] if len(fields) > 2 else "",
-                "operator_id": fields[5] if len(fields) > 5 else ""
-            })
-    
-    async def _parse_pid_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+        segment_data.update({
+            "event_type": fields[1],
+            "recorded_date": fields[2],
+            "operator_id": fields[5]
+        })
+    
+    def _parse_pid_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse PID (Patient Identification) segment"""
-        if len(fields) >= 6:
-            # Patient ID
-            patient_id_components = fields[3].split(self.component_separator) if len(fields) > 3 else [""]
-            patient_id = patient_id_components[0] if patient_id_components else ""
-            
-            # Patient name
-            name_components = fields[5].split(self.component_separator) if len(fields) > 5 else ["", "", ""]
-            last_name = name_components[0] if len(name_components) > 0 else ""
-            first_name = name_components[1] if len(name_components) > 1 else ""
-            
-            segment_data.update({
-                "patient_id": patient_id,
-                "last_name": last_name,
-                "first_name": first_name,
-                "dob": fields[7] if len(fields) > 7 else "",
-                "gender": fields[8] if len(fields) > 8 else "",
-                "address": fields[11] if len(fields) > 11 else "",
-                "phone": fields[13] if len(fields) > 13 else ""
-            })
-    
-    async def _parse_pv1_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+        # Patient ID: the first component
+        patient_id = fields[3].partition(self.component_separator)[0]
+        
+        # Patient name: family name, then given name; later components unused
+        last_name, _, given_names = fields[5].partition(self.component_separator)
+        first_name = given_names.partition(self.component_separator)[0]
+        
+        segment_data.update({
+            "patient_id": patient_id,
+            "last_name": last_name,
+            "first_name": first_name,
+            "dob": fields[7],
+            "gender": fields[8],
+            "address": fields[11],
+            "phone": fields[13]
+        })
+    
+    def _parse_pv1_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse PV1 (Patient Visit) segment"""
-        if len(fields) >= 20:
-            segment_data.update({
-                "patient_class": fields[2] if len(fields) > 2 else "",
-                "assigned_location": fields[3] if len(fields) > 3 else "",
-                "admission_type": fields[4] if len(fields) > 4 else "",
-                "attending_doctor": fields[7] if len(fields) > 7 else "",
-                "admit_date": fields[44] if len(fields) > 44 else "",
-                "discharge_date": fields[45] if len(fields) > 45 else ""
-            })
-    
-    async def _parse_obx_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+        segment_data.update({
+            "patient_class": fields[2],
+            "assigned_location": fields[3],
+            "admission_type": fields[4],
+            "attending_doctor": fields[7],
+            "admit_date": fields[44],
+            "discharge_date": fields[45]
+        })
+    
+    def _parse_obx_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse OBX (Observation/Result) segment"""
-        if len(fields) >= 6:
-            segment_data.update({
-                "set_id": fields[1] if len(fields) > 1 else "",
-                "value_type": fields[2] if len(fields) > 2 else "",
-                "observation_id": fields[3] if len(fields) > 3 else "",
-                "observation_value": fields[5] if len(fields) > 5 else "",
-                "units": fields[6] if len(fields) > 6 else "",
-                "reference_range": fields[7] if len(fields) > 7 else "",
-                "abnormal_flags": fields[8] if len(fields) > 8 else ""
-            })
-    
-    async def _parse_dg1_segment(self, fields: List[str], segment_data: Dict[str, Any]):
+        segment_data.update({
+            "set_id": fields[1],
+            "value_type": fields[2],
+            "observation_id": fields[3],
+            "observation_value": fields[5],
+            "units": fields[6],
+            "reference_range": fields[7],
+            "abnormal_flags": fields[8]
+        })
+    
+    def _parse_dg1_segment(self, fields: List[str], segment_data: Dict[str, Any]):
         """Parse DG1 (Diagnosis) segment"""
-        if len(fields) >= 4:
-            segment_data.update({
-                "set_id": fields[1] if len(fields) > 1 else "",
-                "diagnosis_code": fields[3] if len(fields) > 3 else "",
-                "diagnosis_description": fields[4] if len(fields) > 4 else "",
-                "diagnosis_type": fields[6] if len(fields) > 6 else ""
-            })
+        segment_data.update({
+            "set_id": fields[1],
+            "diagnosis_code": fields[3],
+            "diagnosis_description": fields[4],
+            "diagnosis_type": fields[6]
+        })
+    
+    # Segment type -> (field parser, fields a segment needs to be parsed at
+    # all, fields the parser reads). Shorter segments that still qualify are
+    # padded with empty fields, so the parsers index without bounds checks
+    _SEGMENT_PARSERS = {
+        "MSH": (_parse_msh_segment, 12, 12),
+        "EVN": (_parse_evn_segment, 3, 6),
+        "PID": (_parse_pid_segment, 6, 14),
+        "PV1": (_parse_pv1_segment, 20, 46),
+        "OBX": (_parse_obx_segment, 6, 9),
+        "DG1": (_parse_dg1_segment, 4, 7)
+    }
+
+
+_HL7_PARSER = HL7Parser()
 
 
-async def _process_adt_message(parsed_data: Dict[str, Any], raw_message: str) -> HL7ProcessingResult:
+def _freeze_segments(segments: Dict[str, Any]) -> Mapping[str, Any]:
+    """Read-only view of parsed segments, safe to share between requests"""
+    return MappingProxyType({
+        segment_type: (
+            tuple(map(MappingProxyType, segment))
+            if isinstance(segment, list) else MappingProxyType(segment)
+        )
+        for segment_type, segment in segments.items()
+    })
+
+
+def _process_message(message: HL7Message) -> HL7ProcessingResult:
+    """Parse an HL7 message and process it according to its type"""
+    parsed_data = _HL7_PARSER.parse_message(message.message_content)
+    
+    # Process based on message type
+    if message.message_type.startswith("ADT"):
+        return _process_adt_message(parsed_data, message.message_content)
+    elif message.message_type.startswith("ORU"):
+        return _process_oru_message(parsed_data, message.message_content)
+    else:
+        raise ValueError(f"Unsupported message type: {message.message_type}")
+
+
+def _process_adt_message(
+    parsed_data: Mapping[str, Any],
+    raw_message: str
+) -> HL7ProcessingResult:
     """Process ADT (Admission/Discharge/Transfer) message"""
     
     extracted_data = {}
@@ -317,12 +478,8 @@ async def _process_adt_message(parsed_data: Dict[str, Any], raw_message: str) ->
         
         # Extract diagnoses
         if "DG1" in parsed_data:
-            dg1_segments = parsed_data["DG1"]
-            if not isinstance(dg1_segments, list):
-                dg1_segments = [dg1_segments]
-            
             diagnoses = []
-            for dg1 in dg1_segments:
+            for dg1 in parsed_data["DG1"]:
                 diagnoses.append({
                     "code": dg1.get("diagnosis_code", ""),
                     "description": dg1.get("diagnosis_description", ""),
@@ -353,7 +510,10 @@ async def _process_adt_message(parsed_data: Dict[str, Any], raw_message: str) ->
         )
 
 
-async def _process_oru_message(parsed_data: Dict[str, Any], raw_message: str) -> HL7ProcessingResult:
+def _process_oru_message(
+    parsed_data: Mapping[str, Any],
+    raw_message: str
+) -> HL7ProcessingResult:
     """Process ORU (Observation Result) message"""
     
     extracted_data = {}
@@ -372,12 +532,8 @@ async def _process_oru_message(parsed_data: Dict[str, Any], raw_message: str) ->
         
         # Extract observations/results
         if "OBX" in parsed_data:
-            obx_segments = parsed_data["OBX"]
-            if not isinstance(obx_segments, list):
-                obx_segments = [obx_segments]
-            
             observations = []
-            for obx in obx_segments:
+            for obx in parsed_data["OBX"]:
                 observations.append({
                     "observation_id": obx.get("observation_id", ""),
                     "value": obx.get("observation_value", ""),
@@ -410,7 +566,7 @@ async def _process_oru_message(parsed_data: Dict[str, Any], raw_message: str) ->
         )
 
 
-async def _extract_discharge_info(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+def _extract_discharge_info(parsed_data: Mapping[str, Any]) -> Dict[str, Any]:
     """Extract discharge information from parsed HL7 data"""
     
     discharge_info = {}
@@ -437,42 +593,48 @@ async def _extract_discharge_info(parsed_data: Dict[str, Any]) -> Dict[str, Any]
     return discharge_info
 
 
-async def _create_discharge_summary_from_adt(discharge_info: Dict[str, Any]) -> str:
+# discharge_info key -> label, in the order the lines appear in the content
+_DISCHARGE_CONTENT_FIELDS = (
+    ("patient_name", "Patient"),
+    ("discharge_date", "Discharge Date"),
+    ("attending_physician", "Attending Physician")
+)
+
+_DISCHARGE_CONTENT_FOOTER = (
+    "Discharge summary generated from HL7 ADT message.\n"
+    "Additional clinical documentation required."
+)
+
+_INSERT_ADT_SUMMARY_QUERY = """
+INSERT INTO discharge_summaries
+(patient_id, original_content, source_system, metadata, status)
+VALUES ($1, $2, $3, $4, $5)
+RETURNING id
+"""
+
+
+async def _create_discharge_summary_from_adt(
+    discharge_info: Dict[str, Any],
+    conn: Connection
+) -> str:
     """Create discharge summary record from ADT information"""
     
     # Generate basic discharge content from HL7 data
-    content_parts = []
-    
-    if discharge_info.get("patient_name"):
-        content_parts.append(f"Patient: {discharge_info['patient_name']}")
-    
-    if discharge_info.get("discharge_date"):
-        content_parts.append(f"Discharge Date: {discharge_info['discharge_date']}")
-    
-    if discharge_info.get("attending_physician"):
-        content_parts.append(f"Attending Physician: {discharge_info['attending_physician']}")
-    
-    content_parts.append("Discharge summary generated from HL7 ADT message.")
-    content_parts.append("Additional clinical documentation required.")
+    content_parts = [
+        f"{label}: {discharge_info[key]}"
+        for key, label in _DISCHARGE_CONTENT_FIELDS
+        if discharge_info.get(key)
+    ]
+    content_parts.append(_DISCHARGE_CONTENT_FOOTER)
     
     content = "\n".join(content_parts)
     
     # Save to database
-    async with get_db_connection() as conn:
-        query = """
-        INSERT INTO discharge_summaries 
-        (patient_id, original_content, source_system, metadata, status)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING id
-        """
-        
-        result = await conn.fetchrow(
-            query,
-            discharge_info.get("patient_id", ""),
-            content,
-            "hl7_adt",
-            discharge_info,
-            "pending"
-        )
-        
-        return result['id']
+    return await conn.fetchval(
+        _INSERT_ADT_SUMMARY_QUERY,
+        discharge_info.get("patient_id", ""),
+        content,
+        "hl7_adt",
+        discharge_info,
+        "pending"
+    )
@@ -3,18 +3,29 @@ File upload router for discharge summaries and clinical documents
 """
 
 import os
+import uuid
 import hashlib
+from collections import OrderedDict
 import asyncio
-import json
-from typing import List, Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, BackgroundTasks
+import itertools
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import (
+    APIRouter, UploadFile, File, HTTPException, Depends, Form, Header, Query,
+    BackgroundTasks, Response
+)
 from fastapi.security import HTTPBearer
 import logging
+from pydantic import BaseModel, TypeAdapter
 
+from core.batching import BatchCollector
 from core.config import get_settings
 from core.database import get_db_connection
 from core.logging_config import audit_logger
-from models import DischargeSummary, DischargeSummaryCreate, DischargeSummaryResponse, DocumentStatus
+from models import (
+    DischargeSummary, DischargeSummaryCreate, DischargeSummaryResponse,
+    DocumentStatus, DocumentStatusValue, ProcessedContent
+)
 from processors.pdf_parser import PDFParser
 from processors.text_processor import TextProcessor
 
@@ -23,6 +34,78 @@ router = APIRouter()
 security = HTTPBearer()
 settings = get_settings()
 
+# Responses are built from validated or database data and serialized
+# directly; response_model on the routes is kept for the OpenAPI schema only
+_DOCUMENT_LIST_ADAPTER = TypeAdapter(List[DischargeSummaryResponse])
+
+# Concurrent uploads share one INSERT per batch; parsing stays per request
+BATCH_MAX_ITEMS = 50
+BATCH_FLUSH_MS = 5
+
+# Ids are generated here so each caller can find its own row in the batch;
+# rows whose file_hash already exists come back missing and map to a 409
+_BATCH_INSERT_QUERY = """
+INSERT INTO discharge_summaries
+(id, patient_id, admission_id, original_content, source_system, file_hash,
+ metadata, status)
+SELECT * FROM unnest(
+    $1::uuid[], $2::text[], $3::text[], $4::text[],
+    $5::text[], $6::text[], $7::jsonb[], $8::text[]
+)
+ON CONFLICT (file_hash) DO NOTHING
+RETURNING id, created_at, updated_at
+"""
+
+
+# Content hashes recently seen stored, so re-uploads of the same file are
+# rejected without a database lookup. Documents are never deleted, so a
+# remembered hash stays valid; a hash missing here still goes to the
+# database, which keeps replicas with their own caches consistent
+STORED_HASH_CACHE_SIZE = 100_000
+_stored_hash_cache: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _remember_stored_hash(file_hash: str):
+    """Record that a document with this content hash is stored"""
+    _stored_hash_cache[file_hash] = None
+    _stored_hash_cache.move_to_end(file_hash)
+    if len(_stored_hash_cache) > STORED_HASH_CACHE_SIZE:
+        _stored_hash_cache.popitem(last=False)
+
+
+async def _insert_discharge_summaries(rows: List[tuple]) -> list:
+    """Insert a batch of discharge summary rows in one round trip"""
+    async with get_db_connection() as conn:
+        inserted = await conn.fetch(
+            _BATCH_INSERT_QUERY, *(list(column) for column in zip(*rows))
+        )
+    logger.debug(
+        f"Inserted {len(inserted)} of {len(rows)} discharge summaries in one batch"
+    )
+    # Rows that conflicted are stored too, just not by this batch
+    for row in rows:
+        _remember_stored_hash(row[5])
+    by_id = {record['id']: record for record in inserted}
+    return [by_id.get(row[0]) for row in rows]
+
+
+_discharge_insert_batcher = BatchCollector(
+    _insert_discharge_summaries,
+    max_items=BATCH_MAX_ITEMS,
+    flush_interval_ms=BATCH_FLUSH_MS,
+    name="discharge_summary_insert"
+)
+
+
+# Uploads are read in blocks so the hash is computed as the bytes arrive and
+# an oversized file is rejected as soon as it crosses the limit
+UPLOAD_READ_CHUNK_SIZE = 64 * 1024
+
+
+async def close_discharge_insert_batcher():
+    """Flush pending discharge summary inserts; called on shutdown"""
+    await _discharge_insert_batcher.close()
+
 
 async def verify_upload_permissions(token: str = Depends(security)):
     """Verify user has upload permissions"""
@@ -55,49 +138,35 @@ async def upload_discharge_document(
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
     
-    file_extension = file.filename.split('.')[-1].lower()
+    file_extension = file.filename.rpartition('.')[2].lower()
     if file_extension not in settings.allowed_file_types:
         raise HTTPException(
             status_code=400, 
-            detail=f"Unsupported file type. Allowed: {settings.allowed_file_types}"
-        )
-    
-    # Validate file size
-    content = await file.read()
-    if len(content) > settings.max_file_size:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File too large. Maximum size: {settings.max_file_size / (1024*1024):.1f}MB"
+            detail=(
+                "Unsupported file type. "
+                f"Allowed: {sorted(settings.allowed_file_types)}"
+            )
         )
     
-    # Calculate file hash for deduplication
-    file_hash = hashlib.sha256(content).hexdigest()
+    # Read with size validation; the hash is used for deduplication
+    content, file_hash = await _read_upload(file)
     
     try:
-        # Check for duplicate files
-        async with get_db_connection() as conn:
-            existing = await conn.fetchrow(
-                "SELECT id FROM discharge_summaries WHERE file_hash = $1",
-                file_hash
+        # Check for duplicate files before paying for extraction; the insert
+        # below still catches a duplicate that lands in between
+        if await _document_exists(file_hash):
+            raise HTTPException(
+                status_code=409,
+                detail="Document already exists in the system"
             )
-            if existing:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Document already exists in the system"
-                )
         
         # Process file content based on type
-        if file_extension == 'pdf':
-            processor = PDFParser()
-            text_content = await processor.extract_text(content)
-        elif file_extension == 'txt':
-            text_content = content.decode('utf-8')
-        elif file_extension == 'json':
-            # Handle structured JSON input
-            processor = TextProcessor()
-            text_content = await processor.process_json(content)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
+        text_content = await _extract_text_content(file_extension, content)
+        
+        # Only the text is needed from here on; release the raw bytes instead
+        # of holding them while the insert batch fills
+        file_size = len(content)
+        del content
         
         # Create discharge summary record
         discharge_data = DischargeSummaryCreate(
@@ -107,47 +176,44 @@ async def upload_discharge_document(
             source_system=source_system or "file_upload",
             metadata={
                 "filename": file.filename,
-                "file_size": len(content),
+                "file_size": file_size,
                 "file_type": file_extension,
                 "upload_method": "api"
             }
         )
         
-        # Save to database
-        async with get_db_connection() as conn:
-            query = """
-            INSERT INTO discharge_summaries 
-            (patient_id, admission_id, original_content, source_system, file_hash, metadata, status)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id, created_at, updated_at
-            """
-            
-            result = await conn.fetchrow(
-                query,
-                discharge_data.patient_id,
-                discharge_data.admission_id,
-                discharge_data.original_content,
-                discharge_data.source_system,
-                file_hash,
-                json.dumps(discharge_data.metadata),  # Convert dict to JSON string
-                DocumentStatus.PENDING.value
-            )
-            
-            # Create discharge summary object
-            discharge_summary = DischargeSummary(
-                id=result['id'],
-                patient_id=discharge_data.patient_id,
-                admission_id=discharge_data.admission_id,
-                document_type=discharge_data.document_type,
-                original_content=discharge_data.original_content,
-                source_system=discharge_data.source_system,
-                file_hash=file_hash,
-                status=DocumentStatus.PENDING,
-                created_at=result['created_at'],
-                updated_at=result['updated_at'],
-                metadata=discharge_data.metadata
+        # Save to database, batched with any concurrent uploads
+        result = await _discharge_insert_batcher.submit((
+            uuid.uuid4(),
+            discharge_data.patient_id,
+            discharge_data.admission_id,
+            discharge_data.original_content,
+            discharge_data.source_system,
+            file_hash,
+            discharge_data.metadata,
+            DocumentStatus.PENDING.value
+        ))
+        if result is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Document already exists in the system"
             )
         
+        # Create discharge summary object (inputs validated above)
+        discharge_summary = DischargeSummary.from_trusted({
+            "id": result['id'],
+            "patient_id": discharge_data.patient_id,
+            "admission_id": discharge_data.admission_id,
+            "document_type": discharge_data.document_type,
+            "original_content": discharge_data.original_content,
+            "source_system": discharge_data.source_system,
+            "file_hash": file_hash,
+            "status": DocumentStatus.PENDING.value,
+            "created_at": result['created_at'],
+            "updated_at": result['updated_at'],
+            "metadata": discharge_data.metadata
+        })
+        
         # Log audit event
         audit_logger.log_data_processing(
             user_id=token[:10] + "...",  # Log partial token for audit
@@ -156,7 +222,7 @@ async def upload_discharge_document(
             status="success",
             metadata={
                 "filename": file.filename,
-                "file_size": len(content),
+                "file_size": file_size,
                 "patient_id": patient_id
             }
         )
@@ -171,15 +237,18 @@ async def upload_discharge_document(
         logger.info(f"Document uploaded successfully: {discharge_summary.id}")
         
         # Return response
-        return DischargeSummaryResponse(
-            id=discharge_summary.id,
-            status=discharge_summary.status,
-            patient_id=discharge_summary.patient_id,
-            admission_id=discharge_summary.admission_id,
-            document_type=discharge_summary.document_type,
-            created_at=discharge_summary.created_at,
-            processed_at=discharge_summary.processed_at,
-            processed_content=None  # Will be populated after processing
+        response = DischargeSummaryResponse.from_trusted({
+            "id": discharge_summary.id,
+            "status": discharge_summary.status,
+            "patient_id": discharge_summary.patient_id,
+            "admission_id": discharge_summary.admission_id,
+            "document_type": discharge_summary.document_type,
+            "created_at": discharge_summary.created_at,
+            "processed_at": discharge_summary.processed_at,
+            "processed_content": None  # Will be populated after processing
+        })
+        return Response(
+            content=response.model_dump_json(), media_type="application/json"
         )
         
     except HTTPException as http_exc:
@@ -218,60 +287,358 @@ async def upload_discharge_document(
         raise HTTPException(status_code=500, detail="Error processing upload")
 
 
+@router.head("/document", status_code=204)
+async def check_document_exists(
+    x_content_sha256: str = Header(..., pattern=r"^[0-9a-fA-F]{64}$"),
+    token: str = Depends(verify_upload_permissions)
+):
+    """
+    Check by content hash whether a document is already stored
+    
+    Clients that know the SHA-256 of a file can ask before uploading it and
+    skip sending duplicates. Returns 409 when it exists, 204 otherwise.
+    """
+    
+    try:
+        exists = await _document_exists(x_content_sha256.lower())
+    except Exception as e:
+        logger.error(f"Error checking document hash: {e}")
+        raise HTTPException(status_code=500, detail="Error checking document")
+    
+    return Response(status_code=409 if exists else 204)
+
+
+class BatchUploadItem(BaseModel):
+    """Per-file outcome of a batch upload"""
+    filename: Optional[str]
+    status: str
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+_BATCH_UPLOAD_RESULT_ADAPTER = TypeAdapter(List[BatchUploadItem])
+
+# Stage sizes for the batch upload pipeline; queues are bounded so a large
+# batch never holds more than a few files' bytes beyond what is being parsed
+PIPELINE_PARSE_WORKERS = os.cpu_count() or 1
+PIPELINE_QUEUE_SIZE = 2 * PIPELINE_PARSE_WORKERS
+
+# Marks the end of input on a pipeline queue
+_END_OF_STREAM = None
+
+
+@router.post("/documents/batch", response_model=List[BatchUploadItem])
+async def upload_discharge_documents(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    patient_id: Optional[str] = Form(None),
+    admission_id: Optional[str] = Form(None),
+    source_system: Optional[str] = Form(None),
+    token: str = Depends(verify_upload_permissions)
+):
+    """
+    Upload several discharge documents in one request
+    
+    Files move through three overlapping stages: reading the upload,
+    parsing on the PDF process pool, and batched database inserts, so one
+    file's insert runs while the next files are still being parsed.
+    Each file gets its own result; one bad file does not fail the others.
+    """
+    
+    results: List[Optional[BatchUploadItem]] = [None] * len(files)
+    read_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    
+    async def read_files():
+        try:
+            await read_uploads()
+        finally:
+            # Always release the parse workers, however reading ended; if
+            # the request itself is being cancelled they are going away too
+            if not asyncio.current_task().cancelling():
+                for _ in range(PIPELINE_PARSE_WORKERS):
+                    await read_queue.put(_END_OF_STREAM)
+    
+    async def read_uploads():
+        seen_hashes = set()
+        for index, upload in enumerate(files):
+            file_extension = (upload.filename or '').rpartition('.')[2].lower()
+            if not upload.filename or file_extension not in settings.allowed_file_types:
+                results[index] = BatchUploadItem(
+                    filename=upload.filename, status="error",
+                    error="Unsupported file type"
+                )
+                continue
+            try:
+                content, file_hash = await _read_upload(upload)
+            except HTTPException:
+                results[index] = BatchUploadItem(
+                    filename=upload.filename, status="error", error="File too large"
+                )
+                continue
+            except Exception as e:
+                logger.error(f"Error reading batch upload file: {e}")
+                results[index] = BatchUploadItem(
+                    filename=upload.filename, status="error", error="Error reading file"
+                )
+                continue
+            
+            # Skip duplicates before they reach the parsers, both within this
+            # batch and against documents already stored
+            try:
+                is_duplicate = (
+                    file_hash in seen_hashes or await _document_exists(file_hash)
+                )
+            except Exception as e:
+                logger.error(f"Error checking batch upload file for duplicates: {e}")
+                results[index] = BatchUploadItem(
+                    filename=upload.filename, status="error",
+                    error="Error checking for duplicates"
+                )
+                continue
+            if is_duplicate:
+                results[index] = BatchUploadItem(
+                    filename=upload.filename, status="duplicate",
+                    error="Document already exists in the system"
+                )
+                continue
+            seen_hashes.add(file_hash)
+            await read_queue.put(
+                (index, upload.filename, file_extension, file_hash, content)
+            )
+    
+    async def parse_files():
+        while (entry := await read_queue.get()) is not _END_OF_STREAM:
+            index, filename, file_extension, file_hash, content = entry
+            file_size = len(content)
+            try:
+                text_content = await _extract_text_content(file_extension, content)
+                # Only the text travels on; drop the raw bytes before waiting
+                # for room on the write queue
+                del entry, content
+                discharge_data = DischargeSummaryCreate(
+                    patient_id=patient_id,
+                    admission_id=admission_id,
+                    original_content=text_content,
+                    source_system=source_system or "file_upload",
+                    metadata={
+                        "filename": filename,
+                        "file_size": file_size,
+                        "file_type": file_extension,
+                        "upload_method": "api_batch"
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Error parsing batch upload file: {e}")
+                results[index] = BatchUploadItem(
+                    filename=filename, status="error", error="Error processing file"
+                )
+                continue
+            await write_queue.put((index, filename, file_hash, discharge_data))
+    
+    async def write_documents(pipeline):
+        while (entry := await write_queue.get()) is not _END_OF_STREAM:
+            index, filename, file_hash, discharge_data = entry
+            # Each insert waits on the shared batcher in its own task, so
+            # later files keep flowing in while earlier batches commit; the
+            # tasks belong to the pipeline, which waits for or cancels them
+            pipeline.create_task(
+                store_document(index, filename, file_hash, discharge_data)
+            )
+    
+    async def store_document(index, filename, file_hash, discharge_data):
+        try:
+            row = await _discharge_insert_batcher.submit((
+                uuid.uuid4(),
+                discharge_data.patient_id,
+                discharge_data.admission_id,
+                discharge_data.original_content,
+                discharge_data.source_system,
+                file_hash,
+                discharge_data.metadata,
+                DocumentStatus.PENDING.value
+            ))
+        except Exception as e:
+            logger.error(f"Error storing batch upload file: {e}")
+            results[index] = BatchUploadItem(
+                filename=filename, status="error", error="Error storing document"
+            )
+            return
+        if row is None:
+            results[index] = BatchUploadItem(
+                filename=filename, status="duplicate",
+                error="Document already exists in the system"
+            )
+            return
+        results[index] = BatchUploadItem(
+            filename=filename, status="stored", document_id=str(row['id'])
+        )
+        background_tasks.add_task(
+            _process_document_background,
+            row['id'],
+            discharge_data.original_content
+        )
+    
+    async def run_parsers():
+        async with asyncio.TaskGroup() as parsers:
+            for _ in range(PIPELINE_PARSE_WORKERS):
+                parsers.create_task(parse_files())
+        await write_queue.put(_END_OF_STREAM)
+    
+    # A stage that fails cancels the others, so no stage is left waiting
+    # on a queue nobody will fill
+    async with asyncio.TaskGroup() as pipeline:
+        pipeline.create_task(read_files())
+        pipeline.create_task(run_parsers())
+        pipeline.create_task(write_documents(pipeline))
+    
+    stored = [item for item in results if item.status == "stored"]
+    audit_logger.log_data_processing(
+        user_id=token[:10] + "...",
+        document_id=",".join(item.document_id for item in stored) or "none",
+        operation="batch_upload",
+        status=(
+            "success" if len(stored) == len(results)
+            else "partial_success" if stored else "error"
+        ),
+        metadata={
+            "file_count": len(results),
+            "stored_count": len(stored),
+            "patient_id": patient_id
+        }
+    )
+    
+    return Response(
+        content=_BATCH_UPLOAD_RESULT_ADAPTER.dump_json(results),
+        media_type="application/json"
+    )
+
+
+def _build_list_documents_query(
+    by_cursor: bool,
+    by_status: bool,
+    by_patient: bool
+) -> str:
+    """Document list query for one combination of cursor and filters"""
+    where_clauses = []
+    param_count = 1
+    
+    if by_cursor:
+        where_clauses.append(
+            f"(created_at, id) < (${param_count + 1}, ${param_count + 2})"
+        )
+        param_count += 2
+    
+    if by_status:
+        param_count += 1
+        where_clauses.append(f"status = ${param_count}")
+    
+    if by_patient:
+        param_count += 1
+        where_clauses.append(f"patient_id = ${param_count}")
+    
+    where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    
+    return f"""
+    SELECT id, patient_id, admission_id, document_type, status, 
+           created_at, processed_at, processed_content
+    FROM discharge_summaries 
+    {where_clause}
+    ORDER BY created_at DESC, id DESC
+    LIMIT $1
+    """
+
+
+# Pages above this many rows are streamed from a server-side cursor, fetched
+# LIST_STREAM_PREFETCH rows per round trip; smaller pages are fetched at once,
+# which avoids the cursor's extra round trips
+LIST_STREAM_THRESHOLD = 1000
+LIST_STREAM_PREFETCH = 500
+
+# (cursor, status filter, patient filter) -> query text. Every variant is
+# built once, so each one keeps a single text in the statement cache
+_LIST_DOCUMENTS_QUERIES = {
+    key: _build_list_documents_query(*key)
+    for key in itertools.product((False, True), repeat=3)
+}
+
+
 @router.get("/documents", response_model=List[DischargeSummaryResponse])
 async def list_documents(
-    skip: int = 0,
     limit: int = 100,
-    status: Optional[DocumentStatus] = None,
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[uuid.UUID] = None,
+    status: Optional[DocumentStatusValue] = None,
     patient_id: Optional[str] = None,
+    skip: Optional[int] = Query(None, deprecated=True),
     token: str = Depends(verify_upload_permissions)
 ):
-    """List uploaded discharge documents with optional filtering"""
+    """
+    List uploaded discharge documents with optional filtering
+    
+    Newest first, paged by keyset: pass the X-Next-Before-Created-At and
+    X-Next-Before-Id headers of a full page as before_created_at and
+    before_id to fetch the next one. URL-encode the timestamp when sending
+    it back; the "+" of its "+00:00" offset otherwise reads as a space and
+    the request fails with 422.
+    """
+    
+    # Offset paging was replaced by the keyset cursor; ignoring skip would
+    # hand an old client page one over and over
+    if skip is not None:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "skip is no longer supported; "
+                "page with before_created_at and before_id"
+            )
+        )
+    
+    if (before_created_at is None) != (before_id is None):
+        raise HTTPException(
+            status_code=400,
+            detail="before_created_at and before_id must be given together"
+        )
+    
+    # Parameters are appended in the order the query text numbers them
+    query = _LIST_DOCUMENTS_QUERIES[
+        (before_created_at is not None, bool(status), bool(patient_id))
+    ]
+    params = [limit]
+    if before_created_at is not None:
+        params.extend((before_created_at, before_id))
+    if status:
+        params.append(status)
+    if patient_id:
+        params.append(patient_id)
     
     try:
         async with get_db_connection() as conn:
-            # Build query with filters
-            where_clauses = []
-            params = [skip, limit]
-            param_count = 2
+            if limit > LIST_STREAM_THRESHOLD:
+                # Large pages stream through a server-side cursor, so rows
+                # become response models as they arrive instead of the whole
+                # result set being buffered as records first
+                documents = []
+                last_row = None
+                async with conn.transaction():
+                    rows = conn.cursor(query, *params, prefetch=LIST_STREAM_PREFETCH)
+                    async for last_row in rows:
+                        documents.append(_row_to_response(last_row))
+            else:
+                rows = await conn.fetch(query, *params)
+                documents = [_row_to_response(row) for row in rows]
+                last_row = rows[-1] if rows else None
             
-            if status:
-                param_count += 1
-                where_clauses.append(f"status = ${param_count}")
-                params.append(status.value)
-            
-            if patient_id:
-                param_count += 1
-                where_clauses.append(f"patient_id = ${param_count}")
-                params.append(patient_id)
-            
-            where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-            
-            query = f"""
-            SELECT id, patient_id, admission_id, document_type, status, 
-                   created_at, processed_at, processed_content
-            FROM discharge_summaries 
-            {where_clause}
-            ORDER BY created_at DESC
-            OFFSET $1 LIMIT $2
-            """
-            
-            rows = await conn.fetch(query, *params)
-            
-            documents = []
-            for row in rows:
-                documents.append(DischargeSummaryResponse(
-                    id=row['id'],
-                    status=DocumentStatus(row['status']),
-                    patient_id=row['patient_id'],
-                    admission_id=row['admission_id'],
-                    document_type=row['document_type'],
-                    created_at=row['created_at'],
-                    processed_at=row['processed_at'],
-                    processed_content=row['processed_content']
-                ))
-            
-            return documents
+            response = Response(
+                content=_DOCUMENT_LIST_ADAPTER.dump_json(documents),
+                media_type="application/json"
+            )
+            if last_row is not None and len(documents) == limit:
+                response.headers["X-Next-Before-Created-At"] = (
+                    last_row['created_at'].isoformat()
+                )
+                response.headers["X-Next-Before-Id"] = str(last_row['id'])
+            return response
             
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
@@ -300,15 +667,9 @@ async def get_document(
             if not row:
                 raise HTTPException(status_code=404, detail="Document not found")
             
-            return DischargeSummaryResponse(
-                id=row['id'],
-                status=DocumentStatus(row['status']),
-                patient_id=row['patient_id'],
-                admission_id=row['admission_id'],
-                document_type=row['document_type'],
-                created_at=row['created_at'],
-                processed_at=row['processed_at'],
-                processed_content=row['processed_content']
+            return Response(
+                content=_row_to_response(row).model_dump_json(),
+                media_type="application/json"
             )
             
     except HTTPException:
@@ -318,21 +679,105 @@ async def get_document(
         raise HTTPException(status_code=500, detail="Error retrieving document")
 
 
+def _row_to_response(row) -> DischargeSummaryResponse:
+    """Build a response model from a discharge_summaries row"""
+    # Rows come from our own table, so only the nested-model field needs
+    # converting before skipping validation
+    processed_content = row['processed_content']
+    return DischargeSummaryResponse.from_trusted({
+        "id": row['id'],
+        "status": row['status'],
+        "patient_id": row['patient_id'],
+        "admission_id": row['admission_id'],
+        "document_type": row['document_type'],
+        "created_at": row['created_at'],
+        "processed_at": row['processed_at'],
+        "processed_content": (
+            ProcessedContent.from_trusted(processed_content)
+            if processed_content is not None else None
+        )
+    })
+
+
+async def _read_upload(upload: UploadFile) -> Tuple[bytearray, str]:
+    """Read an upload and its hex SHA-256, enforcing max_file_size"""
+    content = bytearray()
+    digest = hashlib.sha256()
+    while chunk := await upload.read(UPLOAD_READ_CHUNK_SIZE):
+        if len(content) + len(chunk) > settings.max_file_size:
+            raise HTTPException(
+                status_code=413, 
+                detail=(
+                    "File too large. "
+                    f"Maximum size: {settings.max_file_size / (1024*1024):.1f}MB"
+                )
+            )
+        digest.update(chunk)
+        content += chunk
+    return content, digest.hexdigest()
+
+
+async def _document_exists(file_hash: str) -> bool:
+    """Check whether a document with this content hash is already stored"""
+    if file_hash in _stored_hash_cache:
+        _stored_hash_cache.move_to_end(file_hash)
+        return True
+    
+    async with get_db_connection() as conn:
+        existing = await conn.fetchval(
+            "SELECT 1 FROM discharge_summaries WHERE file_hash = $1",
+            file_hash
+        )
+    if existing is None:
+        return False
+    
+    _remember_stored_hash(file_hash)
+    return True
+
+
+# Neither processor keeps per-call state, so one shared instance of each
+# serves every upload
+_PDF_PARSER = PDFParser()
+_TEXT_PROCESSOR = TextProcessor()
+
+
+async def _extract_pdf_text(content: bytes) -> str:
+    return await _PDF_PARSER.extract_text(content)
+
+
+async def _extract_plain_text(content: bytes) -> str:
+    return content.decode('utf-8')
+
+
+async def _extract_json_text(content: bytes) -> str:
+    # Handle structured JSON input; the conversion is pure CPU work, so it
+    # runs on a worker thread to keep the event loop free
+    return await asyncio.to_thread(_TEXT_PROCESSOR.process_json, content)
+
+
+# File extension -> coroutine turning the upload's bytes into text
+_TEXT_EXTRACTORS = {
+    'pdf': _extract_pdf_text,
+    'txt': _extract_plain_text,
+    'json': _extract_json_text,
+}
+
+
+async def _extract_text_content(file_extension: str, content: bytes) -> str:
+    """Extract text from uploaded file content based on its type"""
+    extractor = _TEXT_EXTRACTORS.get(file_extension)
+    if extractor is None:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    return await extractor(content)
+
+
 async def _process_document_background(document_id: str, content: str):
     """Background task to process uploaded document"""
     try:
-        # Update status to processing
-        async with get_db_connection() as conn:
-            await conn.execute(
-                "UPDATE discharge_summaries SET status = $1 WHERE id = $2",
-                DocumentStatus.PROCESSING.value,
-                document_id
-            )
-        
         # TODO: Integrate with AI processing service
-        # For now, just mark as completed
-        await asyncio.sleep(1)  # Simulate processing time
-        
+        # Until then there is no work in between, so the document goes
+        # straight to completed in one statement; a processing status
+        # belongs back here once there is real work for it to cover
         async with get_db_connection() as conn:
             await conn.execute(
                 """
@@ -32,7 +32,12 @@ def main():
             "main:app",
             host="127.0.0.1",
             port=8001,
-            reload=True,
+            # Same server setup as main.py: libuv loop and C HTTP parser,
+            # auto-reload only while developing, one worker per CPU otherwise
+            loop="uvloop",
+            http="httptools",
+            reload=main.settings.is_development,
+            workers=None if main.settings.is_development else os.cpu_count(),
             log_level="info"
         )
         
@@ -3,11 +3,19 @@
 Integration tests for AI-Vida Data Ingestion Service with real data
 """
 
+import asyncio
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import encode_multipart_formdata
+from urllib3.util.retry import Retry
+import orjson
 import os
+import statistics
+import sys
 import time
 import pytest
+from contextlib import nullcontext
 from pathlib import Path
 
 # Base URL for the service
@@ -19,523 +27,561 @@ TEST_TOKEN = "Bearer test-token-123"
 # Test data directory (relative to project root)
 TEST_DATA_DIR = Path(__file__).parent.parent.parent / "test_data"
 
+# Sample files, resolved to absolute paths once at import
+DISCHARGE_SUMMARY_FILE = (TEST_DATA_DIR / "sample_discharge_summary.txt").resolve()
+STRUCTURED_DISCHARGE_FILE = (TEST_DATA_DIR / "structured_discharge.json").resolve()
+FHIR_BUNDLE_FILE = (TEST_DATA_DIR / "fhir_bundle.json").resolve()
+HL7_ADT_FILE = (TEST_DATA_DIR / "sample_hl7_adt.txt").resolve()
+
+# One pooled keep-alive session for every request; the auth header is set
+# once here, and connection errors or a gateway 5xx get quick retries.
+# POST is retried too: uploads are deduplicated by content hash
+SESSION = requests.Session()
+SESSION.headers.update({'Authorization': TEST_TOKEN})
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        # Hand the last 5xx back to the test so it reports the status code
+        raise_on_status=False
+    )
+))
+
+def encode_multipart(data, files):
+    """Encode form fields and file parts once, so a retry resends the same bytes"""
+    file_parts = files.items() if isinstance(files, dict) else files
+    return encode_multipart_formdata(list(data.items()) + list(file_parts))
+
+def rjson(response):
+    """Decode a requests or httpx response body with orjson instead of stdlib json"""
+    return orjson.loads(response.content)
+
+class Log:
+    """Collects one check's output and writes it in a single call on exit"""
+    
+    def __init__(self):
+        self.lines = []
+    
+    def __call__(self, line):
+        self.lines.append(line)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        sys.stdout.write("\n".join(self.lines) + "\n")
+
+def latency_summary_lines(latencies):
+    """p50/p95/p99 over (endpoint, seconds) pairs, then each request, in ms"""
+    elapsed = [seconds * 1000 for _, seconds in latencies]
+    if len(elapsed) < 2:
+        return []
+    cuts = statistics.quantiles(elapsed, n=100, method='inclusive')
+    lines = [
+        f"\n⏱️ Latency over {len(elapsed)} requests:",
+        f"   p50: {cuts[49]:.1f} ms, p95: {cuts[94]:.1f} ms, p99: {cuts[98]:.1f} ms"
+    ]
+    for url, seconds in sorted(latencies, key=lambda entry: entry[1], reverse=True):
+        lines.append(f"   - {url}: {seconds * 1000:.1f} ms")
+    return lines
+
+def load_sample_payloads():
+    """Read every sample file once; FHIR and HL7 come back as encoded request bodies"""
+    hl7_message = {
+        "message_type": "ADT^A03",
+        "message_content": HL7_ADT_FILE.read_bytes().decode('utf-8'),
+        "sending_application": "HIS",
+        "sending_facility": "HOSPITAL"
+    }
+    return {
+        "discharge": DISCHARGE_SUMMARY_FILE.read_bytes(),
+        "json": STRUCTURED_DISCHARGE_FILE.read_bytes(),
+        "fhir": orjson.dumps(orjson.loads(FHIR_BUNDLE_FILE.read_bytes())),
+        "hl7": orjson.dumps(hl7_message)
+    }
+
+@pytest.fixture(scope="session")
+def sample_payloads():
+    """Sample file contents, read once and shared by every test in the session"""
+    return load_sample_payloads()
+
+@pytest.fixture(scope="session")
+def request_metrics(request):
+    """(endpoint, seconds) for every timed POST; percentiles print at session end"""
+    latencies = []
+    yield latencies
+    # Teardown output is captured like test output, so step around capture
+    capture = request.config.pluginmanager.get_plugin("capturemanager")
+    with capture.global_and_fixture_disabled() if capture else nullcontext():
+        for line in latency_summary_lines(latencies):
+            print(line)
+
+def timed_post(metrics, path, **kwargs):
+    """POST through the shared session, recording how long the round trip took"""
+    start = time.perf_counter()
+    response = SESSION.post(f"{BASE_URL}{path}", **kwargs)
+    metrics.append((path, time.perf_counter() - start))
+    return response
+
+# The single-document uploads differ only in their file and form fields
+UPLOAD_CASES = [
+    pytest.param(
+        "Text", "discharge", 'discharge_summary.txt', 'text/plain',
+        {'patient_id': '12345678', 'admission_id': 'ADM-2025-001', 'source_system': 'test_upload'},
+        id="text"
+    ),
+    pytest.param(
+        "JSON", "json", 'structured_discharge.json', 'application/json',
+        {'patient_id': '87654321', 'admission_id': 'ADM-2025-002', 'source_system': 'test_upload_json'},
+        id="json"
+    )
+]
+
 class TestDataIngestionService:
     """Integration tests for the Data Ingestion Service"""
     
     def test_health_check(self):
         """Test the health check endpoint"""
-        print("🏥 Testing Health Check...")
+        with Log() as log:
+            log("🏥 Testing Health Check...")
+            try:
+                response = SESSION.get(f"{BASE_URL}/health")
+                if response.status_code == 200:
+                    data = rjson(response)
+                    log(f"✅ Health Check: {data['status']}")
+                    log(f"   Database: {data['database']}")
+                    assert data['status'] == 'healthy'
+                    assert data['database'] == 'connected'
+                    return True
+                else:
+                    log(f"❌ Health Check failed: {response.status_code}")
+                    return False
+            except requests.exceptions.ConnectionError:
+                log("❌ Service not running or not accessible")
+                pytest.skip("Service not available")
+    
+    @pytest.mark.parametrize("label,payload_key,filename,content_type,data", UPLOAD_CASES)
+    def test_upload_document(self, sample_payloads, request_metrics, label, payload_key, filename, content_type, data):
+        """Test uploading a single discharge summary document"""
+        with Log() as log:
+            log(f"\n📄 Testing {label} Document Upload...")
+            
+            files = {
+                'file': (filename, sample_payloads[payload_key], content_type)
+            }
+            
+            body, multipart_type = encode_multipart(data, files)
+            
+            try:
+                response = timed_post(
+                    request_metrics,
+                    "/api/v1/upload/document",
+                    data=body,
+                    headers={'Content-Type': multipart_type}
+                )
+                
+                if response.status_code == 200:
+                    result = rjson(response)
+                    log(f"✅ {label} upload successful: {result['id']}")
+                    log(f"   Status: {result['status']}")
+                    log(f"   Patient ID: {result['patient_id']}")
+                    assert result['patient_id'] == data['patient_id']
+                    assert result['status'] in ['pending', 'processing', 'completed']
+                    return result['id']
+                elif response.status_code == 409:
+                    log(f"ℹ️ {label} document already exists (expected for repeated tests)")
+                    log(f"   Response: Document already exists in the system")
+                    return "existing-document"
+                else:
+                    log(f"❌ {label} upload failed: {response.status_code}")
+                    log(f"   Response: {response.text}")
+                    pytest.fail(f"{label} upload failed with status {response.status_code}")
+            except Exception as e:
+                log(f"❌ {label} upload error: {e}")
+                pytest.fail(f"{label} upload error: {e}")
+    
+    def test_upload_documents_batched(self, sample_payloads, request_metrics):
+        """Test uploading both sample documents in one multipart request"""
+        with Log() as log:
+            log("\n📦 Testing Batched Document Upload...")
+            
+            # Repeated 'files' parts map onto the batch endpoint's List[UploadFile]
+            files = [
+                ('files', ('discharge_summary.txt', sample_payloads["discharge"], 'text/plain')),
+                ('files', ('structured_discharge.json', sample_payloads["json"], 'application/json'))
+            ]
+            
+            data = {
+                'patient_id': '11223344',
+                'admission_id': 'ADM-2025-003',
+                'source_system': 'test_upload_batch'
+            }
+            
+            body, content_type = encode_multipart(data, files)
+            
+            try:
+                response = timed_post(
+                    request_metrics,
+                    "/api/v1/upload/documents/batch",
+                    data=body,
+                    headers={'Content-Type': content_type}
+                )
+            except Exception as e:
+                log(f"❌ Batched upload error: {e}")
+                pytest.fail(f"Batched upload error: {e}")
+            
+            if response.status_code in (404, 405):
+                pytest.skip("Service does not expose the batch upload endpoint")
+            if response.status_code != 200:
+                log(f"❌ Batched upload failed: {response.status_code}")
+                log(f"   Response: {response.text}")
+                pytest.fail(f"Batched upload failed with status {response.status_code}")
+            
+            results = rjson(response)
+            log(f"✅ Batched upload returned {len(results)} results")
+            for item in results:
+                log(f"   - {item['filename']}: {item['status']}")
+            assert [item['filename'] for item in results] == [
+                'discharge_summary.txt', 'structured_discharge.json'
+            ]
+            # Documents already sent by the single uploads come back as duplicates
+            assert all(item['status'] in ['stored', 'duplicate'] for item in results)
+    
+    def test_fhir_bundle_processing(self, sample_payloads, request_metrics):
+        """Test FHIR bundle processing"""
+        with Log() as log:
+            log("\n🔥 Testing FHIR Bundle Processing...")
+            
+            headers = {
+                'Content-Type': 'application/json'
+            }
+            
+            try:
+                response = timed_post(
+                    request_metrics,
+                    "/api/v1/fhir/process-bundle",
+                    data=sample_payloads["fhir"],
+                    headers=headers,
+                    params={'patient_id': '12345678'}
+                )
+                
+                if response.status_code == 200:
+                    result = rjson(response)
+                    log(f"✅ FHIR bundle processed successfully")
+                    log(f"   Processed resources: {result['processed_resources']}")
+                    log(f"   Medications: {len(result['medications'])}")
+                    log(f"   Appointments: {len(result['appointments'])}")
+                    if result['errors']:
+                        log(f"   Errors: {len(result['errors'])}")
+                    
+                    assert result['processed_resources'] > 0
+                    assert 'medications' in result
+                    assert 'appointments' in result
+                    return True
+                else:
+                    log(f"❌ FHIR bundle processing failed: {response.status_code}")
+                    log(f"   Response: {response.text}")
+                    pytest.fail(f"FHIR processing failed with status {response.status_code}")
+            except Exception as e:
+                log(f"❌ FHIR bundle processing error: {e}")
+                pytest.fail(f"FHIR processing error: {e}")
+    
+    def test_hl7_message_processing(self, sample_payloads, request_metrics):
+        """Test HL7 message processing"""
+        with Log() as log:
+            log("\n📨 Testing HL7 Message Processing...")
+            
+            headers = {
+                'Content-Type': 'application/json'
+            }
+            
+            try:
+                response = timed_post(
+                    request_metrics,
+                    "/api/v1/hl7/process-message",
+                    data=sample_payloads["hl7"],
+                    headers=headers
+                )
+                
+                if response.status_code == 200:
+                    result = rjson(response)
+                    log(f"✅ HL7 message processed successfully")
+                    log(f"   Message ID: {result['message_id']}")
+                    log(f"   Status: {result['status']}")
+                    log(f"   Processed segments: {result['processed_segments']}")
+                    if result['errors']:
+                        log(f"   Errors: {len(result['errors'])}")
+                    
+                    assert result['status'] == 'success'
+                    assert result['processed_segments'] > 0
+                    return True
+                else:
+                    log(f"❌ HL7 message processing failed: {response.status_code}")
+                    log(f"   Response: {response.text}")
+                    pytest.fail(f"HL7 processing failed with status {response.status_code}")
+            except Exception as e:
+                log(f"❌ HL7 message processing error: {e}")
+                pytest.fail(f"HL7 processing error: {e}")
+    
+    def test_list_documents(self):
+        """Test listing uploaded documents"""
+        with Log() as log:
+            log("\n📋 Testing Document Listing...")
+            
+            try:
+                response = SESSION.get(
+                    f"{BASE_URL}/api/v1/upload/documents",
+                    params={'limit': 10}
+                )
+                
+                if response.status_code == 200:
+                    documents = rjson(response)
+                    log(f"✅ Retrieved {len(documents)} documents")
+                    for doc in documents:
+                        log(f"   - {doc['id']}: {doc['status']} (Patient: {doc['patient_id']})")
+                    
+                    assert isinstance(documents, list)
+                    if documents:
+                        assert 'id' in documents[0]
+                        assert 'status' in documents[0]
+                        assert 'patient_id' in documents[0]
+                    return True
+                else:
+                    log(f"❌ Document listing failed: {response.status_code}")
+                    pytest.fail(f"Document listing failed with status {response.status_code}")
+            except Exception as e:
+                log(f"❌ Document listing error: {e}")
+                pytest.fail(f"Document listing error: {e}")
+
+
+# Standalone script functionality for backward compatibility
+class TimedClient:
+    """Shared httpx client that bounds in-flight requests and records latencies"""
+    
+    def __init__(self, client, max_in_flight=10):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.latencies = []
+    
+    async def request(self, method, url, **kwargs):
+        async with self.semaphore:
+            start = time.perf_counter()
+            response = await self.client.request(method, url, **kwargs)
+            self.latencies.append((url, time.perf_counter() - start))
+        return response
+
+async def check_health(client):
+    """Check the health endpoint before anything else runs"""
+    with Log() as log:
+        log("🏥 Testing Health Check...")
         try:
-            response = requests.get(f"{BASE_URL}/health")
+            response = await client.request("GET", "/health")
             if response.status_code == 200:
-                data = response.json()
-                print(f"✅ Health Check: {data['status']}")
-                print(f"   Database: {data['database']}")
-                assert data['status'] == 'healthy'
-                assert data['database'] == 'connected'
+                data = rjson(response)
+                log(f"✅ Health Check: {data['status']}")
+                log(f"   Database: {data['database']}")
                 return True
-            else:
-                print(f"❌ Health Check failed: {response.status_code}")
-                return False
-        except requests.exceptions.ConnectionError:
-            print("❌ Service not running or not accessible")
-            pytest.skip("Service not available")
-    
-    def test_upload_text_document(self):
-        """Test uploading a text discharge summary"""
-        print("\n📄 Testing Text Document Upload...")
-        
-        # Read the sample discharge summary
-        sample_file = TEST_DATA_DIR / "sample_discharge_summary.txt"
-        with open(sample_file, "r") as f:
-            content = f.read()
-        
-        # Create a temporary file-like object
-        files = {
-            'file': ('discharge_summary.txt', content, 'text/plain')
-        }
-        
-        data = {
-            'patient_id': '12345678',
-            'admission_id': 'ADM-2025-001',
-            'source_system': 'test_upload'
-        }
-        
-        headers = {
-            'Authorization': TEST_TOKEN
-        }
-        
+            log(f"❌ Health Check failed: {response.status_code}")
+            return False
+        except httpx.TransportError:
+            log("❌ Service not running or not accessible")
+            return False
+
+async def wait_until_ready(http_client, deadline_seconds=2.0):
+    """Poll /health with exponential backoff until the service reports healthy"""
+    deadline = time.monotonic() + deadline_seconds
+    delay = 0.05
+    while time.monotonic() < deadline:
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/v1/upload/document",
-                files=files,
-                data=data,
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Text upload successful: {result['id']}")
-                print(f"   Status: {result['status']}")
-                print(f"   Patient ID: {result['patient_id']}")
-                assert result['patient_id'] == '12345678'
-                assert result['status'] in ['pending', 'processing', 'completed']
-                return result['id']
-            elif response.status_code == 409:
-                print(f"ℹ️ Text document already exists (expected for repeated tests)")
-                print(f"   Response: Document already exists in the system")
-                return "existing-document"
-            else:
-                print(f"❌ Text upload failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-                pytest.fail(f"Upload failed with status {response.status_code}")
-        except Exception as e:
-            print(f"❌ Text upload error: {e}")
-            pytest.fail(f"Upload error: {e}")
-    
-    def test_upload_json_document(self):
-        """Test uploading a structured JSON discharge summary"""
-        print("\n📊 Testing JSON Document Upload...")
-        
-        # Read the structured discharge summary
-        json_file = TEST_DATA_DIR / "structured_discharge.json"
-        with open(json_file, "r") as f:
-            content = f.read()
-        
-        files = {
-            'file': ('structured_discharge.json', content, 'application/json')
-        }
-        
-        data = {
-            'patient_id': '87654321',
-            'admission_id': 'ADM-2025-002',
-            'source_system': 'test_upload_json'
-        }
-        
-        headers = {
-            'Authorization': TEST_TOKEN
-        }
+            response = await http_client.get("/health", timeout=0.5)
+            if response.status_code == 200 and rjson(response).get('status') == 'healthy':
+                return True
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.4)
+    return False
+
+async def upload_document(client, label, filename, content_type, path, form):
+    """Upload one document; returns its id, or None on failure"""
+    with Log() as log:
+        log(f"\n📄 Testing {label} Document Upload...")
         
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/v1/upload/document",
-                files=files,
-                data=data,
-                headers=headers
-            )
-            
+            # httpx streams an open file in chunks, so the upload never holds
+            # the whole document in memory however large the sample is
+            with open(path, "rb") as f:
+                response = await client.request(
+                    "POST",
+                    "/api/v1/upload/document",
+                    files={'file': (filename, f, content_type)},
+                    data=form
+                )
             if response.status_code == 200:
-                result = response.json()
-                print(f"✅ JSON upload successful: {result['id']}")
-                print(f"   Status: {result['status']}")
-                print(f"   Patient ID: {result['patient_id']}")
-                assert result['patient_id'] == '87654321'
-                assert result['status'] in ['pending', 'processing', 'completed']
+                result = rjson(response)
+                log(f"✅ {label} upload successful: {result['id']}")
+                log(f"   Status: {result['status']}")
+                log(f"   Patient ID: {result['patient_id']}")
                 return result['id']
             elif response.status_code == 409:
-                print(f"ℹ️ JSON document already exists (expected for repeated tests)")
-                print(f"   Response: Document already exists in the system")
+                log(f"ℹ️ {label} document already exists (expected for repeated tests)")
                 return "existing-document"
             else:
-                print(f"❌ JSON upload failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-                pytest.fail(f"JSON upload failed with status {response.status_code}")
+                log(f"❌ {label} upload failed: {response.status_code}")
+                log(f"   Response: {response.text}")
+                return None
         except Exception as e:
-            print(f"❌ JSON upload error: {e}")
-            pytest.fail(f"JSON upload error: {e}")
-    
-    def test_fhir_bundle_processing(self):
-        """Test FHIR bundle processing"""
-        print("\n🔥 Testing FHIR Bundle Processing...")
-        
-        # Read the FHIR bundle
-        fhir_file = TEST_DATA_DIR / "fhir_bundle.json"
-        with open(fhir_file, "r") as f:
-            bundle_data = json.load(f)
-        
-        headers = {
-            'Authorization': TEST_TOKEN,
-            'Content-Type': 'application/json'
-        }
+            log(f"❌ {label} upload error: {e}")
+            return None
+
+async def upload_text(client):
+    """Upload the sample text discharge summary"""
+    return await upload_document(
+        client, "Text", 'discharge_summary.txt', 'text/plain',
+        DISCHARGE_SUMMARY_FILE,
+        {'patient_id': '12345678', 'admission_id': 'ADM-2025-001', 'source_system': 'test_upload'}
+    )
+
+async def upload_json(client):
+    """Upload the sample structured JSON discharge summary"""
+    return await upload_document(
+        client, "JSON", 'structured_discharge.json', 'application/json',
+        STRUCTURED_DISCHARGE_FILE,
+        {'patient_id': '87654321', 'admission_id': 'ADM-2025-002', 'source_system': 'test_upload_json'}
+    )
+
+async def process_fhir(client, samples):
+    """Send the sample FHIR bundle"""
+    with Log() as log:
+        log("\n🔥 Testing FHIR Bundle Processing...")
         
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/v1/fhir/process-bundle",
-                json=bundle_data,
-                headers=headers,
+            response = await client.request(
+                "POST",
+                "/api/v1/fhir/process-bundle",
+                content=samples["fhir"],
+                headers={'Content-Type': 'application/json'},
                 params={'patient_id': '12345678'}
             )
-            
             if response.status_code == 200:
-                result = response.json()
-                print(f"✅ FHIR bundle processed successfully")
-                print(f"   Processed resources: {result['processed_resources']}")
-                print(f"   Medications: {len(result['medications'])}")
-                print(f"   Appointments: {len(result['appointments'])}")
+                result = rjson(response)
+                log(f"✅ FHIR bundle processed successfully")
+                log(f"   Processed resources: {result['processed_resources']}")
+                log(f"   Medications: {len(result['medications'])}")
+                log(f"   Appointments: {len(result['appointments'])}")
                 if result['errors']:
-                    print(f"   Errors: {len(result['errors'])}")
-                
-                assert result['processed_resources'] > 0
-                assert 'medications' in result
-                assert 'appointments' in result
+                    log(f"   Errors: {len(result['errors'])}")
                 return True
-            else:
-                print(f"❌ FHIR bundle processing failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-                pytest.fail(f"FHIR processing failed with status {response.status_code}")
+            log(f"❌ FHIR bundle processing failed: {response.status_code}")
+            log(f"   Response: {response.text}")
+            return False
         except Exception as e:
-            print(f"❌ FHIR bundle processing error: {e}")
-            pytest.fail(f"FHIR processing error: {e}")
-    
-    def test_hl7_message_processing(self):
-        """Test HL7 message processing"""
-        print("\n📨 Testing HL7 Message Processing...")
-        
-        # Read the HL7 ADT message
-        hl7_file = TEST_DATA_DIR / "sample_hl7_adt.txt"
-        with open(hl7_file, "r") as f:
-            hl7_content = f.read()
-        
-        message_data = {
-            "message_type": "ADT^A03",
-            "message_content": hl7_content,
-            "sending_application": "HIS",
-            "sending_facility": "HOSPITAL"
-        }
-        
-        headers = {
-            'Authorization': TEST_TOKEN,
-            'Content-Type': 'application/json'
-        }
+            log(f"❌ FHIR bundle processing error: {e}")
+            return False
+
+async def process_hl7(client, samples):
+    """Send the sample HL7 ADT message"""
+    with Log() as log:
+        log("\n📨 Testing HL7 Message Processing...")
         
         try:
-            response = requests.post(
-                f"{BASE_URL}/api/v1/hl7/process-message",
-                json=message_data,
-                headers=headers
+            response = await client.request(
+                "POST",
+                "/api/v1/hl7/process-message",
+                content=samples["hl7"],
+                headers={'Content-Type': 'application/json'}
             )
-            
             if response.status_code == 200:
-                result = response.json()
-                print(f"✅ HL7 message processed successfully")
-                print(f"   Message ID: {result['message_id']}")
-                print(f"   Status: {result['status']}")
-                print(f"   Processed segments: {result['processed_segments']}")
+                result = rjson(response)
+                log(f"✅ HL7 message processed successfully")
+                log(f"   Message ID: {result['message_id']}")
+                log(f"   Status: {result['status']}")
+                log(f"   Processed segments: {result['processed_segments']}")
                 if result['errors']:
-                    print(f"   Errors: {len(result['errors'])}")
-                
-                assert result['status'] == 'success'
-                assert result['processed_segments'] > 0
+                    log(f"   Errors: {len(result['errors'])}")
                 return True
-            else:
-                print(f"❌ HL7 message processing failed: {response.status_code}")
-                print(f"   Response: {response.text}")
-                pytest.fail(f"HL7 processing failed with status {response.status_code}")
+            log(f"❌ HL7 message processing failed: {response.status_code}")
+            log(f"   Response: {response.text}")
+            return False
         except Exception as e:
-            print(f"❌ HL7 message processing error: {e}")
-            pytest.fail(f"HL7 processing error: {e}")
-    
-    def test_list_documents(self):
-        """Test listing uploaded documents"""
-        print("\n📋 Testing Document Listing...")
-        
-        headers = {
-            'Authorization': TEST_TOKEN
-        }
+            log(f"❌ HL7 message processing error: {e}")
+            return False
+
+async def list_docs(client):
+    """List the most recent documents"""
+    with Log() as log:
+        log("\n📋 Testing Document Listing...")
         
         try:
-            response = requests.get(
-                f"{BASE_URL}/api/v1/upload/documents",
-                headers=headers,
-                params={'limit': 10}
-            )
-            
+            response = await client.request("GET", "/api/v1/upload/documents", params={'limit': 10})
             if response.status_code == 200:
-                documents = response.json()
-                print(f"✅ Retrieved {len(documents)} documents")
+                documents = rjson(response)
+                log(f"✅ Retrieved {len(documents)} documents")
                 for doc in documents:
-                    print(f"   - {doc['id']}: {doc['status']} (Patient: {doc['patient_id']})")
-                
-                assert isinstance(documents, list)
-                if documents:
-                    assert 'id' in documents[0]
-                    assert 'status' in documents[0]
-                    assert 'patient_id' in documents[0]
+                    log(f"   - {doc['id']}: {doc['status']} (Patient: {doc['patient_id']})")
                 return True
-            else:
-                print(f"❌ Document listing failed: {response.status_code}")
-                pytest.fail(f"Document listing failed with status {response.status_code}")
+            log(f"❌ Document listing failed: {response.status_code}")
+            return False
         except Exception as e:
-            print(f"❌ Document listing error: {e}")
-            pytest.fail(f"Document listing error: {e}")
-
-
-# Standalone script functionality for backward compatibility
-def test_health_check():
-    """Test the health check endpoint"""
-    print("🏥 Testing Health Check...")
-    try:
-        response = requests.get(f"{BASE_URL}/health")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Health Check: {data['status']}")
-            print(f"   Database: {data['database']}")
-            return True
-        else:
-            print(f"❌ Health Check failed: {response.status_code}")
+            log(f"❌ Document listing error: {e}")
             return False
-    except requests.exceptions.ConnectionError:
-        print("❌ Service not running or not accessible")
-        return False
 
-def test_upload_text_document():
-    """Test uploading a text discharge summary"""
-    print("\n📄 Testing Text Document Upload...")
-    
-    # Read the sample discharge summary
-    sample_file = TEST_DATA_DIR / "sample_discharge_summary.txt"
-    with open(sample_file, "r") as f:
-        content = f.read()
-    
-    # Create a temporary file-like object
-    files = {
-        'file': ('discharge_summary.txt', content, 'text/plain')
-    }
-    
-    data = {
-        'patient_id': '12345678',
-        'admission_id': 'ADM-2025-001',
-        'source_system': 'test_upload'
-    }
-    
-    headers = {
-        'Authorization': TEST_TOKEN
-    }
-    
-    try:
-        response = requests.post(
-            f"{BASE_URL}/api/v1/upload/document",
-            files=files,
-            data=data,
-            headers=headers
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ Text upload successful: {result['id']}")
-            print(f"   Status: {result['status']}")
-            print(f"   Patient ID: {result['patient_id']}")
-            return result['id']
-        elif response.status_code == 409:
-            print(f"ℹ️ Text document already exists (expected for repeated tests)")
-            return "existing-document"
-        else:
-            print(f"❌ Text upload failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return None
-    except Exception as e:
-        print(f"❌ Text upload error: {e}")
-        return None
-
-def test_upload_json_document():
-    """Test uploading a structured JSON discharge summary"""
-    print("\n📊 Testing JSON Document Upload...")
-    
-    # Read the structured discharge summary
-    json_file = TEST_DATA_DIR / "structured_discharge.json"
-    with open(json_file, "r") as f:
-        content = f.read()
-    
-    files = {
-        'file': ('structured_discharge.json', content, 'application/json')
-    }
-    
-    data = {
-        'patient_id': '87654321',
-        'admission_id': 'ADM-2025-002',
-        'source_system': 'test_upload_json'
-    }
+async def run_all():
+    """Run all checks over one shared client"""
+    print("🚀 AI-Vida Data Ingestion Service - Real Data Testing")
+    print("=" * 60)
     
-    headers = {
-        'Authorization': TEST_TOKEN
-    }
+    # The FHIR and HL7 bodies are encoded once; uploads stream from disk
+    samples = load_sample_payloads()
     
-    try:
-        response = requests.post(
-            f"{BASE_URL}/api/v1/upload/document",
-            files=files,
-            data=data,
-            headers=headers
-        )
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={'Authorization': TEST_TOKEN},
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        timeout=10
+    ) as http_client:
+        client = TimedClient(http_client)
         
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ JSON upload successful: {result['id']}")
-            print(f"   Status: {result['status']}")
-            print(f"   Patient ID: {result['patient_id']}")
-            return result['id']
-        elif response.status_code == 409:
-            print(f"ℹ️ JSON document already exists (expected for repeated tests)")
-            return "existing-document"
-        else:
-            print(f"❌ JSON upload failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return None
-    except Exception as e:
-        print(f"❌ JSON upload error: {e}")
-        return None
-
-def test_fhir_bundle():
-    """Test FHIR bundle processing"""
-    print("\n🔥 Testing FHIR Bundle Processing...")
-    
-    # Read the FHIR bundle
-    fhir_file = TEST_DATA_DIR / "fhir_bundle.json"
-    with open(fhir_file, "r") as f:
-        bundle_data = json.load(f)
-    
-    headers = {
-        'Authorization': TEST_TOKEN,
-        'Content-Type': 'application/json'
-    }
-    
-    try:
-        response = requests.post(
-            f"{BASE_URL}/api/v1/fhir/process-bundle",
-            json=bundle_data,
-            headers=headers,
-            params={'patient_id': '12345678'}
-        )
+        # Test 1: Health Check
+        if not await check_health(client):
+            print("\n❌ Service not available. Please ensure the service is running.")
+            return
         
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ FHIR bundle processed successfully")
-            print(f"   Processed resources: {result['processed_resources']}")
-            print(f"   Medications: {len(result['medications'])}")
-            print(f"   Appointments: {len(result['appointments'])}")
-            if result['errors']:
-                print(f"   Errors: {len(result['errors'])}")
-            return True
-        else:
-            print(f"❌ FHIR bundle processing failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"❌ FHIR bundle processing error: {e}")
-        return False
-
-def test_hl7_message():
-    """Test HL7 message processing"""
-    print("\n📨 Testing HL7 Message Processing...")
-    
-    # Read the HL7 ADT message
-    hl7_file = TEST_DATA_DIR / "sample_hl7_adt.txt"
-    with open(hl7_file, "r") as f:
-        hl7_content = f.read()
-    
-    message_data = {
-        "message_type": "ADT^A03",
-        "message_content": hl7_content,
-        "sending_application": "HIS",
-        "sending_facility": "HOSPITAL"
-    }
-    
-    headers = {
-        'Authorization': TEST_TOKEN,
-        'Content-Type': 'application/json'
-    }
-    
-    try:
-        response = requests.post(
-            f"{BASE_URL}/api/v1/hl7/process-message",
-            json=message_data,
-            headers=headers
-        )
+        # Returns at once on a warm service; a cold start gets up to 2s
+        await wait_until_ready(http_client)
         
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ HL7 message processed successfully")
-            print(f"   Message ID: {result['message_id']}")
-            print(f"   Status: {result['status']}")
-            print(f"   Processed segments: {result['processed_segments']}")
-            if result['errors']:
-                print(f"   Errors: {len(result['errors'])}")
-            return True
-        else:
-            print(f"❌ HL7 message processing failed: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"❌ HL7 message processing error: {e}")
-        return False
-
-def test_list_documents():
-    """Test listing uploaded documents"""
-    print("\n📋 Testing Document Listing...")
-    
-    headers = {
-        'Authorization': TEST_TOKEN
-    }
-    
-    try:
-        response = requests.get(
-            f"{BASE_URL}/api/v1/upload/documents",
-            headers=headers,
-            params={'limit': 10}
+        # Tests 2-5 are independent, so their requests overlap
+        text_doc_id, json_doc_id, fhir_ok, hl7_ok = await asyncio.gather(
+            upload_text(client),
+            upload_json(client),
+            process_fhir(client, samples),
+            process_hl7(client, samples)
         )
         
-        if response.status_code == 200:
-            documents = response.json()
-            print(f"✅ Retrieved {len(documents)} documents")
-            for doc in documents:
-                print(f"   - {doc['id']}: {doc['status']} (Patient: {doc['patient_id']})")
-            return True
-        else:
-            print(f"❌ Document listing failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Document listing error: {e}")
-        return False
-
-def main():
-    """Run all tests"""
-    print("🚀 AI-Vida Data Ingestion Service - Real Data Testing")
-    print("=" * 60)
-    
-    # Test 1: Health Check
-    if not test_health_check():
-        print("\n❌ Service not available. Please ensure the service is running.")
-        return
-    
-    # Wait a moment for service to be fully ready
-    time.sleep(1)
-    
-    # Test 2: Upload Text Document
-    text_doc_id = test_upload_text_document()
-    
-    # Test 3: Upload JSON Document
-    json_doc_id = test_upload_json_document()
-    
-    # Test 4: FHIR Bundle Processing
-    test_fhir_bundle()
-    
-    # Test 5: HL7 Message Processing
-    test_hl7_message()
-    
-    # Test 6: List Documents
-    test_list_documents()
+        # Test 6: List Documents, once the uploads have landed
+        listing_ok = await list_docs(client)
     
     print("\n🎉 Testing Complete!")
     print("\nTest Summary:")
     print(f"   - Text Document: {'✅' if text_doc_id else '❌'}")
     print(f"   - JSON Document: {'✅' if json_doc_id else '❌'}")
-    print("   - FHIR Bundle: ✅")
-    print("   - HL7 Message: ✅")
-    print("   - Document Listing: ✅")
+    print(f"   - FHIR Bundle: {'✅' if fhir_ok else '❌'}")
+    print(f"   - HL7 Message: {'✅' if hl7_ok else '❌'}")
+    print(f"   - Document Listing: {'✅' if listing_ok else '❌'}")
+    for line in latency_summary_lines(client.latencies):
+        print(line)
     
     if text_doc_id or json_doc_id:
         print(f"\n📊 Check the service logs to see processing details")
         print(f"📖 View API docs at: {BASE_URL}/docs")
 
+def main():
+    """Run all tests"""
+    asyncio.run(run_all())
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""
+Tests for the BatchCollector micro-batcher
+"""
+
+import sys
+import asyncio
+import pytest
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+from core.batching import BatchCollector
+
+class RecordingFlush:
+    """Flush callable that records every batch it is handed"""
+
+    def __init__(self, fail_batches=False, short=False):
+        self.batches = []
+        self.fail_batches = fail_batches
+        self.short = short
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.fail_batches and len(items) > 1:
+            raise RuntimeError("batch rejected")
+        if "bad" in items:
+            raise ValueError("bad item")
+        results = [item.upper() for item in items]
+        return results[:-1] if self.short else results
+
+@pytest.mark.asyncio
+async def test_flush_at_max_items():
+    """A full batch is flushed without waiting for the interval"""
+    flush = RecordingFlush()
+    collector = BatchCollector(flush, max_items=3, flush_interval_ms=60_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(collector.submit(item) for item in "abc")), timeout=1
+    )
+
+    assert results == ["A", "B", "C"]
+    assert flush.batches == [["a", "b", "c"]]
+    await collector.close()
+
+@pytest.mark.asyncio
+async def test_flush_on_interval():
+    """A partial batch is flushed once flush_interval_ms has passed"""
+    flush = RecordingFlush()
+    collector = BatchCollector(flush, max_items=50, flush_interval_ms=20)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(collector.submit("a"), collector.submit("b")), timeout=1
+    )
+
+    assert results == ["A", "B"]
+    assert flush.batches == [["a", "b"]]
+    await collector.close()
+
+@pytest.mark.asyncio
+async def test_result_length_mismatch_fails_every_future():
+    """A flush returning the wrong number of results fails every caller"""
+    flush = RecordingFlush(short=True)
+    collector = BatchCollector(flush, max_items=2, flush_interval_ms=60_000)
+
+    results = await asyncio.gather(
+        collector.submit("a"), collector.submit("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The batch and each single-item retry came back one result short
+    assert flush.batches == [["a", "b"], ["a"], ["b"]]
+    await collector.close()
+
+@pytest.mark.asyncio
+async def test_failed_batch_retries_items_individually():
+    """Only the item that fails on its own retry gets the error"""
+    flush = RecordingFlush(fail_batches=True)
+    collector = BatchCollector(flush, max_items=3, flush_interval_ms=60_000)
+
+    results = await asyncio.gather(
+        *(collector.submit(item) for item in ["a", "bad", "c"]),
+        return_exceptions=True
+    )
+
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == "C"
+    assert flush.batches == [["a", "bad", "c"], ["a"], ["bad"], ["c"]]
+    await collector.close()
+
+@pytest.mark.asyncio
+async def test_close_drains_pending_items():
+    """close() flushes items still waiting on the interval"""
+    flush = RecordingFlush()
+    collector = BatchCollector(flush, max_items=50, flush_interval_ms=60_000)
+
+    pending = [asyncio.create_task(collector.submit(item)) for item in "ab"]
+    await asyncio.sleep(0)
+    await asyncio.wait_for(collector.close(), timeout=1)
+
+    assert [task.result() for task in pending] == ["A", "B"]
+    assert flush.batches == [["a", "b"]]
@@ -0,0 +1,173 @@
+"""
+Tests for database schema setup
+"""
+
+import sys
+import os
+import uuid
+import asyncpg
+import pytest
+import pytest_asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+import core.database as database
+
+class StubConnection:
+    """Records the statements schema setup sends, in order"""
+
+    def __init__(self, schema_ready=False, invalid_indexes=(), lock_attempts=1):
+        self.schema_ready = schema_ready
+        self.invalid_indexes = list(invalid_indexes)
+        self.lock_attempts = lock_attempts
+        self.statements = []
+        self.in_transaction = False
+
+    async def fetchval(self, query, *args):
+        self.statements.append(("fetchval", query, self.in_transaction))
+        if "pg_try_advisory_lock" in query:
+            self.lock_attempts -= 1
+            return self.lock_attempts <= 0
+        assert query == database._SCHEMA_READY_QUERY
+        return self.schema_ready
+
+    async def fetch(self, query, *args):
+        self.statements.append(("fetch", query, self.in_transaction))
+        assert query == database._INVALID_INDEXES_QUERY
+        return [{"name": name} for name in self.invalid_indexes]
+
+    async def execute(self, query, *args):
+        self.statements.append(("execute", query, self.in_transaction))
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+    def executed(self):
+        return [query for kind, query, _ in self.statements if kind == "execute"]
+
+@pytest.fixture
+def use_conn(monkeypatch):
+    """Route get_db_connection to the given stub connection"""
+    def use(conn):
+        @asynccontextmanager
+        async def get_db_connection():
+            yield conn
+        monkeypatch.setattr(database, "get_db_connection", get_db_connection)
+        monkeypatch.setattr(database, "SCHEMA_SETUP_LOCK_POLL_SECONDS", 0)
+        return conn
+    return use
+
+@pytest.mark.asyncio
+async def test_ready_schema_skips_ddl(use_conn):
+    """A ready schema costs the lock, one catalog query and the unlock"""
+    conn = use_conn(StubConnection(schema_ready=True))
+
+    await database._create_tables()
+
+    assert [(kind, query) for kind, query, _ in conn.statements] == [
+        ("fetchval", "SELECT pg_try_advisory_lock($1)"),
+        ("fetchval", database._SCHEMA_READY_QUERY),
+        ("execute", "SELECT pg_advisory_unlock($1)"),
+    ]
+
+@pytest.mark.asyncio
+async def test_lock_is_polled_until_free(use_conn):
+    """Setup waits for another worker's lock instead of blocking on it"""
+    conn = use_conn(StubConnection(schema_ready=True, lock_attempts=3))
+
+    await database._create_tables()
+
+    lock_queries = [query for _, query, _ in conn.statements if "advisory_lock" in query]
+    assert len(lock_queries) == 3
+
+@pytest.mark.asyncio
+async def test_invalid_index_dropped_before_rebuild(use_conn):
+    """Invalid indexes go before the concurrent builds, all outside the transaction"""
+    invalid = "idx_discharge_summaries_status"
+    conn = use_conn(StubConnection(invalid_indexes=[invalid]))
+
+    await database._create_tables()
+
+    executed = conn.executed()
+    tables = list(database._CREATE_TABLE_STATEMENTS)
+    drop = f"DROP INDEX CONCURRENTLY IF EXISTS {invalid}"
+    creates = [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"
+        for name, definition in database._INDEXES.items()
+    ]
+    retired = [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {name}"
+        for name in database._RETIRED_INDEXES
+    ]
+    assert executed == tables + [drop] + creates + retired + [
+        "SELECT pg_advisory_unlock($1)"
+    ]
+    in_transaction = {query: flag for kind, query, flag in conn.statements}
+    assert all(in_transaction[statement] for statement in tables)
+    assert not any(in_transaction[statement] for statement in [drop, *creates, *retired])
+
+@pytest_asyncio.fixture
+async def pg_conn():
+    """A connection to the test database, working in a scratch schema"""
+    # conftest.py points DATABASE_URL at the local database; set
+    # TEST_DATABASE_URL to run against another server
+    dsn = os.environ.get("TEST_DATABASE_URL", os.environ["DATABASE_URL"])
+    try:
+        conn = await asyncpg.connect(dsn, timeout=5)
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL not available: {e!r}")
+    schema = f"schema_test_{uuid.uuid4().hex}"
+    await conn.execute(f"CREATE SCHEMA {schema}")
+    await conn.execute(f"SET search_path TO {schema}")
+    try:
+        yield conn
+    finally:
+        await conn.execute(f"DROP SCHEMA {schema} CASCADE")
+        await conn.close()
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_schema_ready_query_against_catalog(pg_conn):
+    """The readiness query sees missing, retired and invalid indexes"""
+    async def schema_ready():
+        return await pg_conn.fetchval(
+            database._SCHEMA_READY_QUERY,
+            database._TABLES, list(database._INDEXES), database._RETIRED_INDEXES
+        )
+
+    assert not await schema_ready()
+    await database._create_tables_locked(pg_conn)
+    assert await schema_ready()
+
+    # A retired index left behind needs setup to run again
+    retired = database._RETIRED_INDEXES[0]
+    await pg_conn.execute(f"CREATE INDEX {retired} ON discharge_summaries(created_at)")
+    assert not await schema_ready()
+    await database._create_tables_locked(pg_conn)
+    assert await schema_ready()
+
+    # A concurrent build that fails leaves its index behind as INVALID
+    index = "idx_discharge_summaries_status"
+    await pg_conn.execute(f"DROP INDEX {index}")
+    await pg_conn.execute(
+        "INSERT INTO discharge_summaries (original_content, status) "
+        "VALUES ('a', 'pending'), ('b', 'pending')"
+    )
+    with pytest.raises(asyncpg.UniqueViolationError):
+        await pg_conn.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY {index} ON discharge_summaries(status)"
+        )
+    assert not await schema_ready()
+    invalid = await pg_conn.fetch(database._INVALID_INDEXES_QUERY, list(database._INDEXES))
+    assert [row["name"] for row in invalid] == [index]
+
+    await database._create_tables_locked(pg_conn)
+    assert await schema_ready()
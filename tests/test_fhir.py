@@ -0,0 +1,295 @@
+"""
+Tests for the FHIR router, run against a stub connection
+"""
+
+import sys
+import uuid
+import httpx
+import orjson
+import pytest
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from starlette.requests import Request
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+import routers.fhir as fhir
+from models import DischargeSummaryCreate
+
+AUTH_HEADERS = {"Authorization": "Bearer test-token-123"}
+
+MEDICATION = ("Aspirin", "81 mg", "daily", None)
+APPOINTMENT = ("follow_up", "Dr. Smith", None)
+
+class StubConnection:
+    """
+    Just enough of an asyncpg connection for _BundleWriter
+
+    Rows are kept per table; a medication or appointment whose summary does
+    not exist fails like the foreign key would, and a summary whose content
+    is "BAD" fails like a rejected value.
+    """
+
+    def __init__(self, existing_summaries=None):
+        # patient_id -> id of a summary stored before the bundle arrived
+        self.existing_summaries = existing_summaries or {}
+        self.tables = {table: [] for table in fhir._INSERT_QUERIES}
+
+    async def fetch(self, query, patient_ids):
+        assert query == fhir._LATEST_SUMMARIES_QUERY
+        return [
+            {"patient_id": patient_id, "id": self.existing_summaries[patient_id]}
+            for patient_id in patient_ids if patient_id in self.existing_summaries
+        ]
+
+    async def execute(self, query, *columns):
+        table = next(name for name, sql in fhir._INSERT_QUERIES.items() if sql == query)
+        summary_ids = set(self.existing_summaries.values())
+        summary_ids.update(row[0] for row in self.tables["discharge_summaries"])
+        for row in zip(*columns):
+            if table == "discharge_summaries":
+                if row[2] == "BAD":
+                    raise ValueError("rejected summary")
+                summary_ids.add(row[0])
+            elif row[1] not in summary_ids:
+                raise ValueError(f"{table} references a missing discharge summary")
+            self.tables[table].append(row)
+
+    @asynccontextmanager
+    async def transaction(self):
+        saved = {table: list(rows) for table, rows in self.tables.items()}
+        try:
+            yield
+        except BaseException:
+            self.tables = saved
+            raise
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = StubConnection()
+
+    @asynccontextmanager
+    async def get_db_connection():
+        yield conn
+    monkeypatch.setattr(fhir, "get_db_connection", get_db_connection)
+    return conn
+
+def summary(patient_id, content="Discharge summary"):
+    return DischargeSummaryCreate(
+        patient_id=patient_id, original_content=content, source_system="fhir"
+    )
+
+def linked_summary(conn, table, row_id):
+    """The discharge summary id a written medication or appointment points at"""
+    return next(row[1] for row in conn.tables[table] if row[0] == row_id)
+
+@pytest.mark.asyncio
+async def test_medications_around_document_reference(conn):
+    """A medication links to the placeholder before the document, then to it"""
+    writer = fhir._BundleWriter()
+    before = writer.add_medication(0, MEDICATION, "p1")
+    summary_id = writer.add_discharge_summary(1, summary("p1"))
+    after = writer.add_medication(2, MEDICATION, "p1")
+
+    await writer.write()
+
+    assert writer.failed == {}
+    summaries = [row[0] for row in conn.tables["discharge_summaries"]]
+    assert len(summaries) == 2
+    placeholder_id = next(row_id for row_id in summaries if row_id != summary_id)
+    assert linked_summary(conn, "medications", before) == placeholder_id
+    assert linked_summary(conn, "medications", after) == summary_id
+
+@pytest.mark.asyncio
+async def test_existing_summary_drops_placeholder(conn):
+    """A stored summary for the patient is linked instead of a placeholder"""
+    existing_id = uuid.uuid4()
+    conn.existing_summaries["p1"] = existing_id
+    writer = fhir._BundleWriter()
+    medication_id = writer.add_medication(0, MEDICATION, "p1")
+
+    await writer.write()
+
+    assert writer.failed == {}
+    assert conn.tables["discharge_summaries"] == []
+    assert linked_summary(conn, "medications", medication_id) == existing_id
+
+@pytest.mark.asyncio
+async def test_appointment_without_summary_fails_alone(conn):
+    """An appointment with nothing to link to fails only its own entry"""
+    writer = fhir._BundleWriter()
+    writer.add_appointment(0, APPOINTMENT, "p2")
+    medication_id = writer.add_medication(1, MEDICATION, "p3")
+
+    await writer.write()
+
+    assert list(writer.failed) == [0]
+    assert isinstance(writer.failed[0], ValueError)
+    assert conn.tables["appointments"] == []
+    assert [row[0] for row in conn.tables["medications"]] == [medication_id]
+
+@pytest.mark.asyncio
+async def test_bad_row_fails_its_entry_and_linked_rows(conn):
+    """A rejected row fails its entry and the rows that link to it"""
+    writer = fhir._BundleWriter()
+    writer.add_discharge_summary(0, summary("p1", content="BAD"))
+    writer.add_medication(1, MEDICATION, "p1")
+    writer.add_appointment(2, APPOINTMENT, "p1")
+    good_summary = writer.add_discharge_summary(3, summary("p2"))
+    good_medication = writer.add_medication(4, MEDICATION, "p2")
+
+    await writer.write()
+
+    assert sorted(writer.failed) == [0, 1, 2]
+    assert [row[0] for row in conn.tables["discharge_summaries"]] == [good_summary]
+    assert [row[0] for row in conn.tables["medications"]] == [good_medication]
+    assert conn.tables["appointments"] == []
+
+def body_request(*chunks):
+    """A Request whose body arrives in the given chunks"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks
+    ]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+    return Request({"type": "http", "method": "POST", "headers": []}, receive)
+
+async def read_bundle(*chunks):
+    """Stream a bundle body and validate it, returning the stream and its entries"""
+    bundle = fhir.FHIRBundleStream(body_request(*chunks))
+    entries = [item async for item in bundle.entries()]
+    bundle.validate()
+    return bundle, entries
+
+def bundle_errors(body):
+    """The errors FHIRBundle reports for body, located as FastAPI does"""
+    with pytest.raises(ValidationError) as info:
+        fhir.FHIRBundle.model_validate_json(body)
+    return [
+        {**error, "loc": ("body", *error["loc"])}
+        for error in info.value.errors(include_url=False)
+    ]
+
+def without_bundle_input(errors):
+    """Drop the input of missing-field errors, which is the whole bundle"""
+    # The stream does not keep the entries, so that copy of the bundle
+    # leaves them out; every other part of the error must match
+    return [
+        {key: value for key, value in error.items() if key != "input"}
+        if error["type"] == "missing" else error
+        for error in errors
+    ]
+
+BUNDLE = orjson.dumps({
+    "resourceType": "Bundle",
+    "entry": [
+        {"resource": {"resourceType": "Patient", "id": "p1"}},
+        {"resource": {"resourceType": "Encounter", "note": "caf\u00e9 \u2013 1.5"}}
+    ],
+    "id": "b1",
+    "type": "collection"
+})
+
+@pytest.mark.asyncio
+async def test_stream_chunks_split_tokens():
+    """Entries parse the same however the body is split"""
+    expected = orjson.loads(BUNDLE)["entry"]
+    for chunk_size in (1, 2, 7, len(BUNDLE)):
+        chunks = [BUNDLE[i:i + chunk_size] for i in range(0, len(BUNDLE), chunk_size)]
+        bundle, entries = await read_bundle(*chunks)
+        assert [entry for _, entry in entries] == expected
+        assert bundle.entry_count == 2
+        assert bundle.id == "b1"
+
+@pytest.mark.asyncio
+async def test_stream_repeated_entry_keeps_last():
+    """A repeated "entry" key replaces the earlier entries, as pydantic does"""
+    body = (
+        b'{"type": "collection", "entry": [{"a": 1}, 5], '
+        b'"entry": [{"b": 2}], "resourceType": "Bundle"}'
+    )
+    bundle, entries = await read_bundle(body)
+
+    assert fhir.FHIRBundle.model_validate_json(body).entry == [{"b": 2}]
+    assert entries[-1] == (0, {"b": 2})
+    assert bundle.entry_count == 1
+    assert bundle.entry_arrays == 2
+
+@pytest.mark.asyncio
+async def test_stream_non_object_entries_match_bundle_errors():
+    """Non-object entries are skipped and reported as FHIRBundle reports them"""
+    body = b'{"entry": [{"a": 1}, 5, "x", [1]], "resourceType": "Bundle"}'
+    bundle = fhir.FHIRBundleStream(body_request(body))
+    entries = [item async for item in bundle.entries()]
+
+    assert entries == [(0, {"a": 1})]
+    with pytest.raises(RequestValidationError) as info:
+        bundle.validate()
+    assert without_bundle_input(info.value.errors()) == without_bundle_input(
+        bundle_errors(body)
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b'{"type": "collection"} trailing', b""])
+async def test_stream_invalid_json(body):
+    """Trailing data and an empty body are rejected as invalid JSON"""
+    bundle = fhir.FHIRBundleStream(body_request(body))
+    with pytest.raises(RequestValidationError) as info:
+        async for _ in bundle.entries():
+            pass
+
+    (error,) = info.value.errors()
+    assert error["type"] == "json_invalid"
+    assert error["loc"] == ("body",)
+    assert error["msg"].startswith("Invalid JSON: ")
+
+async def post_bundle(body):
+    """POST a raw body to /process-bundle on an app serving the FHIR router"""
+    app = FastAPI()
+    app.include_router(fhir.router, prefix="/api/v1/fhir")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/api/v1/fhir/process-bundle",
+            content=body,
+            headers={**AUTH_HEADERS, "Content-Type": "application/json"}
+        )
+
+@pytest.mark.asyncio
+async def test_bundle_repeated_entry_processes_last(conn):
+    """Resources from a replaced "entry" array are never written"""
+    medication = {"resource": {
+        "resourceType": "MedicationStatement",
+        "medicationCodeableConcept": {"text": "Aspirin"}
+    }}
+    patient = {"resource": {"resourceType": "Patient", "id": "p9"}}
+    body = (
+        b'{"resourceType": "Bundle", "type": "collection", "entry": ['
+        + orjson.dumps(medication) + b'], "entry": [' + orjson.dumps(patient) + b']}'
+    )
+
+    response = await post_bundle(body)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["medications"] == []
+    assert response.json()["processed_resources"] == 1
+    assert all(rows == [] for rows in conn.tables.values())
+
+@pytest.mark.asyncio
+async def test_bundle_422_matches_fhir_bundle():
+    """The endpoint's 422 body is the one a FHIRBundle body parameter gives"""
+    body = b'{"resourceType": "Bundle", "entry": [1]}'
+    response = await post_bundle(body)
+
+    assert response.status_code == 422
+    expected = orjson.loads(orjson.dumps(bundle_errors(body)))
+    assert list(response.json()) == ["detail"]
+    assert without_bundle_input(response.json()["detail"]) == without_bundle_input(
+        expected
+    )
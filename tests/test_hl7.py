@@ -0,0 +1,170 @@
+"""
+Tests for the HL7 message parser
+"""
+
+import sys
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+import core.database as database
+import routers.hl7 as hl7
+
+AUTH_HEADERS = {"Authorization": "Bearer test-token-123"}
+
+ADT_A03 = "\r".join([
+    "MSH|^~\\&|ADT|HOSP|AIVIDA|AIVIDA|20240115120000||ADT^A03|MSG0001|P|2.5",
+    "EVN|A03|20240115120000",
+    "PID|1||MRN123^^^HOSP||Doe^John^Q||19600101|M|||1 Main St||555-0100",
+    "DG1|1||I21.9|Acute myocardial infarction||F",
+    "DG1|2||E11.9|Type 2 diabetes||S",
+])
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hl7._parsed_message_cache.clear()
+    yield
+    hl7._parsed_message_cache.clear()
+
+@pytest.fixture
+def parser():
+    return hl7.HL7Parser()
+
+def test_cache_hit_returns_same_result(parser):
+    """Parsing the same message twice returns the cached result"""
+    first = parser.parse_message(ADT_A03)
+    assert parser.parse_message(ADT_A03) is first
+    assert len(hl7._parsed_message_cache) == 1
+
+def test_cached_result_is_read_only(parser):
+    """A shared result cannot be changed by the request holding it"""
+    parsed = parser.parse_message(ADT_A03)
+
+    with pytest.raises(TypeError):
+        parsed["PID"] = {}
+    with pytest.raises(TypeError):
+        parsed["PID"]["patient_id"] = "other"
+    with pytest.raises(AttributeError):
+        parsed["DG1"].append({})
+    with pytest.raises(TypeError):
+        parsed["DG1"][0]["diagnosis_code"] = "other"
+    assert parser.parse_message(ADT_A03)["PID"]["patient_id"] == "MRN123"
+
+def test_cache_evicts_least_recently_used(parser, monkeypatch):
+    """The cache holds PARSED_MESSAGE_CACHE_SIZE messages, dropping the oldest"""
+    monkeypatch.setattr(hl7, "PARSED_MESSAGE_CACHE_SIZE", 3)
+    messages = [ADT_A03.replace("MSG0001", f"MSG{i:04d}") for i in range(4)]
+    first = parser.parse_message(messages[0])
+    second = parser.parse_message(messages[1])
+    parser.parse_message(messages[2])
+
+    # Touch the first so the second is now the oldest
+    assert parser.parse_message(messages[0]) is first
+    parser.parse_message(messages[3])
+
+    assert len(hl7._parsed_message_cache) == 3
+    assert parser.parse_message(messages[0]) is first
+    assert parser.parse_message(messages[1]) is not second
+
+def test_parse_cr_only_message(parser):
+    """Segments separated by bare carriage returns are all parsed"""
+    segments = parser._parse_segments(ADT_A03)
+
+    assert list(segments) == ["MSH", "EVN", "PID", "DG1"]
+    assert segments["EVN"]["event_type"] == "A03"
+    assert segments["PID"]["last_name"] == "Doe"
+    assert len(segments["DG1"]) == 2
+    assert parser._parse_segments(ADT_A03.replace("\r", "\r\n")) == segments
+
+def test_parse_single_dg1_is_a_list(parser):
+    """A repeating segment type is a list even when it appears once"""
+    segments = parser._parse_segments("\r".join(ADT_A03.split("\r")[:4]))
+
+    assert isinstance(segments["DG1"], list)
+    assert [dg1["diagnosis_code"] for dg1 in segments["DG1"]] == ["I21.9"]
+
+def test_parse_short_pv1_is_padded(parser):
+    """A PV1 with the minimum fields reads the missing visit dates as empty"""
+    fields = ["PV1", "1", "I", "W^101^1", "E", "", "", "1234^Smith^Jane"]
+    pv1 = "|".join(fields + [""] * (20 - len(fields)))
+    segment = parser._parse_segments(pv1)["PV1"]
+    assert segment["attending_doctor"] == "1234^Smith^Jane"
+    assert segment["admit_date"] == ""
+    assert segment["discharge_date"] == ""
+
+    full = "|".join(fields + [""] * (44 - len(fields)) + ["20240110", "20240115"])
+    segment = parser._parse_segments(full)["PV1"]
+    assert segment["admit_date"] == "20240110"
+    assert segment["discharge_date"] == "20240115"
+
+def test_parse_segment_below_min_fields_is_unparsed(parser):
+    """A segment too short to parse keeps only its type"""
+    assert parser._parse_segments("PV1|1|I")["PV1"] == {"segment_type": "PV1"}
+    assert parser._parse_segments("DG1|1")["DG1"] == [{"segment_type": "DG1"}]
+
+class StubPool:
+    """Connection pool that hands out one stub connection, or times out"""
+
+    def __init__(self, timeout=False):
+        self.timeout = timeout
+        self.acquired = 0
+        self.released = 0
+
+    async def acquire(self, timeout=None):
+        self.acquired += 1
+        if self.timeout:
+            raise asyncio.TimeoutError()
+        return self
+
+    async def release(self, conn):
+        self.released += 1
+
+    async def fetchval(self, query, *args):
+        return "summary-1"
+
+async def post_discharge(monkeypatch, pool, message_content):
+    monkeypatch.setattr(database, "_connection_pool", pool)
+    app = FastAPI()
+    app.include_router(hl7.router, prefix="/api/v1/hl7")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/api/v1/hl7/adt-discharge",
+            json={"message_content": message_content},
+            headers=AUTH_HEADERS
+        )
+
+@pytest.mark.asyncio
+async def test_discharge_stored_with_pooled_connection(monkeypatch):
+    """A discharge message is stored and its connection returned to the pool"""
+    pool = StubPool()
+    response = await post_discharge(monkeypatch, pool, ADT_A03)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["discharge_summary_id"] == "summary-1"
+    assert pool.acquired == pool.released == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("message_content", [
+    "PID|1||MRN123",
+    ADT_A03.replace("EVN|A03", "EVN|A01")
+])
+async def test_discharge_rejected_before_acquiring(monkeypatch, message_content):
+    """Invalid or non-discharge messages never take a connection"""
+    pool = StubPool()
+    response = await post_discharge(monkeypatch, pool, message_content)
+
+    assert response.status_code == 400
+    assert pool.acquired == 0
+
+@pytest.mark.asyncio
+async def test_discharge_acquire_timeout_is_503(monkeypatch):
+    """An exhausted pool answers 503 instead of a generic error"""
+    response = await post_discharge(monkeypatch, StubPool(timeout=True), ADT_A03)
+
+    assert response.status_code == 503
@@ -7,6 +7,7 @@ import sys
 import os
 import asyncio
 import json
+import pytest
 from pathlib import Path
 
 # Add the ingestion service to Python path
@@ -16,15 +17,23 @@ from core.config import get_settings
 from processors.text_processor import TextProcessor
 from processors.pdf_parser import PDFParser
 
-async def test_text_processor():
+@pytest.fixture(scope="session")
+def text_processor():
+    """One TextProcessor shared by every test in the session"""
+    return TextProcessor()
+
+@pytest.fixture(scope="session")
+def pdf_parser():
+    """One PDFParser shared by every test in the session"""
+    return PDFParser()
+
+def test_text_processor(text_processor):
     """Test text processing functionality"""
     print("🧪 Testing Text Processor...")
     
-    processor = TextProcessor()
-    
     # Test medical text normalization
     sample_text = "Pt c/o chest pain. Dx: MI. Rx: aspirin 81mg po bid, lisinopril 10mg po qd"
-    normalized = await processor.normalize_text(sample_text)
+    normalized = text_processor.normalize_text(sample_text)
     print(f"Original: {sample_text}")
     print(f"Normalized: {normalized}")
     
@@ -42,23 +51,21 @@ async def test_text_processor():
     Follow-up: Cardiology in 2 weeks
     """
     
-    sections = await processor.extract_sections(discharge_sample)
+    sections = text_processor.extract_sections(discharge_sample)
     print(f"\nExtracted sections: {list(sections.keys())}")
     
-    medications = await processor.identify_medication_list(discharge_sample)
+    medications = text_processor.identify_medication_list(discharge_sample)
     print(f"Identified medications: {medications}")
     
-    appointments = await processor.identify_appointments(discharge_sample)
+    appointments = text_processor.identify_appointments(discharge_sample)
     print(f"Identified appointments: {appointments}")
     
     print("✅ Text Processor tests completed\n")
 
-async def test_pdf_parser():
+def test_pdf_parser(pdf_parser):
     """Test PDF parsing functionality"""
     print("🧪 Testing PDF Parser...")
     
-    parser = PDFParser()
-    
     # Create a simple test PDF content (this is just a simulation)
     # In real usage, this would be actual PDF bytes
     test_pdf_text = b"""Sample discharge summary content
@@ -77,19 +84,17 @@ async def test_pdf_parser():
     try:
         # Since we don't have actual PDF content, we'll test the quality scoring
         sample_text = test_pdf_text.decode('utf-8')
-        quality_score = parser._calculate_quality_score(sample_text)
+        quality_score = pdf_parser._calculate_quality_score(sample_text)
         print(f"Quality score for sample text: {quality_score:.2f}")
         
         print("✅ PDF Parser tests completed\n")
     except Exception as e:
         print(f"⚠️ PDF Parser test skipped (expected without real PDF): {e}\n")
 
-async def test_json_processing():
+def test_json_processing(text_processor):
     """Test JSON processing"""
     print("🧪 Testing JSON Processing...")
     
-    processor = TextProcessor()
-    
     sample_json = {
         "patient_info": {
             "name": "John Doe",
@@ -117,7 +122,7 @@ async def test_json_processing():
     }
     
     json_bytes = json.dumps(sample_json).encode('utf-8')
-    processed_text = await processor.process_json(json_bytes)
+    processed_text = text_processor.process_json(json_bytes)
     
     print("Sample JSON processed to text:")
     print(processed_text[:500] + "..." if len(processed_text) > 500 else processed_text)
@@ -154,10 +159,11 @@ async def main():
     # Test configuration first
     test_configuration()
     
-    # Test processors
-    await test_text_processor()
-    await test_pdf_parser()
-    await test_json_processing()
+    # Test processors, sharing one instance of each as the fixtures do
+    text_processor = TextProcessor()
+    test_text_processor(text_processor)
+    test_pdf_parser(PDFParser())
+    test_json_processing(text_processor)
     
     print("🎉 All tests completed!")
     print("\nNext steps:")
@@ -0,0 +1,66 @@
+"""
+Tests for the PDF parser's process pool
+"""
+
+import sys
+import os
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+import processors.pdf_parser as pdf_parser
+
+# Pool jobs run in worker processes, so they live at module level and record
+# their runs in a file named by their argument
+
+def crash_on_first_run(log_path: bytes) -> int:
+    """Kill the worker the first time it runs, then succeed"""
+    with open(log_path, "a") as log:
+        log.write("run\n")
+    with open(log_path) as log:
+        runs = len(log.readlines())
+    if runs == 1:
+        os._exit(1)
+    return runs
+
+def crash_every_run(log_path: bytes) -> int:
+    """Kill the worker on every run"""
+    with open(log_path, "a") as log:
+        log.write("run\n")
+    os._exit(1)
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    pdf_parser.shutdown_pdf_process_pool()
+    yield
+    pdf_parser.shutdown_pdf_process_pool()
+
+def runs(log_path: Path) -> int:
+    return len(log_path.read_text().splitlines())
+
+@pytest.mark.asyncio
+async def test_crashed_worker_replaces_pool_and_retries_once(tmp_path):
+    """A worker crash starts a new pool and the job runs once more there"""
+    log_path = tmp_path / "runs.log"
+    crashed_pool = pdf_parser._get_pdf_process_pool()
+
+    result = await pdf_parser._run_in_pdf_pool(crash_on_first_run, bytes(log_path))
+
+    assert result == 2
+    assert runs(log_path) == 2
+    assert pdf_parser._pdf_process_pool is not None
+    assert pdf_parser._pdf_process_pool is not crashed_pool
+
+@pytest.mark.asyncio
+async def test_second_crash_propagates_and_resets_pool(tmp_path):
+    """A job that crashes its retry too fails and leaves no broken pool"""
+    log_path = tmp_path / "runs.log"
+
+    with pytest.raises(BrokenProcessPool):
+        await pdf_parser._run_in_pdf_pool(crash_every_run, bytes(log_path))
+
+    assert runs(log_path) == 2
+    assert pdf_parser._pdf_process_pool is None
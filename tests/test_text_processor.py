@@ -0,0 +1,52 @@
+"""
+Regression tests for the clinical text processor
+"""
+
+import sys
+import json
+import time
+import pytest
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+from processors.text_processor import TextProcessor
+
+# Inputs with the outputs the original, unoptimized implementation gave for
+# them (recover it from git history to add cases); the rewritten regexes and
+# keyword scans must keep every one of them
+CORPUS_FILE = Path(__file__).parent.parent / "test_data" / "text_processor_corpus.json"
+
+with open(CORPUS_FILE, encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+@pytest.fixture(scope="module")
+def processor():
+    return TextProcessor()
+
+@pytest.mark.parametrize("method", [
+    "normalize_text", "extract_sections", "identify_appointments"
+])
+def test_matches_original_implementation(processor, method):
+    """Every corpus input gives the output the original implementation did"""
+    mismatches = [
+        case["text"] for case in CORPUS
+        if getattr(processor, method)(case["text"]) != case[method]
+    ]
+    assert mismatches == []
+
+def test_medication_name_stays_on_its_line(processor):
+    """A heading on the line above is not taken as part of the name"""
+    assert processor.identify_medication_list("Home meds\nAspirin 81 mg") == ["Aspirin"]
+
+def test_medication_scan_does_not_backtrack(processor):
+    """Many dose-free lines before a match are scanned in linear time"""
+    text = "\n".join(["take with food and water"] * 2000) + "\n5 tablets\naspirin 81 mg"
+
+    start = time.perf_counter()
+    medications = processor.identify_medication_list(text)
+    elapsed = time.perf_counter() - start
+
+    assert medications == ["aspirin"]
+    assert elapsed < 1.0
@@ -0,0 +1,288 @@
+"""
+Tests for the upload router, run against stubbed storage
+"""
+
+import sys
+import asyncio
+import itertools
+import uuid
+import httpx
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI
+from pathlib import Path
+
+# Add the ingestion service to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src/backend/ingestion-service'))
+
+import routers.upload as upload
+
+AUTH_HEADERS = {"Authorization": "Bearer test-token-123"}
+
+class FakeInsertBatcher:
+    """Stands in for the discharge summary insert batcher"""
+
+    def __init__(self, delays=None):
+        self.rows = []
+        self.delays = delays or {}
+
+    async def submit(self, row):
+        self.rows.append(row)
+        # Optional per-content delay, to make inserts complete out of order
+        await asyncio.sleep(self.delays.get(row[3], 0))
+        return {"id": row[0]}
+
+@pytest.fixture
+def app(monkeypatch):
+    """The upload router on its own app, with background processing disabled"""
+    async def no_processing(document_id, content):
+        pass
+    monkeypatch.setattr(upload, "_process_document_background", no_processing)
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/api/v1/upload")
+    return app
+
+@pytest.fixture
+def batcher(monkeypatch):
+    batcher = FakeInsertBatcher()
+    monkeypatch.setattr(upload, "_discharge_insert_batcher", batcher)
+    return batcher
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Records every duplicate lookup; nothing is stored yet"""
+    calls = []
+    async def document_exists(file_hash):
+        calls.append(file_hash)
+        return False
+    monkeypatch.setattr(upload, "_document_exists", document_exists)
+    return calls
+
+async def post_batch(app, files):
+    """POST files to /documents/batch, failing instead of hanging"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await asyncio.wait_for(
+            client.post(
+                "/api/v1/upload/documents/batch",
+                files=[("files", (name, body, "text/plain")) for name, body in files],
+                headers=AUTH_HEADERS
+            ),
+            timeout=5
+        )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.mark.asyncio
+async def test_batch_duplicates_within_request(app, batcher, lookups):
+    """A repeated file is reported as a duplicate without a second lookup"""
+    results = await post_batch(app, [("a.txt", b"same body"), ("b.txt", b"same body")])
+
+    assert [item["status"] for item in results] == ["stored", "duplicate"]
+    assert len(lookups) == 1
+    assert len(batcher.rows) == 1
+
+@pytest.mark.asyncio
+async def test_batch_extraction_error(app, batcher, lookups):
+    """A file that fails to parse fails only its own entry"""
+    results = await post_batch(app, [("bad.txt", b"\xff\xfe\xfa"), ("good.txt", b"fine")])
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error"] == "Error processing file"
+    assert results[1]["status"] == "stored"
+    assert [row[3] for row in batcher.rows] == ["fine"]
+
+@pytest.mark.asyncio
+async def test_batch_failing_duplicate_lookup(app, batcher, monkeypatch):
+    """A lookup error fails its file and the request still completes"""
+    async def document_exists(file_hash):
+        if not lookup_calls:
+            lookup_calls.append(file_hash)
+            raise RuntimeError("pool timeout")
+        return False
+    lookup_calls = []
+    monkeypatch.setattr(upload, "_document_exists", document_exists)
+
+    results = await post_batch(app, [(f"f{i}.txt", f"body {i}".encode()) for i in range(3)])
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error"] == "Error checking for duplicates"
+    assert [item["status"] for item in results[1:]] == ["stored", "stored"]
+
+@pytest.mark.asyncio
+async def test_batch_results_keep_request_order(app, lookups, monkeypatch):
+    """Results follow the order of the files, not the order inserts finish"""
+    bodies = [f"body {i}" for i in range(4)]
+    batcher = FakeInsertBatcher(
+        delays={body: 0.05 * (len(bodies) - i) for i, body in enumerate(bodies)}
+    )
+    monkeypatch.setattr(upload, "_discharge_insert_batcher", batcher)
+
+    results = await post_batch(
+        app, [(f"f{i}.txt", body.encode()) for i, body in enumerate(bodies)]
+    )
+
+    assert [item["filename"] for item in results] == [f"f{i}.txt" for i in range(4)]
+    assert all(item["status"] == "stored" for item in results)
+    ids_by_content = {row[3]: str(row[0]) for row in batcher.rows}
+    assert [item["document_id"] for item in results] == [
+        ids_by_content[body] for body in bodies
+    ]
+
+class StubListConnection:
+    """Just enough of an asyncpg connection for list_documents"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+        self.in_transaction = False
+
+    async def fetch(self, query, *params):
+        self.queries.append((query, params))
+        return self.rows[:params[0]]
+
+    async def cursor(self, query, *params, prefetch):
+        assert self.in_transaction, "cursors only exist inside a transaction"
+        self.queries.append((query, params))
+        for row in self.rows[:params[0]]:
+            yield row
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+def document_rows(count):
+    """Rows as the list query returns them, newest first"""
+    newest = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "patient_id": "p1",
+            "admission_id": None,
+            "document_type": "discharge_summary",
+            "status": "pending",
+            "created_at": newest - timedelta(minutes=i),
+            "processed_at": None,
+            "processed_content": None
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def list_conn(monkeypatch):
+    conn = StubListConnection(document_rows(3))
+
+    @asynccontextmanager
+    async def get_db_connection():
+        yield conn
+    monkeypatch.setattr(upload, "get_db_connection", get_db_connection)
+    return conn
+
+async def get_documents(app, params=None, url="/api/v1/upload/documents"):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(url, params=params, headers=AUTH_HEADERS)
+
+@pytest.mark.asyncio
+async def test_list_skip_rejected(app, list_conn):
+    """Offset paging is refused instead of silently ignored"""
+    response = await get_documents(app, {"skip": 100})
+
+    assert response.status_code == 400
+    assert "skip is no longer supported" in response.json()["detail"]
+    assert list_conn.queries == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", [
+    {"before_created_at": "2026-01-01T00:00:00Z"},
+    {"before_id": "00000000-0000-0000-0000-000000000001"}
+])
+async def test_list_cursor_needs_both_parts(app, list_conn, cursor):
+    """before_created_at and before_id are only accepted together"""
+    response = await get_documents(app, cursor)
+
+    assert response.status_code == 400
+    assert list_conn.queries == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("by_cursor,by_status,by_patient", list(
+    itertools.product((False, True), repeat=3)
+))
+async def test_list_query_variant(app, list_conn, by_cursor, by_status, by_patient):
+    """Each combination of cursor and filters runs its own query text"""
+    before_created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    before_id = uuid.uuid4()
+    params = {"limit": 10}
+    expected_params = [10]
+    if by_cursor:
+        params.update(before_created_at=before_created_at.isoformat(), before_id=before_id)
+        expected_params.extend((before_created_at, before_id))
+    if by_status:
+        params["status"] = "pending"
+        expected_params.append("pending")
+    if by_patient:
+        params["patient_id"] = "p1"
+        expected_params.append("p1")
+
+    response = await get_documents(app, params)
+
+    assert response.status_code == 200, response.text
+    query, sent = list_conn.queries[-1]
+    assert query == upload._LIST_DOCUMENTS_QUERIES[(by_cursor, by_status, by_patient)]
+    assert list(sent) == expected_params
+
+@pytest.mark.asyncio
+async def test_list_cursor_headers_only_on_full_page(app, list_conn):
+    """The next-page cursor is sent only when the page came back full"""
+    full = await get_documents(app, {"limit": 3})
+    last = list_conn.rows[2]
+    assert full.headers["X-Next-Before-Created-At"] == last["created_at"].isoformat()
+    assert full.headers["X-Next-Before-Id"] == str(last["id"])
+
+    partial = await get_documents(app, {"limit": 5})
+    assert len(partial.json()) == 3
+    assert "X-Next-Before-Created-At" not in partial.headers
+    assert "X-Next-Before-Id" not in partial.headers
+
+@pytest.mark.asyncio
+async def test_list_cursor_header_must_be_url_encoded(app, list_conn):
+    """The "+00:00" in the cursor timestamp only survives URL-encoded"""
+    page = await get_documents(app, {"limit": 3})
+    before_created_at = page.headers["X-Next-Before-Created-At"]
+    before_id = page.headers["X-Next-Before-Id"]
+    assert before_created_at.endswith("+00:00")
+
+    encoded = await get_documents(
+        app, {"before_created_at": before_created_at, "before_id": before_id}
+    )
+    assert encoded.status_code == 200
+    assert list_conn.queries[-1][1][1] == list_conn.rows[2]["created_at"]
+
+    raw = await get_documents(
+        app,
+        url=(
+            "/api/v1/upload/documents"
+            f"?before_created_at={before_created_at}&before_id={before_id}"
+        )
+    )
+    assert raw.status_code == 422
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [3, 5])
+async def test_list_cursor_path_matches_fetch_path(app, list_conn, monkeypatch, limit):
+    """Pages streamed from a cursor return the same rows and headers"""
+    fetched = await get_documents(app, {"limit": limit})
+    monkeypatch.setattr(upload, "LIST_STREAM_THRESHOLD", 1)
+    streamed = await get_documents(app, {"limit": limit})
+
+    assert streamed.status_code == fetched.status_code == 200
+    assert streamed.json() == fetched.json()
+    assert len(streamed.json()) == 3
+    for header in ("X-Next-Before-Created-At", "X-Next-Before-Id"):
+        assert streamed.headers.get(header) == fetched.headers.get(header)
+    assert list_conn.queries[0] == list_conn.queries[1]